@@ -0,0 +1,16 @@
+"""
+Consultas a modelos de IA
+-------------------------
+Utilidades para pedir consejo a varios modelos de lenguaje desde la
+interfaz sin bloquearla: consultas en paralelo con tiempos límite, un
+transporte HTTP compartido (conexiones reutilizadas, concurrencia limitada y
+reintentos), una caché de consejos por situación canónica, el historial
+del chat y la elección del modelo que responde. No importa tkinter, de
+modo que se puede usar desde scripts y pruebas.
+"""
+
+from advisor.cache import AdviceCache
+from advisor.fanout import fan_out
+from advisor.history import ChatHistory
+from advisor.router import ModelRouter
+from advisor.transport import AITransport
@@ -0,0 +1,230 @@
+"""
+Caché de consejos de IA
+-----------------------
+Guarda el texto de cada consejo por modelo, versión del prompt y situación
+canónica (ver holdem.canonical), de modo que repetir una situación ya
+consultada, o una que solo difiere en los palos, muestra el consejo al
+instante y sin gastar tokens.
+
+Como el consejo nombra los palos, se guarda traducido a los palos de la
+forma canónica y se traduce de vuelta a los de la situación que lo pide
+(translate_suits). Las entradas caducan tras `ttl` segundos y, al superar
+el tamaño máximo, se eliminan las de uso más antiguo. Opcionalmente se
+guardan también en un archivo SQLite para conservarlas entre ejecuciones.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS advice (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS advice_last_access ON advice (last_access);
+"""
+
+# Cada cuántas inserciones en disco se comprueba el límite de tamaño
+_EVICTION_CHECK_INTERVAL = 100
+
+# Formas con que se nombra cada palo (en el orden "cdhs"); la forma i de un
+# palo se traduce por la forma i del otro
+_SUIT_WORDS = [
+    ["Tréboles", "tréboles", "Trébol", "trébol", "Treboles", "treboles", "Trebol", "trebol",
+     "♣", "Clubs", "clubs"],
+    ["Diamantes", "diamantes", "Diamante", "diamante", "Diamantes", "diamantes", "Diamante", "diamante",
+     "♦", "Diamonds", "diamonds"],
+    ["Corazones", "corazones", "Corazón", "corazón", "Corazones", "corazones", "Corazon", "corazon",
+     "♥", "Hearts", "hearts"],
+    ["Picas", "picas", "Pica", "pica", "Picas", "picas", "Pica", "pica",
+     "♠", "Spades", "spades"],
+]
+_SUIT_LETTERS = "cdhs"
+
+_WORD_SUITS = {}
+for _suit, _words in enumerate(_SUIT_WORDS):
+    for _form, _word in enumerate(_words):
+        _WORD_SUITS.setdefault(_word, (_suit, _form))
+
+# Nombres de palo, símbolos y cartas en notación corta ("Qh"); "As" se
+# excluye porque en español es el nombre del as
+_SUIT_PATTERN = re.compile(
+    "|".join(sorted((re.escape(word) if len(word) == 1 else rf"\b{re.escape(word)}\b"
+                     for word in _WORD_SUITS), key=len, reverse=True))
+    + r"|\b(?!As\b)[2-9TJQKA][cdhs]\b")
+
+
+def translate_suits(text, perm):
+    """
+    Cambia los palos que se nombran en un texto.
+
+    Args:
+        text (str): Texto con nombres de palo, símbolos o cartas ("Qh")
+        perm (tuple): perm[palo] = palo por el que se sustituye (0-3, "cdhs")
+
+    Returns:
+        str: El texto con todos los palos sustituidos a la vez
+    """
+    def replace(match):
+        word = match.group()
+        if word in _WORD_SUITS:
+            suit, form = _WORD_SUITS[word]
+            return _SUIT_WORDS[perm[suit]][form]
+        return word[0] + _SUIT_LETTERS[perm[_SUIT_LETTERS.index(word[1])]]
+
+    return _SUIT_PATTERN.sub(replace, text)
+
+
+def key_to_text(key):
+    """Serializa una clave para usarla como clave primaria"""
+    return json.dumps(key, separators=(",", ":"), ensure_ascii=False)
+
+
+class AdviceCache:
+    """Caché LRU con caducidad de textos de consejo, opcionalmente en disco"""
+
+    def __init__(self, max_entries=500, ttl=86400.0, path=None, timeout=30.0):
+        """
+        Args:
+            max_entries (int): Consejos máximos (en memoria y en disco)
+            ttl (float): Segundos que un consejo sigue siendo válido
+            path (str): Archivo SQLite donde conservar los consejos, o None
+                para guardarlos solo en memoria
+            timeout (float): Segundos de espera si otro proceso tiene el bloqueo
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.timeout = timeout
+        self._entries = OrderedDict()  # clave en texto -> (creado, texto)
+        self._lock = threading.Lock()
+        self._connection = None
+        self._inserts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, settings):
+        """Crea la caché a partir de la sección "ai" de config.json (clave advice_cache)"""
+        config = settings.get("advice_cache", {})
+        options = ("max_entries", "ttl", "path")
+        return cls(**{option: config[option] for option in options if option in config})
+
+    def get(self, key):
+        """
+        Busca un consejo.
+
+        Args:
+            key (tuple): Clave serializable en JSON (modelo, versión del
+                prompt, situación canónica...)
+
+        Returns:
+            str: El texto guardado, o None si no está o ha caducado
+        """
+        text_key = key_to_text(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(text_key)
+            if entry is None and self.path:
+                entry = self._load(text_key)
+                if entry is not None:
+                    self._remember(text_key, entry)
+            if entry is not None and now - entry[0] > self.ttl:
+                self._forget(text_key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text_key)
+            if self.path:
+                self._connect().execute("UPDATE advice SET last_access = ? WHERE key = ?", (now, text_key))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        """Guarda el consejo de una clave (ver get)"""
+        text_key = key_to_text(key)
+        now = time.time()
+        with self._lock:
+            self._remember(text_key, (now, text))
+            if self.path:
+                connection = self._connect()
+                connection.execute("INSERT OR REPLACE INTO advice VALUES (?, ?, ?, ?)",
+                                   (text_key, text, now, now))
+                self._inserts += 1
+                if self._inserts % _EVICTION_CHECK_INTERVAL == 0:
+                    self._evict_stored(connection, now)
+
+    def clear(self):
+        """Elimina todos los consejos guardados"""
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._connect().execute("DELETE FROM advice")
+
+    def stats(self):
+        """Devuelve estadísticas de uso de la caché"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def close(self):
+        """Cierra el archivo de la caché, si hay uno abierto"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _remember(self, text_key, entry):
+        """Guarda una entrada en memoria respetando el tamaño máximo (con el lock tomado)"""
+        self._entries[text_key] = entry
+        self._entries.move_to_end(text_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _forget(self, text_key):
+        """Elimina una entrada de memoria y de disco (con el lock tomado)"""
+        self._entries.pop(text_key, None)
+        if self.path:
+            self._connect().execute("DELETE FROM advice WHERE key = ?", (text_key,))
+
+    def _connect(self):
+        """Abre la conexión (solo la primera vez) y crea el esquema si falta"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _load(self, text_key):
+        """Lee una entrada del disco (con el lock tomado)"""
+        row = self._connect().execute("SELECT created, text FROM advice WHERE key = ?",
+                                      (text_key,)).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def _evict_stored(self, connection, now):
+        """Elimina del disco los consejos caducados y los de acceso más antiguo"""
+        connection.execute("DELETE FROM advice WHERE created < ?", (now - self.ttl,))
+        count = connection.execute("SELECT COUNT(*) FROM advice").fetchone()[0]
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM advice WHERE key IN "
+                "(SELECT key FROM advice ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,))
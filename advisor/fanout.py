@@ -0,0 +1,90 @@
+"""
+Consultas en paralelo
+---------------------
+Lanza una llamada por modelo a la vez, de modo que la latencia total es la
+del modelo más lento que responde a tiempo y no la suma de todas. Cada
+llamada tiene su propio tiempo límite y todas comparten un plazo global: lo
+que no ha terminado al vencer se da por perdido y sus resultados se
+descartan aunque lleguen después.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Segundos que se espera a cada modelo y al conjunto, si no se indica otra cosa
+MODEL_TIMEOUT = 20.0
+DEADLINE = 30.0
+
+# Segundos entre comprobaciones del evento de cancelación
+CANCEL_POLL = 0.1
+
+
+def fan_out(calls, timeouts=None, deadline=DEADLINE, on_result=None, on_error=None, cancel=None):
+    """
+    Ejecuta varias llamadas a la vez y recoge las que terminan a tiempo.
+
+    Args:
+        calls (dict): {nombre: función sin argumentos}
+        timeouts (dict): {nombre: segundos} de cada llamada (por defecto
+            MODEL_TIMEOUT); el plazo global también las limita
+        deadline (float): Segundos máximos para el conjunto de llamadas
+        on_result (callable): Recibe (nombre, resultado) en cuanto llega cada
+            uno, desde el hilo que llamó a fan_out
+        on_error (callable): Recibe (nombre, excepción) si una llamada falla o
+            vence su plazo (TimeoutError)
+        cancel (threading.Event): Evento para abandonar todas las llamadas
+            pendientes (por ejemplo, si la consulta ha quedado obsoleta)
+
+    Returns:
+        tuple: ({nombre: resultado}, {nombre: excepción}) con las llamadas
+        terminadas y las fallidas o sin respuesta a tiempo
+    """
+    timeouts = timeouts or {}
+    results, errors = {}, {}
+    if not calls:
+        return results, errors
+
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(calls))
+    futures = {executor.submit(call): name for name, call in calls.items()}
+    limits = {future: start + min(timeouts.get(name, MODEL_TIMEOUT), deadline)
+              for future, name in futures.items()}
+    pending = set(futures)
+
+    try:
+        while pending:
+            if cancel is not None and cancel.is_set():
+                break
+
+            # Dar por perdidas las llamadas que han agotado su plazo
+            now = time.monotonic()
+            for future in [future for future in pending if limits[future] <= now]:
+                pending.discard(future)
+                future.cancel()
+                errors[futures[future]] = TimeoutError(
+                    f"Sin respuesta en {limits[future] - start:.1f}s")
+                if on_error is not None:
+                    on_error(futures[future], errors[futures[future]])
+            if not pending:
+                break
+
+            timeout = min(limits[future] for future in pending) - now
+            if cancel is not None:
+                timeout = min(timeout, CANCEL_POLL)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+                    if on_error is not None:
+                        on_error(name, e)
+                    continue
+                if on_result is not None:
+                    on_result(name, results[name])
+    finally:
+        # No esperar a las llamadas atascadas: terminarán (y se ignorarán) solas
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, errors
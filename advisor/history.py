@@ -0,0 +1,100 @@
+"""
+Historial del chat
+------------------
+Guarda los mensajes del chat como objetos (rol y texto) en un búfer
+circular, en lugar de extraerlos del texto mostrado en la interfaz. Se
+envían a la API como conversación de varios turnos (`messages`), recortada
+a un presupuesto de tokens estimado, de modo que el coste de cada mensaje
+no crece con la duración de la sesión.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+
+# Mensajes que se conservan y tokens máximos del historial enviado
+MAX_MESSAGES = 20
+TOKEN_BUDGET = 1000
+
+# Estimación de tokens: caracteres por token y tokens fijos por mensaje
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text):
+    """Estimación aproximada de los tokens de un mensaje (sin tokenizador)"""
+    return MESSAGE_OVERHEAD + (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class ChatMessage:
+    """Un mensaje de la conversación"""
+    role: str  # "user" o "assistant"
+    content: str
+    tokens: int = 0  # Estimación de estimate_tokens
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content)
+
+
+class ChatHistory:
+    """Búfer circular con los últimos mensajes del chat"""
+
+    def __init__(self, max_messages=MAX_MESSAGES, token_budget=TOKEN_BUDGET):
+        """
+        Args:
+            max_messages (int): Mensajes que se conservan (los más antiguos se
+                descartan al añadir otros)
+            token_budget (int): Tokens estimados máximos que devuelve messages()
+        """
+        self.token_budget = token_budget
+        self._messages = deque(maxlen=max_messages)
+
+    @classmethod
+    def from_config(cls, settings):
+        """Crea el historial a partir de la sección "ai" de config.json (clave chat_history)"""
+        config = settings.get("chat_history", {})
+        options = ("max_messages", "token_budget")
+        return cls(**{option: config[option] for option in options if option in config})
+
+    def add(self, role, content):
+        """Añade un mensaje al final de la conversación y lo devuelve"""
+        message = ChatMessage(role, content)
+        self._messages.append(message)
+        return message
+
+    def add_exchange(self, question, answer):
+        """Añade una pregunta del usuario y su respuesta"""
+        self.add("user", question)
+        self.add("assistant", answer)
+
+    def messages(self, token_budget=None):
+        """
+        Devuelve los mensajes más recientes que caben en el presupuesto.
+
+        Args:
+            token_budget (int): Tokens estimados máximos (por defecto, los del
+                historial)
+
+        Returns:
+            list: Diccionarios {"role", "content"} en orden cronológico,
+            empezando siempre por un mensaje del usuario
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        selected = []
+        for message in reversed(self._messages):
+            if message.tokens > budget:
+                break
+            budget -= message.tokens
+            selected.append(message)
+        # Una respuesta sin su pregunta confunde al modelo
+        while selected and selected[-1].role != "user":
+            selected.pop()
+        return [{"role": message.role, "content": message.content} for message in reversed(selected)]
+
+    def clear(self):
+        """Olvida toda la conversación"""
+        self._messages.clear()
+
+    def __len__(self):
+        return len(self._messages)
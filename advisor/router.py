@@ -0,0 +1,298 @@
+"""
+Selección de modelo para el chat
+--------------------------------
+ModelRouter lleva, para cada modelo, una ventana de las últimas latencias
+(tiempo hasta el primer token) y de los últimos resultados de las consultas
+reales, y con ellas decide a qué modelo enviar cada mensaje:
+
+- Se prefiere el modelo sano más rápido (mediana de latencia dividida por
+  su `weight` de config.json); los que aún no tienen medidas se prueban
+  primero.
+- Si el elegido no ha empezado a responder cuando se cumple su percentil 95
+  de latencia, se lanza la misma consulta al siguiente (hedging) y se queda
+  la primera respuesta que empiece a llegar; la otra se cancela.
+- Un modelo con varios fallos seguidos, o demasiados errores en la ventana,
+  sale de la rotación (circuito abierto) durante unos segundos; pasado ese
+  tiempo recibe una consulta de prueba y vuelve si responde.
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import deque
+
+from advisor.transport import RequestCancelled
+
+# Consultas recientes que se recuerdan por modelo
+WINDOW = 50
+
+# Medidas necesarias para fiarse del percentil 95; hasta entonces se espera
+# HEDGE_DELAY segundos antes de consultar a un segundo modelo
+MIN_SAMPLES = 5
+HEDGE_DELAY = 5.0
+
+# Circuito: fallos seguidos o proporción de errores (con al menos
+# MIN_SAMPLES resultados) que sacan a un modelo de la rotación, y segundos
+# que queda fuera
+FAILURE_THRESHOLD = 3
+MAX_ERROR_RATE = 0.5
+OPEN_SECONDS = 30.0
+
+# Segundos entre comprobaciones del evento de cancelación
+CANCEL_POLL = 0.1
+
+CLOSED, OPEN, HALF_OPEN = "cerrado", "abierto", "de prueba"
+
+
+def percentile(values, fraction):
+    """
+    Percentil por rango más cercano.
+
+    Args:
+        values (iterable): Valores medidos
+        fraction (float): Percentil entre 0 y 1 (0.95 para el p95)
+
+    Returns:
+        float: El valor del percentil, o None si no hay valores
+    """
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+class ModelHealth:
+    """Latencias, resultados y estado del circuito de un modelo"""
+
+    def __init__(self, weight=1.0, window=WINDOW):
+        self.weight = weight
+        self.latencies = deque(maxlen=window)  # Segundos hasta el primer token
+        self.outcomes = deque(maxlen=window)  # True si la consulta falló
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+
+    @property
+    def error_rate(self):
+        """Proporción de consultas fallidas en la ventana"""
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def stats(self):
+        """Resumen para mostrar o registrar"""
+        return {
+            "samples": len(self.latencies),
+            "p50": percentile(self.latencies, 0.5),
+            "p95": percentile(self.latencies, 0.95),
+            "error_rate": self.error_rate,
+            "state": self.state,
+        }
+
+
+class ModelRouter:
+    """Elige modelo según latencia, errores y peso, con hedging y circuito"""
+
+    def __init__(self, weights, window=WINDOW, hedge_delay=HEDGE_DELAY,
+                 failure_threshold=FAILURE_THRESHOLD, max_error_rate=MAX_ERROR_RATE,
+                 open_seconds=OPEN_SECONDS):
+        """
+        Args:
+            weights (dict): {nombre del modelo: peso}, en el orden de preferencia
+                cuando no hay medidas
+            window (int): Consultas recientes que se recuerdan por modelo
+            hedge_delay (float): Segundos antes de consultar a un segundo modelo
+                mientras no hay medidas suficientes para el percentil 95
+            failure_threshold (int): Fallos seguidos que abren el circuito
+            max_error_rate (float): Proporción de errores que abre el circuito
+            open_seconds (float): Segundos que un modelo queda fuera de la rotación
+        """
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._health = {name: ModelHealth(weight, window) for name, weight in weights.items()}
+
+    @classmethod
+    def from_config(cls, models, settings):
+        """
+        Crea el router para los modelos de la sección "api" de config.json
+        (usa su campo weight) con las opciones de la clave router de la
+        sección "ai".
+        """
+        config = settings.get("router", {})
+        options = ("window", "hedge_delay", "failure_threshold", "max_error_rate", "open_seconds")
+        return cls({name: model_config.get("weight", 1.0) for name, model_config in models.items()},
+                   **{option: config[option] for option in options if option in config})
+
+    def record_success(self, name, latency):
+        """Registra una consulta que respondió tras `latency` segundos (primer token)"""
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return
+            health.latencies.append(latency)
+            health.outcomes.append(False)
+            health.consecutive_failures = 0
+            health.state = CLOSED
+
+    def record_failure(self, name):
+        """Registra una consulta fallida o sin respuesta a tiempo"""
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return
+            health.outcomes.append(True)
+            health.consecutive_failures += 1
+            if (health.state == HALF_OPEN
+                    or health.consecutive_failures >= self.failure_threshold
+                    or (len(health.outcomes) >= MIN_SAMPLES and health.error_rate > self.max_error_rate)):
+                health.state = OPEN
+                health.opened_at = time.monotonic()
+
+    def ranking(self):
+        """
+        Ordena los modelos para la próxima consulta.
+
+        Returns:
+            list: Nombres de los modelos en rotación, el más rápido (por peso)
+            primero; si todos tienen el circuito abierto, todos ordenados por
+            el tiempo que llevan fuera
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = []
+            for index, (name, health) in enumerate(self._health.items()):
+                if health.state == OPEN and now - health.opened_at >= self.open_seconds:
+                    health.state = HALF_OPEN  # Recibe una consulta de prueba
+                if health.state == OPEN:
+                    continue
+                median = percentile(health.latencies, 0.5) or 0.0
+                available.append((median / max(health.weight, 1e-9), -health.weight, index, name))
+            if available:
+                return [name for *_, name in sorted(available)]
+            return sorted(self._health, key=lambda name: self._health[name].opened_at)
+
+    def hedge_after(self, name):
+        """Segundos que se espera al primer token de un modelo antes de consultar a otro"""
+        with self._lock:
+            health = self._health[name]
+            if len(health.latencies) < MIN_SAMPLES:
+                return self.hedge_delay
+            return percentile(health.latencies, 0.95)
+
+    def stats(self):
+        """Devuelve {nombre: resumen} de todos los modelos"""
+        with self._lock:
+            return {name: health.stats() for name, health in self._health.items()}
+
+    def run(self, call, on_text=None, cancel=None):
+        """
+        Consulta al mejor modelo y, si tarda más que su percentil 95 en
+        empezar a responder, también al siguiente; si uno falla antes de
+        responder se pasa al siguiente. Gana el primero que envía texto (o
+        que termina, si ninguno envía texto) y los demás se cancelan.
+
+        Args:
+            call (callable): call(nombre, on_text, cancel) hace la consulta en
+                streaming y devuelve su resultado
+            on_text (callable): Recibe el texto acumulado del modelo ganador
+            cancel (threading.Event): Evento para abandonar la consulta
+
+        Returns:
+            tuple: (nombre del modelo, resultado de call)
+
+        Raises:
+            La excepción del último modelo que falló si ninguno responde;
+            RequestCancelled si se activa `cancel`; RuntimeError si no hay
+            modelos configurados
+        """
+        candidates = self.ranking()
+        if not candidates:
+            raise RuntimeError("No hay modelos configurados")
+
+        lock = threading.Lock()
+        winner = []
+        cancels = {}
+        finished = queue.Queue()
+
+        def claim(name):
+            # El primero que reclama gana y cancela a los demás
+            with lock:
+                if not winner:
+                    winner.append(name)
+                    for other, event in cancels.items():
+                        if other != name:
+                            event.set()
+                return winner[0] == name
+
+        def attempt(name):
+            start = time.monotonic()
+            first_token = []
+
+            def forward(text):
+                if not first_token:
+                    first_token.append(time.monotonic() - start)
+                if claim(name) and on_text is not None:
+                    on_text(text)
+
+            try:
+                result = call(name, forward, cancels[name])
+            except Exception as e:
+                if not cancels[name].is_set():
+                    self.record_failure(name)
+                finished.put((name, None, e))
+                return
+            if cancels[name].is_set() and not claim(name):
+                finished.put((name, None, None))  # Perdió la carrera
+                return
+            self.record_success(name, first_token[0] if first_token else time.monotonic() - start)
+            claim(name)
+            finished.put((name, result, None))
+
+        def launch():
+            name = candidates.pop(0)
+            with lock:
+                cancels[name] = threading.Event()
+                if winner:
+                    cancels[name].set()
+            threading.Thread(target=attempt, args=(name,), daemon=True).start()
+            return name
+
+        running = 1
+        hedge_at = time.monotonic() + self.hedge_after(launch())
+        hedged = False
+        error = None
+        try:
+            while running:
+                timeout = None
+                if candidates and not hedged and not winner:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                if cancel is not None:
+                    timeout = CANCEL_POLL if timeout is None else min(timeout, CANCEL_POLL)
+                try:
+                    name, result, exception = finished.get(timeout=timeout)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        raise RequestCancelled()
+                    if candidates and not hedged and not winner and time.monotonic() >= hedge_at:
+                        # El primero tarda más de lo habitual: consultar también al siguiente
+                        hedged = True
+                        launch()
+                        running += 1
+                    continue
+                running -= 1
+                if exception is None and result is not None and winner and winner[0] == name:
+                    return name, result
+                if exception is not None:
+                    error = exception
+                    if winner and winner[0] == name:
+                        raise exception  # Falló a mitad de la respuesta ya mostrada
+                    if candidates and not winner:
+                        launch()
+                        running += 1
+            raise error or RuntimeError("Ningún modelo respondió")
+        finally:
+            with lock:
+                for event in cancels.values():
+                    event.set()
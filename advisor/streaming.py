@@ -0,0 +1,127 @@
+"""
+Respuestas en streaming
+-----------------------
+Recibe las respuestas de los modelos token a token (API compatible con
+OpenAI, stream=True) para mostrarlas a medida que se generan, midiendo el
+tiempo hasta el primer token y la velocidad de generación.
+
+Los fragmentos llegan desde hilos de trabajo; Throttle agrupa las
+peticiones de refresco para que la interfaz se redibuje como mucho una vez
+cada pocos milisegundos en lugar de una vez por token.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Milisegundos mínimos entre dos refrescos de la interfaz
+UPDATE_INTERVAL = 50
+
+
+@dataclass
+class StreamStats:
+    """Tiempos de una respuesta en streaming (en segundos)"""
+    first_token: Optional[float] = None  # Desde el envío hasta el primer texto
+    duration: float = 0.0  # Desde el envío hasta el final de la respuesta
+    tokens: int = 0  # Tokens generados (los del servidor o, si no los da, fragmentos recibidos)
+
+    @property
+    def tokens_per_second(self):
+        """Velocidad de generación desde el primer token"""
+        if self.first_token is None or self.duration <= self.first_token:
+            return 0.0
+        return self.tokens / (self.duration - self.first_token)
+
+
+def stream_chat(client, model, messages, max_tokens, timeout=None, on_text=None, cancel=None):
+    """
+    Pide una respuesta en streaming y la va acumulando.
+
+    Args:
+        client (openai.OpenAI): Cliente de la API
+        model (str): Identificador del modelo
+        messages (list): Mensajes de la conversación
+        max_tokens (int): Longitud máxima de la respuesta
+        timeout (float): Tiempo límite de la petición en segundos (por defecto,
+            el del cliente)
+        on_text (callable): Recibe el texto acumulado tras cada fragmento
+            (se llama desde el hilo que ejecuta stream_chat)
+        cancel (threading.Event): Evento para dejar de leer la respuesta
+
+    Returns:
+        tuple: (texto recibido, StreamStats)
+    """
+    stats = StreamStats()
+    start = time.monotonic()
+    text = ""
+    chunks = 0
+
+    # Se leen los eventos SSE directamente y hasta el final del cuerpo (también
+    # tras "[DONE]"): una respuesta leída entera deja la conexión libre para
+    # reutilizarla, mientras que cerrarla a medias obliga a abrir otra
+    options = {"timeout": timeout} if timeout is not None else {}
+    with client.chat.completions.with_streaming_response.create(
+            model=model, messages=messages, max_tokens=max_tokens, stream=True,
+            **options) as response:
+        for line in response.iter_lines():
+            if cancel is not None and cancel.is_set():
+                break
+            if not line.startswith("data:") or line[5:].strip() == "[DONE]":
+                continue
+            chunk = json.loads(line[5:])
+            # Algunos servidores envían el recuento de tokens en el último fragmento
+            usage = chunk.get("usage") or {}
+            if usage.get("completion_tokens"):
+                stats.tokens = usage["completion_tokens"]
+            content = chunk["choices"][0]["delta"].get("content") if chunk.get("choices") else None
+            if not content:
+                continue
+            if stats.first_token is None:
+                stats.first_token = time.monotonic() - start
+            text += content
+            chunks += 1
+            if on_text is not None:
+                on_text(text)
+
+    stats.duration = time.monotonic() - start
+    if not stats.tokens:
+        stats.tokens = chunks
+    return text, stats
+
+
+class Throttle:
+    """
+    Agrupa peticiones de refresco hechas desde cualquier hilo: callback se
+    ejecuta como mucho una vez cada `interval` milisegundos a través de
+    `schedule` (por ejemplo root.after, que lo lleva al hilo de Tk).
+    """
+
+    def __init__(self, schedule, callback, interval=UPDATE_INTERVAL):
+        self._schedule = schedule
+        self._callback = callback
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._closed = False
+
+    def request(self):
+        """Pide un refresco; se ignora si ya hay uno pendiente"""
+        with self._lock:
+            if self._scheduled or self._closed:
+                return
+            self._scheduled = True
+        self._schedule(self._interval, self._run)
+
+    def close(self):
+        """Descarta los refrescos pendientes (por ejemplo, antes de mostrar el resultado final)"""
+        with self._lock:
+            self._closed = True
+
+    def _run(self):
+        with self._lock:
+            self._scheduled = False
+            if self._closed:
+                return
+        self._callback()
@@ -0,0 +1,250 @@
+"""
+Transporte compartido para las APIs de IA
+-----------------------------------------
+Un único AITransport por aplicación gestiona las conexiones con todos los
+modelos configurados:
+
+- Un cliente HTTP por URL base, con conexiones keep-alive reutilizadas entre
+  consultas (se evita un handshake TLS nuevo en cada consejo) y tiempos
+  límite de conexión y de lectura configurables.
+- Un cliente OpenAI por URL base y clave, construido sobre ese cliente HTTP.
+- Un máximo de peticiones simultáneas por URL base, para no saturar un
+  servidor local (LM Studio) cuando se consultan varios modelos a la vez.
+- Reintentos con espera exponencial y jitter ante errores 429/5xx o de
+  conexión, respetando la cabecera Retry-After si el servidor la envía.
+
+Lo usan tanto la interfaz (ppoker.py) como test_ai_connection.py.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+# Códigos HTTP que indican un fallo pasajero
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Clave para endpoints sin autenticación (LM Studio la ignora, pero el
+# cliente de OpenAI necesita alguna)
+NO_API_KEY = "sin-clave"
+
+# Segundos entre comprobaciones del evento de cancelación mientras se espera
+CANCEL_POLL = 0.1
+
+
+class RequestCancelled(Exception):
+    """La petición se abandonó antes de enviarse o durante una espera"""
+
+
+class AITransport:
+    """Clientes, límites de concurrencia y reintentos compartidos por URL base"""
+
+    def __init__(self, connect_timeout=5.0, read_timeout=60.0, max_concurrency=4,
+                 max_retries=3, backoff=0.5, max_backoff=8.0, keepalive=120.0):
+        """
+        Args:
+            connect_timeout (float): Segundos para establecer la conexión
+            read_timeout (float): Segundos máximos sin recibir datos
+            max_concurrency (int): Peticiones simultáneas por URL base
+            max_retries (int): Reintentos tras un error pasajero
+            backoff (float): Espera base en segundos (se duplica en cada reintento)
+            max_backoff (float): Espera máxima entre reintentos
+            keepalive (float): Segundos que se mantiene abierta una conexión inactiva
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.keepalive = keepalive
+        self._lock = threading.Lock()
+        self._http_clients = {}  # URL base -> cliente HTTP de openai
+        self._clients = {}  # (URL base, clave) -> openai.OpenAI
+        self._sessions = {}  # URL base -> requests.Session
+        self._slots = {}  # URL base -> semáforo de peticiones simultáneas
+
+    @classmethod
+    def from_config(cls, settings):
+        """Crea el transporte a partir de la sección "ai" de config.json"""
+        options = ("connect_timeout", "read_timeout", "max_concurrency", "max_retries",
+                   "backoff", "max_backoff", "keepalive")
+        return cls(**{option: settings[option] for option in options if option in settings})
+
+    def client(self, model_config):
+        """
+        Devuelve el cliente OpenAI compartido para la URL base y la clave de
+        un modelo (ver la sección "api" de config.json).
+        """
+        base_url = _base_url(model_config["api_base_url"])
+        api_key = model_config.get("api_key") or NO_API_KEY
+        with self._lock:
+            client = self._clients.get((base_url, api_key))
+            if client is None:
+                # Sin reintentos propios del cliente: los gestiona call()
+                client = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=0,
+                                       http_client=self._http_client(base_url))
+                self._clients[base_url, api_key] = client
+            return client
+
+    def session(self, base_url):
+        """Devuelve la sesión de requests compartida para peticiones HTTP directas"""
+        base_url = _base_url(base_url)
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[base_url] = session
+            return session
+
+    @property
+    def timeout(self):
+        """Tiempos límite (conexión, lectura) para requests"""
+        return self.connect_timeout, self.read_timeout
+
+    @contextmanager
+    def slot(self, base_url, cancel=None):
+        """
+        Reserva una de las peticiones simultáneas permitidas para una URL base.
+
+        Raises:
+            RequestCancelled: Si se activa `cancel` mientras se espera turno
+        """
+        base_url = _base_url(base_url)
+        with self._lock:
+            semaphore = self._slots.setdefault(base_url, threading.BoundedSemaphore(self.max_concurrency))
+        while not semaphore.acquire(timeout=CANCEL_POLL):
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def call(self, base_url, function, cancel=None, deadline=None):
+        """
+        Ejecuta una petición con turno en su URL base y reintentos.
+
+        Args:
+            base_url (str): URL base del servicio
+            function (callable): Hace la petición y devuelve su resultado (una
+                respuesta de requests con código 429/5xx también se reintenta)
+            cancel (threading.Event): Evento para no seguir reintentando
+            deadline (float): Instante (time.monotonic) a partir del cual ya no
+                se reintenta, por ejemplo el plazo del que llama
+
+        Returns:
+            El resultado de function (la última respuesta si se agotan los
+            reintentos de un código HTTP pasajero)
+
+        Raises:
+            La excepción de la petición si no es pasajera o se agotan los
+            reintentos; RequestCancelled si se activa `cancel`
+        """
+        for attempt in range(self.max_retries + 1):
+            error = None
+            try:
+                with self.slot(base_url, cancel):
+                    result = function()
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    raise
+                error = e
+            else:
+                if attempt == self.max_retries or getattr(result, "status_code", None) not in RETRY_STATUS:
+                    return result
+                error = result
+
+            # Sin reintento si quien llama ya ha abandonado la petición o no
+            # queda tiempo para repetirla
+            delay = self.retry_delay(attempt, error)
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled()
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                if isinstance(error, Exception):
+                    raise error
+                return error
+
+            # Esperar antes de reintentar (interrumpible por cancel)
+            if cancel is not None:
+                if cancel.wait(delay):
+                    raise RequestCancelled()
+            else:
+                time.sleep(delay)
+
+    def retry_delay(self, attempt, error=None):
+        """
+        Espera antes del reintento número `attempt` (desde 0): la indicada por
+        Retry-After o una exponencial con jitter completo.
+        """
+        response = getattr(error, "response", error)
+        retry_after = getattr(response, "headers", {}).get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def warm_up(self, model_configs):
+        """
+        Abre en segundo plano una conexión con cada URL base (GET /models) para
+        que la primera consulta no pague el handshake. Los errores se ignoran.
+        """
+        def connect(model_config):
+            try:
+                self.client(model_config).models.list()
+            except Exception:
+                pass
+
+        seen = set()
+        for model_config in model_configs:
+            key = (_base_url(model_config["api_base_url"]), model_config.get("api_key"))
+            if key not in seen:
+                seen.add(key)
+                threading.Thread(target=connect, args=(model_config,), daemon=True).start()
+
+    def close(self):
+        """Cierra todas las conexiones abiertas"""
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            for session in self._sessions.values():
+                session.close()
+            self._http_clients.clear()
+            self._clients.clear()
+            self._sessions.clear()
+
+    def _http_client(self, base_url):
+        """Cliente HTTP con keep-alive y tiempos límite para una URL base (con el lock tomado)"""
+        http_client = self._http_clients.get(base_url)
+        if http_client is None:
+            # Limits es la clase de la versión de httpx que use openai
+            limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+                max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=self.keepalive)
+            http_client = openai.DefaultHttpxClient(
+                limits=limits, timeout=openai.Timeout(self.read_timeout, connect=self.connect_timeout))
+            self._http_clients[base_url] = http_client
+        return http_client
+
+
+def _base_url(url):
+    """Normaliza una URL base para usarla como clave"""
+    return url.rstrip("/")
+
+
+def _retryable(error):
+    """Indica si un error de una petición es pasajero"""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRY_STATUS
+    return isinstance(error, (openai.APIConnectionError, requests.ConnectionError, requests.Timeout))
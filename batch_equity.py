@@ -0,0 +1,61 @@
+"""
+Calcula la equity de todas las situaciones de un archivo JSONL o CSV
+(por ejemplo, manos extraídas de historiales) y escribe los resultados
+en otro archivo, usando todos los núcleos disponibles.
+
+Ejemplo:
+    python batch_equity.py manos.jsonl -o equity.jsonl --trials 20000 --seed 1
+
+Cada línea JSONL (o fila CSV) indica "hole", "board", "opponents" y,
+opcionalmente, "dead" y "known" (manos conocidas de algunos oponentes):
+    {"id": 1, "hole": "AhKh", "board": "2h7h9c", "opponents": 2, "dead": "Qs", "known": ["JcJd"]}
+"""
+
+import sys
+
+from holdem.batch import CHUNK_SIZE, batch_equity, read_situations, write_results
+
+
+def run_batch(input_path, output_path, trials, exact, seed, workers, chunk_size,
+              input_format=None, output_format=None):
+    """Procesa el archivo de entrada completo e informa del rendimiento"""
+    stats = {}
+    items = batch_equity(read_situations(input_path, input_format), trials=trials, exact=exact,
+                         seed=seed, workers=workers, chunk_size=chunk_size, stats=stats)
+    write_results(items, output_path, output_format)
+
+    elapsed = stats["elapsed"]
+    rate = stats["situations"] / elapsed if elapsed > 0 else 0.0
+    # El informe va a stderr para no mezclarse con resultados escritos en stdout
+    print(f"{stats['situations']} situaciones ({stats['unique']} distintas, "
+          f"{stats['errors']} con error) en {elapsed:.1f}s: {rate:.1f} situaciones/s",
+          file=sys.stderr)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Calcula la equity de un archivo de situaciones')
+    parser.add_argument('input', help='Archivo JSONL o CSV de entrada ("-" para stdin)')
+    parser.add_argument('--output', '-o', default='-',
+                        help='Archivo de salida JSONL o CSV (default: stdout)')
+    parser.add_argument('--trials', '-n', type=int, default=10000,
+                        help='Repartos de Monte Carlo por situacion (default: 10000)')
+    parser.add_argument('--exact', action='store_true', default=None,
+                        help='Forzar enumeracion exacta en todas las situaciones')
+    parser.add_argument('--seed', '-s', type=int, default=None,
+                        help='Semilla para resultados reproducibles')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Numero de procesos (default: uno por nucleo)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Situaciones procesadas a la vez (default: {CHUNK_SIZE})')
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'],
+                        help='Formato de entrada (default: segun la extension)')
+    parser.add_argument('--output-format', choices=['jsonl', 'csv'],
+                        help='Formato de salida (default: segun la extension)')
+
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, args.trials, args.exact, args.seed, args.workers,
+              args.chunk_size, args.input_format, args.output_format)
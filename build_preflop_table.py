@@ -0,0 +1,107 @@
+"""
+Genera la tabla de equity preflop (holdem/data/preflop_equity.json) para
+las 169 clases de manos iniciales contra 1-9 oponentes aleatorios.
+
+Cada reparto simulado incluye el tablero completo y las manos de 9
+oponentes; la equity contra k oponentes se obtiene usando solo los k
+primeros, de modo que un mismo reparto sirve para las 9 columnas.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from holdem.equity import remaining_deck
+from holdem.evaluator import HAND_CATEGORIES, CATEGORY_SHIFT
+from holdem.preflop import (MAX_OPPONENTS, TABLE_PATH, TABLE_VERSION,
+                            all_hand_classes, class_representative)
+from holdem.vectorized import BATCH_SIZE, deal_batch, evaluate_batch
+
+
+def simulate_class(hole, trials, rng):
+    """
+    Simula una mano inicial contra 1-9 oponentes a la vez.
+
+    Returns:
+        tuple: ([victorias, empates, reparto] por número de oponentes,
+        cantidades por categoría de la mano final del jugador, reparto por
+        categoría para cada número de oponentes)
+    """
+    deck = remaining_deck(hole)
+    totals = np.zeros((MAX_OPPONENTS, 3))
+    hand_counts = np.zeros(len(HAND_CATEGORIES), dtype=np.int64)
+    category_shares = np.zeros((MAX_OPPONENTS, len(HAND_CATEGORIES)))
+
+    done = 0
+    while done < trials:
+        size = min(BATCH_SIZE, trials - done)
+        dealt = deal_batch(deck, size, 5 + 2 * MAX_OPPONENTS, rng)
+        board = dealt[:, :5]
+
+        player = evaluate_batch(np.concatenate([np.broadcast_to(hole, (size, 2)), board], axis=1))
+        opponents = np.stack([evaluate_batch(np.concatenate([dealt[:, i:i + 2], board], axis=1))
+                              for i in range(5, 5 + 2 * MAX_OPPONENTS, 2)], axis=1)
+
+        # Mejor puntuación y número de empates acumulados con los k primeros oponentes
+        best = np.maximum.accumulate(opponents, axis=1)
+        tied_count = np.cumsum(opponents == player[:, None], axis=1)
+        won = player[:, None] > best
+        tied = player[:, None] == best
+
+        shares = won + np.where(tied, 1.0 / (tied_count + 1), 0.0)
+        categories = player >> CATEGORY_SHIFT
+        totals[:, 0] += won.sum(axis=0)
+        totals[:, 1] += tied.sum(axis=0)
+        totals[:, 2] += shares.sum(axis=0)
+        hand_counts += np.bincount(categories, minlength=len(HAND_CATEGORIES))
+        for k in range(MAX_OPPONENTS):
+            category_shares[k] += np.bincount(categories, weights=shares[:, k],
+                                              minlength=len(HAND_CATEGORIES))
+        done += size
+
+    results = [[int(wins), int(ties), round(float(share), 2)] for wins, ties, share in totals]
+    return results, hand_counts.tolist(), [[round(float(share)) for share in row]
+                                           for row in category_shares]
+
+
+def build_table(trials, seed, path=TABLE_PATH):
+    """Genera la tabla completa y la guarda en `path`"""
+    classes = all_hand_classes()
+    seeds = np.random.SeedSequence(seed).spawn(len(classes))
+    hands = {}
+    start_time = time.time()
+
+    for index, (name, class_seed) in enumerate(zip(classes, seeds)):
+        results, hand_counts, category_shares = simulate_class(class_representative(name), trials,
+                                                               np.random.default_rng(class_seed))
+        hands[name] = {"results": results, "hand_counts": hand_counts,
+                       "category_shares": category_shares}
+        print(f"[{index + 1}/{len(classes)}] {name}: "
+              f"{', '.join(f'{share / trials * 100:.2f}%' for _, _, share in results)}")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": TABLE_VERSION,
+            "trials": trials,
+            "seed": seed,
+            "hands": hands
+        }, f, separators=(",", ":"))
+
+    print(f"Tabla guardada en {path} ({time.time() - start_time:.1f}s)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Genera la tabla de equity preflop')
+    parser.add_argument('--trials', '-n', type=int, default=1000000,
+                        help='Repartos simulados por clase de mano (default: 1000000)')
+    parser.add_argument('--seed', '-s', type=int, default=2024,
+                        help='Semilla de la simulacion (default: 2024)')
+    parser.add_argument('--output', '-o', default=TABLE_PATH,
+                        help='Ruta del archivo de salida')
+
+    args = parser.parse_args()
+
+    build_table(args.trials, args.seed, args.output)
@@ -0,0 +1,14 @@
+"""
+Motor de cálculo de Texas Hold'em
+---------------------------------
+Paquete con la lógica de evaluación de manos y cálculo de probabilidades,
+independiente de la interfaz gráfica: no importa tkinter ni openai, y NumPy
+solo se carga cuando se usa el simulador vectorizado, el mapa de carta
+siguiente o la equity entre rangos.
+"""
+
+from holdem.engine import (compute_equity, compute_next_card_equity, compute_range_equity,
+                           parse_cards)
+from holdem.equity import CalculationCancelled, EquityResult
+from holdem.evaluator import HAND_CATEGORIES, evaluate, evaluate_hand, hand_name
+from holdem.ranges import parse_range
@@ -0,0 +1,258 @@
+"""
+Cálculo de equity por lotes
+---------------------------
+Procesa grandes volúmenes de situaciones (por ejemplo, manos extraídas de
+historiales) leídas de archivos JSONL o CSV, en memoria acotada:
+
+- Las situaciones se leen y se escriben en streaming, por bloques.
+- Dentro de cada bloque, las situaciones equivalentes por palo (misma forma
+  canónica, ver holdem.canonical) se calculan una sola vez.
+- Los cálculos de cada bloque se reparten entre los procesos de un EquityPool.
+
+Cada situación tiene los campos "hole", "board", "opponents", "dead"
+(también "dead_cards") y "known" (manos conocidas de algunos oponentes,
+incluidos en "opponents"); las cartas pueden escribirse como lista o como
+cadena ("AhKh", "Ah Kh"). El resto de campos se conserva en la salida.
+Una línea o situación no válida no detiene el lote: su fila de salida
+lleva el motivo en la columna "error".
+"""
+
+import csv
+import json
+import sys
+import time
+import zlib
+from itertools import islice
+
+from holdem.canonical import canonical_key
+from holdem.disk_cache import key_to_text
+from holdem.engine import check_situation, parse_cards, parse_hands
+from holdem.equity import calculate_equity
+from holdem.parallel import EquityPool
+
+# Situaciones leídas y resueltas a la vez
+CHUNK_SIZE = 2000
+
+# Columnas de la situación y columnas añadidas a cada una en la salida
+SITUATION_FIELDS = ["hole", "board", "opponents", "dead", "known"]
+RESULT_FIELDS = ["equity", "win_rate", "tie_rate", "half_width", "trials", "exact", "error"]
+
+# Columna CSV con los campos adicionales que no están en la cabecera (JSON)
+EXTRA_FIELD = "extra"
+
+
+class InvalidSituation(dict):
+    """Línea de entrada que no se ha podido leer como situación"""
+
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+
+def read_situations(path, format=None):
+    """
+    Lee situaciones de un archivo JSONL o CSV una a una.
+
+    Args:
+        path (str): Ruta del archivo ("-" para la entrada estándar)
+        format (str): "jsonl" o "csv"; por defecto según la extensión
+
+    Yields:
+        dict: Campos de cada situación tal y como aparecen en el archivo, o
+        InvalidSituation si una línea JSONL no es un objeto JSON válido
+    """
+    format = format or _format_for(path)
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if format == "csv":
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    situation = json.loads(line)
+                except ValueError as e:
+                    yield InvalidSituation(f"Línea {number}: JSON no válido ({e})")
+                    continue
+                if isinstance(situation, dict):
+                    yield situation
+                else:
+                    yield InvalidSituation(f"Línea {number}: se esperaba un objeto JSON")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def write_results(items, path, format=None):
+    """
+    Escribe las situaciones con sus resultados a medida que se reciben.
+
+    En CSV la cabecera es fija: SITUATION_FIELDS, los demás campos de la
+    primera situación y RESULT_FIELDS; los campos adicionales de otras
+    situaciones que no están en ella se guardan como JSON en la columna
+    EXTRA_FIELD, de modo que no se pierde ningún dato.
+
+    Args:
+        items: Pares (situación, fila de resultado) como los de batch_equity
+        path (str): Ruta del archivo ("-" para la salida estándar)
+        format (str): "jsonl" o "csv"; por defecto según la extensión
+    """
+    format = format or _format_for(path)
+    f = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+    try:
+        writer = None
+        fields = None
+        for situation, result in items:
+            row = dict(situation, **result)
+            if format == "csv":
+                if writer is None:
+                    fields = SITUATION_FIELDS + [name for name in situation
+                                                 if name not in SITUATION_FIELDS + RESULT_FIELDS]
+                    fields += RESULT_FIELDS + [EXTRA_FIELD]
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writeheader()
+                extra = {name: row.pop(name) for name in list(row) if name not in fields}
+                if extra:
+                    row[EXTRA_FIELD] = json.dumps(extra, ensure_ascii=False)
+                writer.writerow({name: _csv_value(value) for name, value in row.items()})
+            else:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def situation_cards(situation):
+    """
+    Extrae y valida las cartas de una situación.
+
+    Returns:
+        tuple: (mano, mesa, número de oponentes, cartas muertas, manos
+        conocidas) con enteros
+
+    Raises:
+        ValueError: Si la situación no es válida
+    """
+    hole = parse_cards(situation.get("hole") or [])
+    board = parse_cards(situation.get("board") or [])
+    dead = parse_cards(situation.get("dead") or situation.get("dead_cards") or [])
+    known = parse_hands(situation.get("known") or [])
+    opponents = int(situation.get("opponents") or max(len(known), 1))
+
+    check_situation(hole, board, opponents, dead, known)
+    return hole, board, opponents, dead, known
+
+
+def batch_equity(situations, trials=10000, exact=None, seed=None, pool=None, workers=None,
+                 chunk_size=CHUNK_SIZE, stats=None):
+    """
+    Calcula la equity de una secuencia de situaciones.
+
+    Con semilla, cada situación usa una semilla derivada de su forma canónica,
+    de modo que el resultado no depende del tamaño de bloque ni del número de
+    procesos.
+
+    Args:
+        situations: Iterable de diccionarios (ver read_situations)
+        trials (int): Repartos de Monte Carlo por situación
+        exact (bool): Forzar enumeración exacta o Monte Carlo (None = automático)
+        seed (int): Semilla base para resultados reproducibles
+        pool (EquityPool): Pool de procesos; si no se indica se crea uno temporal
+        workers (int): Procesos del pool temporal (por defecto, uno por núcleo)
+        chunk_size (int): Situaciones leídas y resueltas a la vez
+        stats (dict): Si se indica, se actualiza con los contadores del lote
+
+    Yields:
+        tuple: (situación, fila de resultado) en el orden de entrada
+    """
+    if stats is None:
+        stats = {}
+    stats.update(situations=0, unique=0, errors=0, elapsed=0.0)
+    start_time = time.perf_counter()
+
+    own_pool = pool is None
+    if own_pool:
+        pool = EquityPool(workers)
+    try:
+        situations = iter(situations)
+        while True:
+            chunk = list(islice(situations, chunk_size))
+            if not chunk:
+                break
+
+            rows = [None] * len(chunk)
+            tasks = {}  # clave canónica -> (tarea, índices de las situaciones)
+            for index, situation in enumerate(chunk):
+                if isinstance(situation, InvalidSituation):
+                    rows[index] = {"error": situation.error}
+                    stats["errors"] += 1
+                    continue
+                try:
+                    hole, board, opponents, dead, known = situation_cards(situation)
+                except (ValueError, TypeError) as e:
+                    rows[index] = {"error": str(e)}
+                    stats["errors"] += 1
+                    continue
+                key = canonical_key(hole, board, opponents, dead, known)
+                if key not in tasks:
+                    tasks[key] = ((hole, board, opponents, dead, known, trials, exact,
+                                   _situation_seed(seed, key)), [])
+                tasks[key][1].append(index)
+
+            chunksize = max(1, len(tasks) // (pool.workers * 4))
+            results = pool.map(_solve, [task for task, _ in tasks.values()], chunksize=chunksize)
+            for (_, indexes), result in zip(tasks.values(), results):
+                if "error" in result:
+                    stats["errors"] += len(indexes)
+                for index in indexes:
+                    rows[index] = result
+
+            stats["situations"] += len(chunk)
+            stats["unique"] += len(tasks)
+            stats["elapsed"] = time.perf_counter() - start_time
+            yield from zip(chunk, rows)
+    finally:
+        if own_pool:
+            pool.shutdown()
+        stats["elapsed"] = time.perf_counter() - start_time
+
+
+def _situation_seed(seed, key):
+    """Deriva una semilla reproducible (no negativa, como exige NumPy) para
+    una situación canónica"""
+    if seed is None:
+        return None
+    return (seed * 2 ** 32 + zlib.crc32(key_to_text(key).encode("utf-8"))) % 2 ** 64
+
+
+def _solve(task):
+    """Calcula una situación (se ejecuta en un worker) y devuelve su fila de
+    resultado; un fallo inesperado se devuelve como error de esa situación"""
+    hole, board, opponents, dead, known, trials, exact, seed = task
+    try:
+        result = calculate_equity(hole, board, opponents, trials, exact=exact, seed=seed, dead=dead,
+                                  known=known)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {
+        "equity": round(result.equity, 6),
+        "win_rate": round(result.win_rate, 6),
+        "tie_rate": round(result.tie_rate, 6),
+        "half_width": 0.0 if result.exact else round(result.half_width(), 6),
+        "trials": result.trials,
+        "exact": result.exact
+    }
+
+
+def _csv_value(value):
+    """Valor de una celda CSV: las listas de cartas o manos se unen con espacios"""
+    if isinstance(value, list):
+        return " ".join(_csv_value(item) for item in value)
+    return value
+
+
+def _format_for(path):
+    """Deduce el formato por la extensión del archivo (JSONL por defecto)"""
+    return "csv" if str(path).lower().endswith(".csv") else "jsonl"
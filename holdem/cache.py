@@ -0,0 +1,159 @@
+"""
+Caché de resultados de equity
+-----------------------------
+Memoización acotada (LRU con caducidad opcional) delante del motor de
+equity, con la forma canónica de cada situación como clave
+(ver holdem.canonical) y contadores de aciertos, fallos y desalojos. Los
+datos por carta siguiente se guardan en los palos de la forma canónica y se
+devuelven en los de la situación pedida.
+Opcionalmente se apoya en un almacén persistente en disco
+(holdem.disk_cache.PersistentEquityCache).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from holdem.canonical import canonical_key, invert_permutation, suit_permutation
+from holdem.equity import adaptive_equity, calculate_equity
+
+
+class EquityCache:
+    """Caché LRU/TTL de objetos EquityResult indexada por situación canónica"""
+
+    def __init__(self, maxsize=4096, ttl=None, store=None):
+        """
+        Args:
+            maxsize (int): Número máximo de situaciones guardadas
+            ttl (float): Segundos de validez de cada entrada (None = sin límite)
+            store (PersistentEquityCache): Almacén en disco consultado cuando
+                una situación no está en memoria
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self._entries = OrderedDict()  # clave -> (instante de guardado, resultado)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Devuelve el resultado guardado para la clave, o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        """Guarda un resultado, desalojando el menos usado si se supera el tamaño"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Devuelve los contadores de uso de la caché"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "store_hits": self.store_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def equity(self, hole, board, opponents, trials=1000, dead=(), known=(), **kwargs):
+        """
+        Calcula la equity con holdem.equity.calculate_equity, reutilizando
+        el resultado guardado de cualquier situación equivalente.
+
+        Un resultado guardado solo se reutiliza si es exacto, si alcanza la
+        precisión pedida (target_half_width) o, sin precisión pedida, si se
+        obtuvo con al menos `trials` repartos. Si el almacén en disco tiene una
+        estimación insuficiente, solo se simulan los repartos que faltan y se
+        acumulan a ella. Los argumentos adicionales se pasan a calculate_equity.
+
+        Returns:
+            EquityResult: Copia del resultado (puede modificarse libremente)
+        """
+        key = canonical_key(hole, board, opponents, dead, known)
+        # Las entradas guardan los palos canónicos; to_real los devuelve a
+        # los de esta situación
+        to_canonical = suit_permutation([hole, board, dead], known)
+        to_real = invert_permutation(to_canonical)
+        target = kwargs.get("target_half_width")
+        cached = self.get(key)
+        if cached is not None and _satisfies(cached, trials, target):
+            with self._lock:
+                self.hits += 1
+            return cached.permute_suits(to_real)
+
+        # La tabla preflop ya es persistente: no se duplica en disco
+        persist = self.store is not None and (board or dead or known
+                                              or not kwargs.get("preflop_table", True))
+        stored = self.store.get(key) if persist else None
+        if stored is not None and _satisfies(stored, trials, target):
+            with self._lock:
+                self.store_hits += 1
+            self.put(key, stored)
+            return stored.permute_suits(to_real)
+
+        with self._lock:
+            self.misses += 1
+        previous = stored if stored is not None else cached
+        if previous is not None:
+            previous = previous.permute_suits(to_real)
+        if previous is not None and target is not None:
+            # Afinar la estimación guardada hasta la precisión pedida
+            options = {name: value for name, value in kwargs.items()
+                       if name in ("time_budget", "pool", "progress", "cancel")}
+            result = adaptive_equity(hole, board, opponents, target, max_trials=trials,
+                                     initial=previous, dead=dead, known=known, **options)
+        elif previous is not None:
+            # Afinar la estimación guardada con repartos nuevos e independientes
+            result = calculate_equity(hole, board, opponents, trials - previous.trials,
+                                      dead=dead, known=known, **dict(kwargs, seed=None))
+        else:
+            result = calculate_equity(hole, board, opponents, trials, dead=dead, known=known,
+                                      **kwargs)
+
+        if previous is not None and stored is None:
+            # La estimación previa solo estaba en memoria (el disco no tiene
+            # la situación): se suma antes de guardar para no perderla
+            result = previous.merge(result)
+        if persist:
+            result = self.store.add(key, result.permute_suits(to_canonical)).permute_suits(to_real)
+        self.put(key, result.permute_suits(to_canonical))
+        return result
+
+
+def _satisfies(result, trials, target_half_width):
+    """Indica si un resultado guardado cumple la precisión o los repartos pedidos"""
+    if result.exact:
+        return True
+    if target_half_width is not None:
+        return result.trials >= 2 and result.half_width() <= target_half_width
+    return result.trials >= trials
@@ -0,0 +1,82 @@
+"""
+Forma canónica de situaciones de Texas Hold'em
+----------------------------------------------
+Dos situaciones que solo difieren en una permutación de los palos (por
+ejemplo AsKs en 2h7h9c y AhKh en 2s7s9c) o en el orden de las cartas tienen
+exactamente la misma equity. canonical_key() devuelve la misma clave para
+todas ellas, lo que permite compartir resultados en cachés.
+"""
+
+from itertools import permutations
+
+# Las 24 permutaciones de los 4 palos
+_SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def canonical_cards(groups, hands=()):
+    """
+    Aplica la permutación de palos que da la representación mínima.
+
+    Args:
+        groups (list): Listas de cartas enteras cuyo orden interno no importa
+            (mano, tablero, cartas muertas...)
+        hands (list): Manos de dos cartas cuyo orden entre sí tampoco importa
+            (manos conocidas de los oponentes); se añaden como un grupo más
+            solo si hay alguna
+
+    Returns:
+        tuple: Una tupla ordenada por grupo, invariante ante permutaciones de
+        palos y ante el orden de las cartas dentro de cada grupo
+    """
+    return _canonical(groups, hands)[0]
+
+
+def suit_permutation(groups, hands=()):
+    """
+    Devuelve la permutación de palos que aplica canonical_cards (mismos
+    argumentos), para traducir entre los palos reales y los canónicos.
+
+    Returns:
+        tuple: perm[palo real] = palo canónico (palos 0-3 en el orden "cdhs")
+    """
+    return _canonical(groups, hands)[1]
+
+
+def invert_permutation(perm):
+    """Permutación inversa de una permutación de palos"""
+    inverse = [0] * len(perm)
+    for suit, target in enumerate(perm):
+        inverse[target] = suit
+    return tuple(inverse)
+
+
+def _canonical(groups, hands):
+    """Representación mínima y la permutación que la produce"""
+    best, best_perm = None, None
+    for perm in _SUIT_PERMUTATIONS:
+        candidate = tuple(tuple(sorted((card & ~3) | perm[card & 3] for card in group))
+                          for group in groups)
+        if hands:
+            candidate += (tuple(sorted(tuple(sorted((card & ~3) | perm[card & 3] for card in hand))
+                                       for hand in hands)),)
+        if best is None or candidate < best:
+            best, best_perm = candidate, perm
+    return best, best_perm
+
+
+def canonical_key(hole, board, opponents, dead=(), known=()):
+    """
+    Obtiene la clave canónica de una situación.
+
+    Args:
+        hole (list): Las dos cartas del jugador como enteros
+        board (list): Cartas comunitarias conocidas
+        opponents (int): Número de oponentes
+        dead (list): Cartas fuera del mazo
+        known (list): Manos conocidas de algunos oponentes
+
+    Returns:
+        tuple: (mano, tablero, cartas muertas[, manos conocidas], oponentes)
+        en forma canónica
+    """
+    return canonical_cards([hole, board, dead], known) + (opponents,)
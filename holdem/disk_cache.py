@@ -0,0 +1,188 @@
+"""
+Caché persistente de equity en SQLite
+-------------------------------------
+Guarda en disco los resultados por situación canónica (ver holdem.canonical)
+para compartirlos entre ejecuciones y entre procesos. Los resultados de
+Monte Carlo de una misma situación se acumulan: cada nuevo cálculo añade
+sus repartos a los ya guardados, afinando el intervalo de confianza.
+
+La base de datos usa el modo WAL de SQLite, que permite varios lectores y un
+escritor concurrentes desde distintos procesos. La conexión se abre en el
+primer uso y nunca se carga la caché completa en memoria.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from holdem.equity import EquityResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS equity (
+    key TEXT PRIMARY KEY,
+    wins INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    share REAL NOT NULL,
+    share_sq REAL NOT NULL,
+    hand_counts TEXT NOT NULL,
+    exact INTEGER NOT NULL,
+    details TEXT,
+    updated REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS equity_last_access ON equity (last_access);
+"""
+
+# Cada cuántas inserciones se comprueba el límite de tamaño
+_EVICTION_CHECK_INTERVAL = 100
+
+
+def key_to_text(key):
+    """Serializa una clave canónica para usarla como clave primaria"""
+    return json.dumps(key, separators=(",", ":"))
+
+
+class PersistentEquityCache:
+    """Almacén de resultados de equity en un archivo SQLite"""
+
+    def __init__(self, path, max_entries=100000, timeout=30.0):
+        """
+        Args:
+            path (str): Ruta del archivo de la base de datos
+            max_entries (int): Número máximo de situaciones; al superarlo se
+                eliminan las de acceso más antiguo
+            timeout (float): Segundos de espera si otro proceso tiene el bloqueo
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self.evictions = 0
+
+    def _connect(self):
+        """Abre la conexión (solo la primera vez) y crea el esquema si falta"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            # Las bases de datos anteriores no tienen la columna de detalles
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(equity)")}
+            if "details" not in columns:
+                connection.execute("ALTER TABLE equity ADD COLUMN details TEXT")
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM equity").fetchone()[0]
+
+    def get(self, key):
+        """Devuelve el resultado guardado para una clave canónica, o None"""
+        with self._lock:
+            connection = self._connect()
+            text = key_to_text(key)
+            row = connection.execute(
+                "SELECT wins, ties, losses, share, share_sq, hand_counts, exact, details "
+                "FROM equity WHERE key = ?", (text,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE equity SET last_access = ? WHERE key = ?",
+                               (time.time(), text))
+        return _row_to_result(row)
+
+    def add(self, key, result):
+        """
+        Añade un resultado a la entrada de la clave y devuelve el acumulado.
+
+        Los resultados de Monte Carlo se suman a los ya guardados; un resultado
+        exacto sustituye a cualquier estimación y nunca es sustituido por una.
+
+        Args:
+            key (tuple): Clave canónica de la situación
+            result (EquityResult): Repartos nuevos, no incluidos todavía
+
+        Returns:
+            EquityResult: Resultado acumulado tras la actualización
+        """
+        text = key_to_text(key)
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT wins, ties, losses, share, share_sq, hand_counts, exact, details "
+                    "FROM equity WHERE key = ?", (text,)).fetchone()
+                if row is not None:
+                    stored = _row_to_result(row)
+                    if stored.exact:
+                        merged = stored
+                    elif result.exact:
+                        merged = result.copy()
+                    else:
+                        merged = stored.merge(result)
+                else:
+                    merged = result.copy()
+                    self._inserts += 1
+
+                now = time.time()
+                connection.execute(
+                    "INSERT OR REPLACE INTO equity (key, wins, ties, losses, share, share_sq, "
+                    "hand_counts, exact, details, updated, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (text, merged.wins, merged.ties, merged.losses, merged.share, merged.share_sq,
+                     json.dumps(merged.hand_counts), int(merged.exact), _details_to_text(merged),
+                     now, now))
+
+                if self._inserts >= _EVICTION_CHECK_INTERVAL:
+                    self._inserts = 0
+                    self._evict(connection)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return merged
+
+    def _evict(self, connection):
+        """Elimina las entradas de acceso más antiguo que superen el límite"""
+        count = connection.execute("SELECT COUNT(*) FROM equity").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM equity WHERE key IN "
+                "(SELECT key FROM equity ORDER BY last_access LIMIT ?)", (excess,))
+            self.evictions += excess
+
+
+def _details_to_text(result):
+    """Serializa el desglose por categoría y por carta siguiente de un resultado"""
+    return json.dumps({
+        "category_share": result.category_share,
+        "card_trials": result.card_trials,
+        "card_share": result.card_share
+    }, separators=(",", ":"))
+
+
+def _row_to_result(row):
+    """Convierte una fila de la tabla en un EquityResult"""
+    wins, ties, losses, share, share_sq, hand_counts, exact, details = row
+    result = EquityResult(wins=wins, ties=ties, losses=losses, share=share, share_sq=share_sq,
+                          hand_counts=json.loads(hand_counts), exact=bool(exact))
+    if details:
+        details = json.loads(details)
+        result.category_share = details["category_share"]
+        result.card_trials = details["card_trials"]
+        result.card_share = details["card_share"]
+    return result
@@ -0,0 +1,213 @@
+"""
+API del motor de equity
+-----------------------
+Punto de entrada sin estado para calcular la equity de una situación. No
+depende de tkinter ni de openai, de modo que puede usarse desde scripts,
+servicios o procesos de cálculo sin pantalla.
+
+Ejemplo:
+    from holdem import compute_equity, compute_range_equity
+    result = compute_equity(["Ah", "Kh"], ["2h", "7h", "9c"], opponents=2, seed=1)
+    print(result.equity, result.confidence_interval())
+    print(compute_range_equity("AhKh", "QQ+, AKs, 50% of AQo", "2h7h9c").equity)
+"""
+
+from holdem.equity import calculate_equity
+from holdem.evaluator import CARD_TO_INT, int_to_card
+
+MAX_OPPONENTS = 9
+
+
+def parse_cards(cards):
+    """
+    Convierte cartas a enteros 0-51.
+
+    Args:
+        cards: Lista de cartas en texto ("Ah") o enteros, o una cadena con las
+            cartas seguidas o separadas por espacios ("AhKh", "Ah Kh")
+
+    Returns:
+        list: Cartas como enteros
+
+    Raises:
+        ValueError: Si alguna carta no es válida
+    """
+    if isinstance(cards, str):
+        text = cards.replace(" ", "").replace(",", "")
+        cards = [text[i:i + 2] for i in range(0, len(text), 2)]
+
+    parsed = []
+    for card in cards:
+        if isinstance(card, int):
+            if not 0 <= card < 52:
+                raise ValueError(f"Carta fuera de rango: {card}")
+            parsed.append(card)
+        else:
+            value = CARD_TO_INT.get(card[:1].upper() + card[1:].lower())
+            if value is None:
+                raise ValueError(f"Carta no válida: {card!r}")
+            parsed.append(value)
+    return parsed
+
+
+def parse_hands(hands):
+    """
+    Convierte una lista de manos de dos cartas a enteros.
+
+    Args:
+        hands: Lista de manos (cada una como en parse_cards) o una cadena con
+            todas las cartas seguidas ("AsAd KcKd")
+
+    Returns:
+        list: Manos como listas de dos enteros
+
+    Raises:
+        ValueError: Si alguna carta no es válida o una mano no tiene 2 cartas
+    """
+    if isinstance(hands, str):
+        cards = parse_cards(hands)
+        hands = [cards[i:i + 2] for i in range(0, len(cards), 2)]
+    else:
+        hands = [parse_cards(hand) for hand in hands]
+    if any(len(hand) != 2 for hand in hands):
+        raise ValueError("Cada mano conocida debe tener exactamente 2 cartas")
+    return hands
+
+
+def check_situation(hole, board, opponents, dead=(), known=()):
+    """
+    Comprueba que una situación (con cartas ya convertidas a enteros) es válida.
+
+    Raises:
+        ValueError: Si el número de cartas u oponentes no es válido, hay
+            cartas repetidas o no quedan cartas suficientes para repartir
+    """
+    dead = list(dead) + [card for hand in known for card in hand]
+    if len(hole) != 2:
+        raise ValueError("La mano debe tener exactamente 2 cartas")
+    if len(board) > 5:
+        raise ValueError("La mesa no puede tener más de 5 cartas")
+    if len(set(hole + board + dead)) != len(hole) + len(board) + len(dead):
+        raise ValueError("Hay cartas repetidas")
+    if not 1 <= opponents <= MAX_OPPONENTS:
+        raise ValueError(f"El número de oponentes debe estar entre 1 y {MAX_OPPONENTS}")
+    if len(known) > opponents:
+        raise ValueError("Hay más manos conocidas que oponentes")
+    if 52 - len(hole) - len(board) - len(dead) < 5 - len(board) + 2 * (opponents - len(known)):
+        raise ValueError("No quedan cartas suficientes para repartir")
+
+
+def compute_equity(hole, board=(), opponents=1, dead_cards=(), trials=None, exact=None,
+                   seed=None, target_half_width=None, time_budget=None,
+                   cache=None, pool=None, progress=None, cancel=None, known_hands=()):
+    """
+    Calcula la equity de una mano contra oponentes con manos aleatorias o
+    conocidas.
+
+    Args:
+        hole: Las dos cartas del jugador (ver parse_cards)
+        board: Cartas comunitarias conocidas (0-5)
+        opponents (int): Número total de oponentes (1-9), incluidos los de
+            mano conocida
+        dead_cards: Cartas fuera del mazo (descartadas o vistas)
+        trials (int): Repartos de Monte Carlo; con precisión o tiempo indicados
+            es el máximo (por defecto 1000, o 1000000 en modo adaptativo)
+        exact (bool): Forzar enumeración exacta (True) o Monte Carlo (False);
+            con None se elige según el tamaño del espacio de combinaciones
+        seed (int): Semilla para resultados reproducibles
+        target_half_width (float): Precisión objetivo (semiamplitud al 95%)
+        time_budget (float): Segundos máximos de simulación
+        cache (holdem.cache.EquityCache): Caché de resultados a usar
+        pool (holdem.parallel.EquityPool): Pool de procesos a usar
+        progress (callable): Recibe estimaciones parciales (modo adaptativo)
+        cancel (threading.Event): Evento para interrumpir el cálculo
+        known_hands: Manos conocidas de algunos oponentes (ver parse_hands),
+            por ejemplo en un all-in con las cartas descubiertas
+
+    Returns:
+        EquityResult: Resultado con equity, victorias, empates y precisión
+
+    Raises:
+        ValueError: Si las cartas o el número de oponentes no son válidos
+    """
+    hole = parse_cards(hole)
+    board = parse_cards(board)
+    dead = parse_cards(dead_cards)
+    known = parse_hands(known_hands)
+
+    check_situation(hole, board, opponents, dead, known)
+
+    adaptive = target_half_width is not None or time_budget is not None
+    if trials is None:
+        trials = 1000000 if adaptive else 1000
+
+    options = {"exact": exact, "seed": seed, "pool": pool, "progress": progress, "cancel": cancel}
+    if adaptive:
+        options.update(target_half_width=target_half_width, time_budget=time_budget)
+    if cache is not None:
+        return cache.equity(hole, board, opponents, trials, dead=dead, known=known, **options)
+    return calculate_equity(hole, board, opponents, trials, dead=dead, known=known, **options)
+
+
+def compute_next_card_equity(hole, board=(), opponents=1, dead_cards=(), known_hands=(),
+                             trials=None, exact=None, seed=None, cancel=None):
+    """
+    Calcula la equity del jugador para cada posible siguiente carta
+    comunitaria en una sola pasada (ver holdem.next_card; necesita NumPy).
+
+    Args:
+        hole, board, opponents, dead_cards, known_hands: Como en compute_equity
+            (la mesa debe tener como mucho 4 cartas)
+        trials (int): Repartos compartidos por todas las cartas en Monte Carlo
+        exact (bool): Forzar enumeración (True) o Monte Carlo (False)
+        seed (int): Semilla para resultados reproducibles
+        cancel (threading.Event): Evento para interrumpir el cálculo
+
+    Returns:
+        dict: {carta en texto: EquityResult}
+
+    Raises:
+        ValueError: Si las cartas o el número de oponentes no son válidos
+    """
+    from holdem.next_card import NEXT_CARD_TRIALS, next_card_equities
+
+    hole = parse_cards(hole)
+    board = parse_cards(board)
+    dead = parse_cards(dead_cards)
+    known = parse_hands(known_hands)
+    check_situation(hole, board, opponents, dead, known)
+
+    results = next_card_equities(hole, board, opponents, trials or NEXT_CARD_TRIALS, seed,
+                                 dead, known, exact=exact, cancel=cancel)
+    return {int_to_card(card): result for card, result in results.items()}
+
+
+def compute_range_equity(hero, villain, board=(), dead_cards=(), seed=None, cancel=None):
+    """
+    Calcula la equity de una mano o un rango contra el rango de un oponente
+    (ver holdem.range_equity; necesita NumPy).
+
+    Args:
+        hero: Mano o rango del jugador en notación estándar ("AhKh", "QQ+, AKs")
+            o como diccionario {combinación: peso}
+        villain: Rango del oponente, en el mismo formato
+        board: Cartas comunitarias conocidas (0-5, ver parse_cards)
+        dead_cards: Cartas fuera del mazo
+        seed (int): Semilla del muestreo de tableros (solo preflop)
+        cancel (threading.Event): Evento para interrumpir el cálculo
+
+    Returns:
+        EquityResult: Resultado ponderado por los pesos de ambos rangos
+
+    Raises:
+        ValueError: Si las cartas o los rangos no son válidos
+    """
+    from holdem.range_equity import range_equity
+
+    board = parse_cards(board)
+    dead = parse_cards(dead_cards)
+    if len(board) > 5:
+        raise ValueError("La mesa no puede tener más de 5 cartas")
+    if len(set(board + dead)) != len(board) + len(dead):
+        raise ValueError("Hay cartas repetidas")
+    return range_equity(hero, villain, board, dead, seed=seed, cancel=cancel)
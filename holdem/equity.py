@@ -0,0 +1,553 @@
+"""
+Cálculo de equity en Texas Hold'em
+----------------------------------
+Calcula la equity de una mano contra oponentes con manos aleatorias, ya sea
+por simulación Monte Carlo o enumerando de forma exacta todos los repartos
+posibles cuando el espacio de combinaciones es pequeño (turn, river y algunos
+flops). Las cartas se representan como enteros (ver holdem.evaluator).
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass, field, replace
+from itertools import combinations
+from math import factorial
+
+from holdem.evaluator import HAND_CATEGORIES, evaluate_state, hand_category, hand_state, int_to_card
+
+# Tamaño máximo del espacio de combinaciones que se enumera de forma exacta
+# cuando el llamador no elige explícitamente el modo
+EXACT_THRESHOLD = 100000
+
+# Repartos del primer lote de la simulación adaptativa
+ADAPTIVE_MIN_TRIALS = 500
+
+# Mejora mínima de equity para considerar una carta como out
+OUT_MIN_GAIN = 0.1
+
+
+class CalculationCancelled(Exception):
+    """Se lanza cuando un cálculo se cancela antes de terminar"""
+
+
+@dataclass
+class EquityResult:
+    """
+    Resultado agregado de un conjunto de repartos simulados o enumerados.
+
+    Además de los totales guarda, en la misma pasada, el reparto de bote
+    según la categoría final de la mano del jugador y, si falta una calle
+    por salir tras el flop o el turn, los repartos y el bote obtenido según
+    cada posible carta siguiente (ver next_card_equity y outs).
+    """
+    wins: int = 0          # Repartos en los que el jugador gana solo
+    ties: int = 0          # Repartos en los que el jugador divide el bote
+    losses: int = 0        # Repartos en los que algún oponente gana
+    share: float = 0.0     # Suma de las fracciones de bote obtenidas
+    share_sq: float = 0.0  # Suma de los cuadrados de esas fracciones
+    hand_counts: list = field(default_factory=lambda: [0] * len(HAND_CATEGORIES))
+    exact: bool = False    # True si proviene de una enumeración completa
+    # Fracción de bote acumulada según la categoría final del jugador
+    category_share: list = field(default_factory=lambda: [0.0] * len(HAND_CATEGORIES))
+    # Repartos y fracción de bote según cada carta siguiente (vacías si no aplica)
+    card_trials: list = field(default_factory=list)
+    card_share: list = field(default_factory=list)
+
+    @property
+    def trials(self):
+        """Número total de repartos contabilizados"""
+        return self.wins + self.ties + self.losses
+
+    @property
+    def equity(self):
+        """Fracción esperada del bote (0-1), con los empates repartidos"""
+        return self.share / self.trials if self.trials else 0.0
+
+    @property
+    def win_rate(self):
+        """Fracción de repartos ganados sin dividir el bote"""
+        return self.wins / self.trials if self.trials else 0.0
+
+    @property
+    def tie_rate(self):
+        """Fracción de repartos en los que se divide el bote"""
+        return self.ties / self.trials if self.trials else 0.0
+
+    @property
+    def standard_error(self):
+        """Error estándar de la equity (0 si el resultado es exacto)"""
+        if self.exact or self.trials < 2:
+            return 0.0
+        variance = max(self.share_sq / self.trials - self.equity ** 2, 0.0)
+        return math.sqrt(variance / self.trials)
+
+    def half_width(self, z=1.96):
+        """Semiamplitud del intervalo de confianza (por defecto, al 95%)"""
+        return z * self.standard_error
+
+    def confidence_interval(self, z=1.96):
+        """Intervalo de confianza de la equity (por defecto, al 95%)"""
+        half_width = self.half_width(z)
+        return max(self.equity - half_width, 0.0), min(self.equity + half_width, 1.0)
+
+    @property
+    def most_common_hand(self):
+        """Categoría (en inglés) de la mano final más frecuente del jugador"""
+        return HAND_CATEGORIES[self.hand_counts.index(max(self.hand_counts))]
+
+    @property
+    def category_distribution(self):
+        """Frecuencia (0-1) de cada categoría final de la mano del jugador"""
+        total = sum(self.hand_counts)
+        return {name: count / total for name, count in zip(HAND_CATEGORIES, self.hand_counts)
+                if count} if total else {}
+
+    @property
+    def category_equity(self):
+        """Equity del jugador en los repartos que terminan en cada categoría"""
+        return {name: share / count
+                for name, count, share in zip(HAND_CATEGORIES, self.hand_counts, self.category_share)
+                if count}
+
+    @property
+    def next_card_equity(self):
+        """Equity del jugador según la siguiente carta comunitaria, {carta: equity}"""
+        return {int_to_card(card): share / trials
+                for card, (trials, share) in enumerate(zip(self.card_trials, self.card_share))
+                if trials}
+
+    def outs(self, min_gain=OUT_MIN_GAIN):
+        """
+        Cartas siguientes que mejoran la equity del jugador al menos `min_gain`.
+
+        Returns:
+            list: Pares (carta, equity) de mayor a menor equity
+        """
+        equity = self.equity
+        return sorted(((card, value) for card, value in self.next_card_equity.items()
+                       if value - equity >= min_gain), key=lambda item: -item[1])
+
+    def record(self, player_score, opponent_scores, weight=1, next_cards=()):
+        """
+        Contabiliza un reparto comparando la puntuación del jugador con las de
+        los oponentes.
+
+        Args:
+            player_score (int): Puntuación del jugador (holdem.evaluator)
+            opponent_scores (iterable): Puntuaciones de los oponentes
+            weight (int): Número de repartos equivalentes que representa
+            next_cards (list): Cartas comunitarias repartidas en este reparto
+                que cuentan como posible carta siguiente
+        """
+        category = hand_category(player_score)
+        self.hand_counts[category] += weight
+        tied = 0
+        share = 1.0
+        for score in opponent_scores:
+            if score > player_score:
+                share = 0.0
+                break
+            if score == player_score:
+                tied += 1
+        if not share:
+            self.losses += weight
+        elif tied:
+            share = 1 / (tied + 1)
+            self.ties += weight
+            self.share += weight * share
+            self.share_sq += weight * share ** 2
+        else:
+            self.wins += weight
+            self.share += weight
+            self.share_sq += weight
+        self.category_share[category] += weight * share
+        if next_cards:
+            self.record_next_cards(next_cards, weight, weight * share)
+
+    def record_next_cards(self, cards, trials, share):
+        """
+        Atribuye repartos y fracción de bote a cada carta siguiente posible.
+
+        Args:
+            cards (list): Cartas comunitarias repartidas en esos repartos
+            trials (int): Número de repartos
+            share (float): Fracción de bote obtenida en ellos
+        """
+        if not self.card_trials:
+            self.card_trials, self.card_share = [0] * 52, [0.0] * 52
+        for card in cards:
+            self.card_trials[card] += trials
+            self.card_share[card] += share
+
+    def permute_suits(self, perm):
+        """
+        Devuelve una copia con los datos por carta siguiente (card_trials y
+        card_share) pasados a otros palos, para guardarlos en la forma
+        canónica de holdem.canonical y recuperarlos en la de otra situación
+        equivalente.
+
+        Args:
+            perm (tuple): perm[palo] = palo de destino (ver suit_permutation)
+        """
+        result = self.copy()
+        if self.card_trials:
+            for card in range(52):
+                target = (card & ~3) | perm[card & 3]
+                result.card_trials[target] = self.card_trials[card]
+                result.card_share[target] = self.card_share[card]
+        return result
+
+    def copy(self):
+        """Devuelve una copia independiente del resultado"""
+        return replace(self, hand_counts=list(self.hand_counts),
+                       category_share=list(self.category_share),
+                       card_trials=list(self.card_trials), card_share=list(self.card_share))
+
+    def merge(self, other):
+        """Suma los contadores de otro resultado a este"""
+        self.wins += other.wins
+        self.ties += other.ties
+        self.losses += other.losses
+        self.share += other.share
+        self.share_sq += other.share_sq
+        self.hand_counts = [a + b for a, b in zip(self.hand_counts, other.hand_counts)]
+        self.category_share = [a + b for a, b in zip(self.category_share, other.category_share)]
+        if other.card_trials:
+            if not self.card_trials:
+                self.card_trials, self.card_share = [0] * 52, [0.0] * 52
+            self.card_trials = [a + b for a, b in zip(self.card_trials, other.card_trials)]
+            self.card_share = [a + b for a, b in zip(self.card_share, other.card_share)]
+        self.exact = self.exact and other.exact
+        return self
+
+
+def remaining_deck(*known_cards):
+    """Devuelve las cartas enteras que no aparecen en ninguna de las listas dadas"""
+    excluded = set()
+    for cards in known_cards:
+        excluded.update(cards)
+    return [card for card in range(52) if card not in excluded]
+
+
+def combination_count(board_size, deck_size, opponents):
+    """
+    Calcula el número de repartos distintos (tableros restantes por manos de
+    los oponentes, sin importar el orden de los oponentes).
+
+    Args:
+        board_size (int): Cartas comunitarias ya conocidas (0-5)
+        deck_size (int): Cartas que quedan en el mazo
+        opponents (int): Número de oponentes con manos desconocidas
+    """
+    missing = 5 - board_size
+    rest = deck_size - missing
+    hole_cards = 2 * opponents
+    if rest < hole_cards:
+        return 0
+    boards = factorial(deck_size) // (factorial(missing) * factorial(rest))
+    opponent_sets = factorial(rest) // (factorial(rest - hole_cards) * 2 ** opponents * factorial(opponents))
+    return boards * opponent_sets
+
+
+def monte_carlo_equity(hole, board, opponents, trials=1000, rng=random, dead=(), known=()):
+    """
+    Estima la equity por simulación Monte Carlo.
+
+    Args:
+        hole (list): Las dos cartas del jugador
+        board (list): Cartas comunitarias conocidas (0-5)
+        opponents (int): Número total de oponentes
+        trials (int): Número de repartos a simular
+        rng (random.Random): Generador de números aleatorios
+        dead (list): Cartas fuera del mazo (descartadas o vistas)
+        known (list): Manos conocidas de algunos oponentes (listas de dos
+            cartas); solo se reparten las manos de los demás
+
+    Returns:
+        EquityResult: Resultado de la simulación
+    """
+    result = EquityResult()
+    known = [list(hand) for hand in known]
+    deck = remaining_deck(hole, board, dead, *known)
+
+    # Cartas comunitarias restantes a repartir
+    missing = 5 - len(board)
+    unknown = min(opponents - len(known), (len(deck) - missing) // 2)
+    cards_needed = missing + 2 * unknown
+    next_street = tracks_next_card(board)
+
+    # Estado de las cartas fijas, calculado una sola vez: en cada reparto solo
+    # se añaden las cartas comunitarias que faltan y las manos repartidas
+    board_state = hand_state(board)
+    player_state = hand_state(hole, board_state)
+    known_states = [hand_state(hand, board_state) for hand in known]
+
+    for _ in range(trials):
+        # Repartir solo las cartas necesarias para esta simulación
+        dealt = rng.sample(deck, cards_needed)
+        runout = dealt[:missing]
+        common = hand_state(runout, board_state)
+
+        # Comparar la mano del jugador con la de cada oponente
+        player_score = evaluate_state(player_state, runout)
+        opponent_scores = [evaluate_state(state, runout) for state in known_states]
+        opponent_scores.extend(evaluate_state(common, dealt[i:i + 2])
+                               for i in range(missing, cards_needed, 2))
+        result.record(player_score, opponent_scores,
+                      next_cards=runout if next_street else ())
+
+    return result
+
+
+def adaptive_equity(hole, board, opponents, target_half_width=0.005, time_budget=None,
+                    max_trials=1000000, z=1.96, seed=None, pool=None, initial=None,
+                    progress=None, cancel=None, dead=(), known=()):
+    """
+    Simula por lotes hasta alcanzar la precisión o el tiempo indicados.
+
+    Tras cada lote se recalcula el error estándar y se estima cuántos repartos
+    faltan para que la semiamplitud del intervalo de confianza baje de
+    `target_half_width`; el siguiente lote se dimensiona con esa estimación
+    (como mucho el doble de lo ya simulado) y con la velocidad observada si
+    hay límite de tiempo. Sin precisión objetivo cada lote dobla lo simulado
+    y solo paran el tiempo o `max_trials`.
+
+    Args:
+        hole (list): Las dos cartas del jugador
+        board (list): Cartas comunitarias conocidas (0-5)
+        opponents (int): Número total de oponentes
+        target_half_width (float): Semiamplitud objetivo (0.005 = ±0.5%; None
+            = sin objetivo)
+        time_budget (float): Segundos máximos de cálculo (None = sin límite)
+        max_trials (int): Número máximo de repartos
+        z (float): Cuantil normal del intervalo (1.96 = 95%)
+        seed (int): Semilla de la simulación
+        pool (holdem.parallel.EquityPool): Pool de procesos para cada lote
+        initial (EquityResult): Resultado previo de la misma situación que
+            cuenta para el criterio de parada pero no se incluye en el resultado
+        progress (callable): Función que recibe una copia de la estimación
+            acumulada (incluido `initial`) tras cada lote
+        cancel (threading.Event): Si se activa, el cálculo se interrumpe
+            lanzando CalculationCancelled
+        dead (list): Cartas fuera del mazo (descartadas o vistas)
+        known (list): Manos conocidas de algunos oponentes
+
+    Returns:
+        EquityResult: Repartos simulados; consultar trials y
+        confidence_interval() para conocer la precisión alcanzada
+    """
+    start_time = time.monotonic()
+    sample = _batch_sampler(hole, board, opponents, seed, pool, dead, known)
+    result = EquityResult()
+    combined = initial.copy() if initial is not None else EquityResult()
+    batch = ADAPTIVE_MIN_TRIALS
+
+    while result.trials < max_trials:
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled()
+        batch_start = time.monotonic()
+        batch = min(batch, max_trials - result.trials)
+        partial = sample(batch)
+        result.merge(partial)
+        combined.merge(partial)
+        if progress is not None:
+            progress(combined.copy())
+
+        batch = 2 * combined.trials
+        if target_half_width:
+            # Sin variación observada (todo victorias o todo derrotas) el error
+            # estándar es 0; se acota con la regla del tres
+            precision = combined.half_width(z) or 3 / combined.trials
+            if precision <= target_half_width:
+                break
+
+            # Repartos necesarios según la varianza observada
+            variance = max(combined.share_sq / combined.trials - combined.equity ** 2, 1e-6)
+            needed = math.ceil(variance * (z / target_half_width) ** 2) - combined.trials
+            batch = max(ADAPTIVE_MIN_TRIALS, min(needed, batch))
+
+        if time_budget is not None:
+            elapsed = time.monotonic() - start_time
+            remaining = time_budget - elapsed
+            if remaining <= 0:
+                break
+            rate = partial.trials / max(time.monotonic() - batch_start, 1e-6)
+            batch = max(ADAPTIVE_MIN_TRIALS, min(batch, int(rate * remaining)))
+
+    return result
+
+
+def _batch_sampler(hole, board, opponents, seed, pool, dead, known):
+    """Devuelve una función que simula lotes sucesivos e independientes"""
+    if pool is not None:
+        seeds = random.Random(seed)
+        return lambda size: pool.equity(hole, board, opponents, size, seeds.getrandbits(64),
+                                        dead=dead, known=known)
+
+    vectorized_equity = _load_vectorized()
+    if vectorized_equity is not None:
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        return lambda size: vectorized_equity(hole, board, opponents, size, rng, dead=dead, known=known)
+
+    rng = random.Random(seed)
+    return lambda size: monte_carlo_equity(hole, board, opponents, size, rng, dead=dead, known=known)
+
+
+def enumerate_equity(hole, board, opponents, cancel=None, dead=(), known=()):
+    """
+    Calcula la equity exacta recorriendo todos los tableros restantes y todas
+    las combinaciones de manos de los oponentes desconocidos.
+
+    Para cada tablero se evalúa una sola vez la mano del jugador, las manos
+    conocidas y cada posible mano de dos cartas; después se combinan esas
+    puntuaciones para todos los conjuntos de manos de los oponentes sin volver
+    a evaluar. Si se activa el evento `cancel`, se interrumpe lanzando
+    CalculationCancelled.
+
+    Returns:
+        EquityResult: Resultado exacto (exact=True)
+    """
+    result = EquityResult(exact=True)
+    known = [list(hand) for hand in known]
+    deck = remaining_deck(hole, board, dead, *known)
+    missing = 5 - len(board)
+    unknown = min(opponents - len(known), (len(deck) - missing) // 2)
+
+    next_street = tracks_next_card(board)
+
+    board_state = hand_state(board)
+    player_state = hand_state(hole, board_state)
+    known_states = [hand_state(hand, board_state) for hand in known]
+
+    for runout in combinations(deck, missing):
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled()
+        common = hand_state(runout, board_state)
+        player_score = evaluate_state(player_state, runout)
+        known_scores = [evaluate_state(state, runout) for state in known_states]
+        rest = [card for card in deck if card not in runout]
+        trials_before, share_before = result.trials, result.share
+
+        if unknown == 0:
+            result.record(player_score, known_scores)
+        elif unknown == 1:
+            for pair in combinations(rest, 2):
+                result.record(player_score, known_scores + [evaluate_state(common, pair)])
+        else:
+            # Puntuación y máscara de cartas de cada posible mano de oponente
+            hands = [((1 << a) | (1 << b), evaluate_state(common, (a, b)))
+                     for a, b in combinations(rest, 2)]
+            _record_opponent_sets(result, player_score, hands, len(known) + unknown, 0, 0,
+                                  known_scores)
+
+        # Los repartos de este tablero cuentan para cada una de sus cartas
+        if next_street:
+            result.record_next_cards(runout, result.trials - trials_before,
+                                     result.share - share_before)
+
+    return result
+
+
+def tracks_next_card(board):
+    """
+    Indica si se acumula la equity según la carta siguiente: solo en el flop
+    y el turn, cuando la siguiente calle es una única carta. En el flop se
+    atribuye cada reparto tanto al turn como al river, que son
+    intercambiables, así que la equity de cada carta es la que tendría el
+    jugador si saliera en el turn.
+    """
+    return len(board) in (3, 4)
+
+
+def _record_opponent_sets(result, player_score, hands, opponents, start, used, scores):
+    """Contabiliza cada conjunto (sin orden) de manos disjuntas de los oponentes"""
+    if len(scores) == opponents:
+        result.record(player_score, scores)
+        return
+    for i in range(start, len(hands)):
+        mask, score = hands[i]
+        if mask & used:
+            continue
+        scores.append(score)
+        _record_opponent_sets(result, player_score, hands, opponents, i + 1, used | mask, scores)
+        scores.pop()
+
+
+def calculate_equity(hole, board, opponents, trials=1000, exact=None,
+                     max_combinations=EXACT_THRESHOLD, seed=None, pool=None,
+                     preflop_table=True, target_half_width=None, time_budget=None,
+                     progress=None, cancel=None, dead=(), known=()):
+    """
+    Calcula la equity eligiendo entre enumeración exacta y Monte Carlo.
+
+    Sin cartas comunitarias, cartas muertas ni manos conocidas se consulta
+    primero la tabla preflop precalculada (holdem.preflop), salvo que se
+    desactive con preflop_table=False. Si se indica una precisión o un tiempo
+    máximo, la simulación es adaptativa (ver adaptive_equity) y `trials` pasa
+    a ser el máximo de repartos.
+
+    El modo Monte Carlo usa el pool de procesos si se indica uno, el simulador
+    vectorizado (holdem.vectorized) si NumPy está instalado y el simulador en
+    Python puro en caso contrario.
+
+    Args:
+        hole (list): Las dos cartas del jugador
+        board (list): Cartas comunitarias conocidas (0-5)
+        opponents (int): Número total de oponentes
+        trials (int): Repartos a simular si se usa Monte Carlo
+        exact (bool): Forzar enumeración (True) o simulación (False); con None
+            se enumera si el espacio no supera max_combinations
+        max_combinations (int): Límite para elegir la enumeración automáticamente
+        seed (int): Semilla para el modo Monte Carlo
+        pool (holdem.parallel.EquityPool): Pool de procesos para repartir la
+            simulación entre varios núcleos
+        preflop_table (bool): Usar la tabla preflop si no hay cartas comunitarias
+        target_half_width (float): Semiamplitud objetivo del intervalo al 95%
+        time_budget (float): Segundos máximos de simulación
+        progress (callable): Recibe las estimaciones parciales del modo adaptativo
+        cancel (threading.Event): Evento para interrumpir el cálculo
+        dead (list): Cartas fuera del mazo (descartadas o vistas)
+        known (list): Manos conocidas de algunos oponentes; con manos
+            conocidas el espacio de repartos suele ser lo bastante pequeño
+            para enumerarlo
+
+    Returns:
+        EquityResult: Resultado, con exact=True si se enumeró
+    """
+    if not board and not dead and not known and preflop_table and not exact:
+        from holdem.preflop import preflop_result
+        result = preflop_result(hole, opponents)
+        if result is not None:
+            return result
+
+    if exact is None:
+        deck_size = 52 - len(hole) - len(board) - len(dead) - 2 * len(known)
+        unknown = opponents - len(known)
+        exact = combination_count(len(board), deck_size, unknown) <= max_combinations
+    if exact:
+        return enumerate_equity(hole, board, opponents, cancel, dead, known)
+
+    if target_half_width is not None or time_budget is not None:
+        return adaptive_equity(hole, board, opponents, target_half_width, time_budget,
+                               trials, seed=seed, pool=pool, progress=progress, cancel=cancel,
+                               dead=dead, known=known)
+
+    if pool is not None:
+        return pool.equity(hole, board, opponents, trials, seed, dead=dead, known=known)
+
+    vectorized_equity = _load_vectorized()
+    if vectorized_equity is not None:
+        return vectorized_equity(hole, board, opponents, trials, seed, dead=dead, known=known)
+    return monte_carlo_equity(hole, board, opponents, trials, random.Random(seed), dead=dead,
+                              known=known)
+
+
+def _load_vectorized():
+    """Importa el simulador vectorizado bajo demanda (None si falta NumPy)"""
+    try:
+        from holdem.vectorized import vectorized_equity
+    except ImportError:
+        return None
+    return vectorized_equity
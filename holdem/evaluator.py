@@ -0,0 +1,305 @@
+"""
+Evaluador de manos de Texas Hold'em
+-----------------------------------
+Evalúa manos de 1 a 7 cartas representadas como enteros usando tablas de
+búsqueda precalculadas (al estilo de Cactus-Kev / two-plus-two).
+
+Cada carta es un entero 0-51 con ``carta = rango * 4 + palo``, donde el rango
+va de 0 (dos) a 12 (as) y el palo sigue el orden "cdhs".
+
+La puntuación devuelta es un entero totalmente ordenado: una puntuación mayor
+siempre corresponde a una mano mejor y dos manos empatan si y solo si sus
+puntuaciones son iguales. La categoría ocupa los bits altos y los rangos que
+deciden la mano (incluidos los kickers) los 20 bits bajos, a 4 bits por rango.
+
+Para evaluar muchas manos que comparten cartas (la mesa de una simulación o
+de un recorrido calle a calle) se puede calcular una vez el estado parcial de
+las cartas fijas con hand_state() y ampliarlo con las pocas cartas que
+cambian en cada mano con evaluate_state().
+"""
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+# Categorías de mano, indexadas por el valor devuelto por hand_category()
+HAND_CATEGORIES = ["High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+                   "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush"]
+
+HIGH_CARD, PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT = 0, 1, 2, 3, 4
+FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH = 5, 6, 7, 8, 9
+
+CATEGORY_SHIFT = 20
+
+# Conversión entre texto ("Ah") y enteros
+CARD_TO_INT = {f"{rank}{suit}": r * 4 + s
+               for r, rank in enumerate(RANKS) for s, suit in enumerate(SUITS)}
+INT_TO_CARD = {value: card for card, value in CARD_TO_INT.items()}
+
+# Claves por carta: el rango en base 5 (como mucho 4 cartas por rango) y el
+# palo en campos de 3 bits (como mucho 7 cartas por palo)
+_RANK_KEY = [5 ** (c >> 2) for c in range(52)]
+_SUIT_KEY = [1 << (3 * (c & 3)) for c in range(52)]
+_RANK_BIT = [1 << (c >> 2) for c in range(52)]
+# Máscara de rangos de cada palo en campos de 16 bits
+_MASK_KEY = [1 << (16 * (c & 3) + (c >> 2)) for c in range(52)]
+
+# Estado parcial sin cartas: (clave de rangos, clave de palos, máscaras por palo)
+EMPTY_STATE = (0, 0, 0)
+
+# Tablas de búsqueda, construidas en el primer uso
+_rank_table = None
+_flush_table = None
+_flush_suit = None
+
+
+def card_to_int(card):
+    """Convierte una carta en texto ("Ah") a su representación entera"""
+    return CARD_TO_INT[card]
+
+
+def int_to_card(value):
+    """Convierte una carta entera a su representación en texto"""
+    return INT_TO_CARD[value]
+
+
+def cards_to_ints(cards):
+    """Convierte una lista de cartas en texto a enteros"""
+    return [CARD_TO_INT[card] for card in cards]
+
+
+def hand_category(score):
+    """Obtiene la categoría (0-9, índice de HAND_CATEGORIES) de una puntuación"""
+    return score >> CATEGORY_SHIFT
+
+
+def hand_name(score):
+    """Obtiene el nombre en inglés de la categoría de una puntuación"""
+    return HAND_CATEGORIES[score >> CATEGORY_SHIFT]
+
+
+def evaluate(cards):
+    """
+    Evalúa entre 1 y 7 cartas enteras y devuelve su puntuación.
+
+    Args:
+        cards (iterable): Cartas como enteros 0-51, sin repetir
+
+    Returns:
+        int: Puntuación de la mejor mano posible (mayor es mejor)
+    """
+    if _rank_table is None:
+        _build_tables()
+
+    rank_key = 0
+    suit_key = 0
+    for card in cards:
+        rank_key += _RANK_KEY[card]
+        suit_key += _SUIT_KEY[card]
+
+    suit = _flush_suit[suit_key]
+    if suit < 0:
+        return _rank_table[rank_key]
+
+    # Con 7 cartas o menos, un color excluye póker y full house
+    mask = 0
+    for card in cards:
+        if card & 3 == suit:
+            mask |= _RANK_BIT[card]
+    return _flush_table[mask]
+
+
+def hand_state(cards, state=EMPTY_STATE):
+    """
+    Calcula el estado parcial de un grupo de cartas: las cantidades por rango
+    (clave en base 5), las cantidades por palo (campos de 3 bits) y la máscara
+    de rangos de cada palo. Los tres valores son sumas de claves por carta, así
+    que un estado se amplía con más cartas sin recontar las anteriores.
+
+    Args:
+        cards (iterable): Cartas como enteros 0-51
+        state (tuple): Estado de otras cartas (distintas) al que se añaden
+
+    Returns:
+        tuple: (clave de rangos, clave de palos, máscaras por palo)
+    """
+    rank_key, suit_key, masks = state
+    for card in cards:
+        rank_key += _RANK_KEY[card]
+        suit_key += _SUIT_KEY[card]
+        masks |= _MASK_KEY[card]
+    return rank_key, suit_key, masks
+
+
+def evaluate_state(state, cards=()):
+    """
+    Evalúa un estado parcial (ver hand_state) ampliado con algunas cartas más,
+    sin construir el estado ampliado. Equivale a evaluate() con todas las cartas.
+
+    Args:
+        state (tuple): Estado de las cartas fijas
+        cards (iterable): Cartas adicionales, distintas de las del estado
+
+    Returns:
+        int: Puntuación de la mejor mano posible (mayor es mejor)
+    """
+    if _rank_table is None:
+        _build_tables()
+
+    rank_key, suit_key, masks = state
+    for card in cards:
+        rank_key += _RANK_KEY[card]
+        suit_key += _SUIT_KEY[card]
+
+    suit = _flush_suit[suit_key]
+    if suit < 0:
+        return _rank_table[rank_key]
+
+    for card in cards:
+        masks |= _MASK_KEY[card]
+    return _flush_table[(masks >> (16 * suit)) & 0x1fff]
+
+
+def lookup_tables():
+    """
+    Devuelve las tablas de búsqueda (construyéndolas si hace falta) para
+    evaluadores alternativos que deban producir las mismas puntuaciones.
+
+    Returns:
+        tuple: (tabla de rangos {clave base 5: puntuación}, tabla de colores
+        indexada por máscara de rangos, palo con color indexado por clave de
+        palos, claves de rango por carta, claves de palo por carta)
+    """
+    if _rank_table is None:
+        _build_tables()
+    return _rank_table, _flush_table, _flush_suit, _RANK_KEY, _SUIT_KEY
+
+
+def evaluate_hand(hole_cards, community_cards):
+    """Evalúa cartas propias y comunitarias en texto y devuelve la puntuación"""
+    return evaluate([CARD_TO_INT[card] for card in hole_cards] +
+                    [CARD_TO_INT[card] for card in community_cards])
+
+
+#----------------------------------------
+# Construcción de tablas
+#----------------------------------------
+
+def _make_score(category, ranks):
+    """Empaqueta categoría y rangos decisivos (de mayor a menor importancia)"""
+    score = category
+    for i in range(5):
+        score = (score << 4) | (ranks[i] if i < len(ranks) else 0)
+    return score
+
+
+def _straight_top(mask):
+    """Devuelve el rango más alto de la escalera contenida en la máscara, o -1"""
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        if mask & window == window:
+            return top
+    # Escalera baja A-2-3-4-5
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+def _top_ranks(mask, count):
+    """Devuelve los `count` rangos más altos presentes en la máscara"""
+    ranks = []
+    for rank in range(12, -1, -1):
+        if mask & (1 << rank):
+            ranks.append(rank)
+            if len(ranks) == count:
+                break
+    return ranks
+
+
+def _rank_score(counts):
+    """Puntúa una mano sin color a partir de las cantidades por rango"""
+    # Rangos agrupados por cantidad, de mayor a menor
+    mask = 0
+    quads, trips, pairs = [], [], []
+    for rank in range(12, -1, -1):
+        count = counts[rank]
+        if count:
+            mask |= 1 << rank
+            if count == 2:
+                pairs.append(rank)
+            elif count == 3:
+                trips.append(rank)
+            elif count == 4:
+                quads.append(rank)
+
+    if quads:
+        kickers = _top_ranks(mask & ~(1 << quads[0]), 1)
+        return _make_score(FOUR_OF_A_KIND, [quads[0]] + kickers)
+
+    if trips and (len(trips) > 1 or pairs):
+        pair_rank = max(trips[1:] + pairs)
+        return _make_score(FULL_HOUSE, [trips[0], pair_rank])
+
+    top = _straight_top(mask)
+    if top >= 0:
+        return _make_score(STRAIGHT, [top])
+
+    if trips:
+        kickers = _top_ranks(mask & ~(1 << trips[0]), 2)
+        return _make_score(THREE_OF_A_KIND, [trips[0]] + kickers)
+
+    if len(pairs) >= 2:
+        kickers = _top_ranks(mask & ~(1 << pairs[0]) & ~(1 << pairs[1]), 1)
+        return _make_score(TWO_PAIR, pairs[:2] + kickers)
+
+    if pairs:
+        kickers = _top_ranks(mask & ~(1 << pairs[0]), 3)
+        return _make_score(PAIR, [pairs[0]] + kickers)
+
+    return _make_score(HIGH_CARD, _top_ranks(mask, 5))
+
+
+def _flush_score(mask):
+    """Puntúa un color (5 o más cartas del mismo palo) a partir de su máscara"""
+    top = _straight_top(mask)
+    if top == 12:
+        return _make_score(ROYAL_FLUSH, [top])
+    if top >= 0:
+        return _make_score(STRAIGHT_FLUSH, [top])
+    return _make_score(FLUSH, _top_ranks(mask, 5))
+
+
+def _build_tables():
+    """Construye las tablas de búsqueda de rangos, colores y palos"""
+    global _rank_table, _flush_table, _flush_suit
+
+    # Todas las combinaciones de rangos de 1 a 7 cartas (máximo 4 por rango)
+    rank_table = {}
+    counts = [0] * 13
+
+    def fill(rank, remaining, key):
+        if rank < 0:
+            if sum(counts):
+                rank_table[key] = _rank_score(counts)
+            return
+        for count in range(min(4, remaining) + 1):
+            counts[rank] = count
+            fill(rank - 1, remaining - count, key + count * 5 ** rank)
+        counts[rank] = 0
+
+    fill(12, 7, 0)
+
+    flush_table = [0] * 8192
+    for mask in range(8192):
+        if bin(mask).count("1") >= 5:
+            flush_table[mask] = _flush_score(mask)
+
+    # Palo con 5 o más cartas para cada combinación de cantidades por palo
+    flush_suit = [-1] * 4096
+    for key in range(4096):
+        for suit in range(4):
+            if (key >> (3 * suit)) & 7 >= 5:
+                flush_suit[key] = suit
+
+    _flush_table = flush_table
+    _flush_suit = flush_suit
+    _rank_table = rank_table
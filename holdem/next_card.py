@@ -0,0 +1,148 @@
+"""
+Mapa de equity por carta siguiente
+----------------------------------
+Calcula, en una sola llamada, la equity del jugador para cada posible
+siguiente carta comunitaria (las 45-48 cartas que quedan en el mazo), por
+ejemplo para responder "¿y si sale un corazón?" sin recalcular carta a carta.
+
+Todo el trabajo común se hace una vez:
+
+- Se genera un único conjunto de repartos del resto de la mano (cartas
+  comunitarias posteriores y manos de los oponentes): todos si son pocos, o
+  una muestra aleatoria compartida por todas las cartas candidatas.
+- El estado aditivo (claves de rangos y palos, máscaras por palo; ver
+  holdem.vectorized.hand_state) de la mano del jugador, de la mesa y de cada
+  reparto se calcula una vez; para cada candidata solo se suma su carta.
+- Para cada candidata se descartan los repartos que la contienen, de modo
+  que los restantes siguen el reparto correcto del mazo sin esa carta.
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+from holdem.equity import CalculationCancelled, EquityResult, combination_count, remaining_deck
+from holdem.evaluator import CATEGORY_SHIFT, HAND_CATEGORIES
+from holdem.vectorized import deal_batch, evaluate_state, hand_state, showdown_shares
+
+# Repartos compartidos por defecto en el modo Monte Carlo
+NEXT_CARD_TRIALS = 20000
+
+# Máximo de repartos del resto de la mano que se enumeran de forma exacta
+EXACT_ROWS = 100000
+
+
+def next_card_equities(hole, board, opponents, trials=NEXT_CARD_TRIALS, seed=None, dead=(),
+                       known=(), exact=None, max_rows=EXACT_ROWS, cancel=None):
+    """
+    Calcula la equity del jugador para cada posible siguiente carta comunitaria.
+
+    Args:
+        hole (list): Las dos cartas del jugador
+        board (list): Cartas comunitarias conocidas (0-4)
+        opponents (int): Número total de oponentes
+        trials (int): Repartos compartidos si se usa Monte Carlo
+        seed (int): Semilla del modo Monte Carlo
+        dead (list): Cartas fuera del mazo (descartadas o vistas)
+        known (list): Manos conocidas de algunos oponentes
+        exact (bool): Forzar enumeración (True) o Monte Carlo (False); con
+            None se enumera si no hay más de max_rows repartos
+        max_rows (int): Límite para elegir la enumeración automáticamente
+        cancel (threading.Event): Evento para interrumpir el cálculo
+
+    Returns:
+        dict: {carta: EquityResult} para cada carta que puede salir
+
+    Raises:
+        ValueError: Si la mesa ya está completa
+    """
+    if len(board) >= 5:
+        raise ValueError("La mesa ya está completa: no hay carta siguiente")
+    known = [list(hand) for hand in known]
+    deck = remaining_deck(hole, board, dead, *known)
+    later = 4 - len(board)  # Cartas comunitarias que salen después de la siguiente
+    unknown = opponents - len(known)
+
+    if exact is None:
+        exact = _exact_rows(len(deck), later, unknown) <= max_rows
+    if exact:
+        rows = _enumerate_rows(deck, later, unknown)
+    else:
+        rows = deal_batch(deck, trials, later + 2 * unknown, np.random.default_rng(seed))
+
+    # Estado de las cartas fijas y de cada reparto, calculado una sola vez
+    size = len(rows)
+    later_state = hand_state(rows[:, :later])
+    board_state = hand_state(np.broadcast_to(np.asarray(board, dtype=np.int64), (size, len(board))))
+    player_state = _add(hand_state(np.broadcast_to(np.asarray(hole, dtype=np.int64), (size, 2))),
+                        board_state, later_state)
+    common = _add(board_state, later_state)
+    hands = [np.broadcast_to(np.asarray(hand, dtype=np.int64), (size, 2)) for hand in known]
+    hands.extend(rows[:, i:i + 2] for i in range(later, later + 2 * unknown, 2))
+    opponent_states = [_add(hand_state(hand), common) for hand in hands]
+    card_states = hand_state(np.arange(52)[:, None])
+
+    results = {}
+    for card in deck:
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled()
+        valid = ~(rows == card).any(axis=1)
+        extra = tuple(part[card] for part in card_states)
+        player = evaluate_state(*_select(player_state, valid, extra))
+        opponent_scores = np.stack([evaluate_state(*_select(state, valid, extra))
+                                    for state in opponent_states], axis=1)
+        results[card] = _batch_result(player, opponent_scores, exact)
+    return results
+
+
+def _exact_rows(deck_size, later, unknown):
+    """Número de repartos distintos del resto de la mano tras la siguiente carta"""
+    return combination_count(5 - later, deck_size - 1, unknown)
+
+
+def _enumerate_rows(deck, later, unknown):
+    """Todos los repartos (cartas posteriores y manos de los oponentes desconocidos)"""
+    rows = []
+    for runout in combinations(deck, later):
+        rest = [card for card in deck if card not in runout]
+        rows.extend(runout + hands for hands in _hand_sets(rest, unknown))
+    return np.array(rows, dtype=np.int64).reshape(len(rows), later + 2 * unknown)
+
+
+def _hand_sets(cards, count):
+    """
+    Genera cada conjunto (sin orden) de `count` manos disjuntas, como una
+    tupla de cartas: cada mano empieza por una carta posterior a la primera
+    de la mano anterior, así que ningún conjunto se repite.
+    """
+    if not count:
+        yield ()
+        return
+    for i, first in enumerate(cards):
+        for j in range(i + 1, len(cards)):
+            rest = cards[i + 1:j] + cards[j + 1:]
+            for hands in _hand_sets(rest, count - 1):
+                yield (first, cards[j]) + hands
+
+
+def _add(*states):
+    """Suma estados de grupos de cartas disjuntos"""
+    return tuple(sum(parts) for parts in zip(*states))
+
+
+def _select(state, valid, extra):
+    """Filas válidas de un estado ampliado con la carta candidata"""
+    return tuple(part[valid] + add for part, add in zip(state, extra))
+
+
+def _batch_result(player, opponent_scores, exact):
+    """Resume un lote de repartos en un EquityResult"""
+    won, tied, shares = showdown_shares(player, opponent_scores)
+    categories = player >> CATEGORY_SHIFT
+    return EquityResult(
+        wins=int(won.sum()), ties=int(tied.sum()), losses=int(len(player) - won.sum() - tied.sum()),
+        share=float(shares.sum()), share_sq=float((shares ** 2).sum()),
+        hand_counts=np.bincount(categories, minlength=len(HAND_CATEGORIES)).tolist(),
+        category_share=np.bincount(categories, weights=shares,
+                                   minlength=len(HAND_CATEGORIES)).tolist(),
+        exact=exact)
@@ -0,0 +1,151 @@
+"""
+Cálculo de equity en paralelo
+-----------------------------
+Reparte los repartos de una simulación Monte Carlo entre varios procesos.
+
+La simulación se divide en fragmentos de tamaño fijo, cada uno con su propio
+flujo de números aleatorios derivado de la semilla (SeedSequence.spawn), y
+los contadores parciales se suman al final. Como la división en fragmentos
+no depende del número de procesos, el resultado para una semilla dada es
+idéntico con cualquier cantidad de workers.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from holdem.equity import EquityResult, monte_carlo_equity
+from holdem.evaluator import lookup_tables
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy se usa el simulador en Python puro
+    np = None
+
+# Repartos simulados por cada fragmento
+SHARD_TRIALS = 25000
+
+
+def shard_seeds(seed, shards):
+    """
+    Deriva semillas independientes y reproducibles para cada fragmento.
+
+    Returns:
+        list: Un SeedSequence por fragmento (o una cadena si falta NumPy)
+    """
+    if np is not None:
+        return np.random.SeedSequence(seed).spawn(shards)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    return [f"{seed}-{index}" for index in range(shards)]
+
+
+def shard_sizes(trials, shard_trials=SHARD_TRIALS):
+    """Divide el número de repartos en fragmentos de tamaño fijo"""
+    sizes = [shard_trials] * (trials // shard_trials)
+    if trials % shard_trials:
+        sizes.append(trials % shard_trials)
+    return sizes
+
+
+def run_shard(hole, board, opponents, trials, seed, dead=(), known=()):
+    """Simula un fragmento con su propia semilla (se ejecuta en un worker)"""
+    if np is not None:
+        from holdem.vectorized import vectorized_equity
+        return vectorized_equity(hole, board, opponents, trials, seed, dead=dead, known=known)
+    return monte_carlo_equity(hole, board, opponents, trials, random.Random(seed), dead=dead,
+                              known=known)
+
+
+def _warm_up():
+    """Construye las tablas de evaluación en el worker"""
+    lookup_tables()
+    return os.getpid()
+
+
+class EquityPool:
+    """
+    Pool persistente de procesos para el cálculo de equity. Se crea una vez
+    (por ejemplo al arrancar la aplicación) y se reutiliza en cada cálculo.
+    """
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (int): Número de procesos; por defecto, uno por núcleo
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def start(self):
+        """Arranca los procesos y precalcula las tablas en cada uno sin esperar"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            for _ in range(self.workers):
+                self._executor.submit(_warm_up)
+        return self
+
+    def shutdown(self):
+        """Detiene los procesos del pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def equity(self, hole, board, opponents, trials=1000, seed=None, dead=(), known=()):
+        """
+        Estima la equity repartiendo la simulación entre los procesos.
+
+        Args:
+            hole (list): Las dos cartas del jugador
+            board (list): Cartas comunitarias conocidas (0-5)
+            opponents (int): Número total de oponentes
+            trials (int): Número total de repartos a simular
+            seed (int): Semilla; el mismo valor da siempre el mismo resultado
+            dead (list): Cartas fuera del mazo (descartadas o vistas)
+            known (list): Manos conocidas de algunos oponentes
+
+        Returns:
+            EquityResult: Suma de los resultados de todos los fragmentos
+        """
+        sizes = shard_sizes(trials)
+        seeds = shard_seeds(seed, len(sizes))
+        result = EquityResult()
+
+        # Un único fragmento no compensa el coste de enviarlo a otro proceso
+        if len(sizes) == 1 or self.workers == 1:
+            for size, shard_seed in zip(sizes, seeds):
+                result.merge(run_shard(hole, board, opponents, size, shard_seed, dead, known))
+            return result
+
+        self.start()
+        futures = [self._executor.submit(run_shard, hole, board, opponents, size, shard_seed,
+                                         dead, known)
+                   for size, shard_seed in zip(sizes, seeds)]
+        for future in futures:
+            result.merge(future.result())
+        return result
+
+    def map(self, function, iterable, chunksize=1):
+        """
+        Aplica una función a cada elemento en los procesos del pool, devolviendo
+        los resultados en el orden de entrada. La función debe poder enviarse a
+        otro proceso (definida a nivel de módulo). Con un único worker se
+        ejecuta en el proceso actual.
+        """
+        if self.workers == 1:
+            return map(function, iterable)
+        self.start()
+        return self._executor.map(function, iterable, chunksize=chunksize)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def parallel_equity(hole, board, opponents, trials=1000, seed=None, workers=None, dead=(),
+                    known=()):
+    """Calcula la equity con un pool temporal de procesos (ver EquityPool.equity)"""
+    with EquityPool(workers) as pool:
+        return pool.equity(hole, board, opponents, trials, seed, dead, known)
@@ -0,0 +1,103 @@
+"""
+Tabla de equity preflop
+-----------------------
+Equity precalculada de las 169 clases de manos iniciales (parejas, suited y
+offsuit) contra 1-9 oponentes con manos aleatorias. La tabla se genera con
+build_preflop_table.py y se carga del disco solo la primera vez que se usa.
+"""
+
+import json
+import os
+
+from holdem.equity import EquityResult
+from holdem.evaluator import RANKS
+
+# Versión del formato de la tabla; se ignora cualquier archivo con otra versión
+TABLE_VERSION = 2
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "preflop_equity.json")
+
+MAX_OPPONENTS = 9
+
+# Tabla cargada en el primer uso (False si no está disponible)
+_table = None
+
+
+def hand_class(hole):
+    """
+    Obtiene la clase canónica de una mano inicial, como "AA", "AKs" o "T9o".
+
+    Args:
+        hole (list): Las dos cartas del jugador como enteros
+    """
+    high, low = sorted(hole, reverse=True)
+    high_rank, low_rank = RANKS[high >> 2], RANKS[low >> 2]
+    if high_rank == low_rank:
+        return high_rank * 2
+    return high_rank + low_rank + ("s" if high & 3 == low & 3 else "o")
+
+
+def all_hand_classes():
+    """Devuelve las 169 clases de manos iniciales, de mayor a menor rango"""
+    classes = []
+    for i in range(12, -1, -1):
+        for j in range(i, -1, -1):
+            if i == j:
+                classes.append(RANKS[i] * 2)
+            else:
+                classes.append(RANKS[i] + RANKS[j] + "s")
+                classes.append(RANKS[i] + RANKS[j] + "o")
+    return classes
+
+
+def class_representative(name):
+    """Devuelve una mano concreta (dos enteros) de la clase indicada"""
+    high, low = RANKS.index(name[0]), RANKS.index(name[1])
+    if high == low or name[2] == "o":
+        return [high * 4 + 3, low * 4 + 2]
+    return [high * 4 + 3, low * 4 + 3]
+
+
+def load_table(path=TABLE_PATH):
+    """Carga la tabla desde el disco; devuelve None si falta o es de otra versión"""
+    global _table
+    if _table is None:
+        _table = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == TABLE_VERSION:
+                _table = data
+        except (OSError, ValueError) as e:
+            print(f"No se pudo cargar la tabla preflop: {e}")
+    return _table or None
+
+
+def preflop_result(hole, opponents):
+    """
+    Consulta la equity preflop de una mano en la tabla precalculada.
+
+    Args:
+        hole (list): Las dos cartas del jugador como enteros
+        opponents (int): Número de oponentes (1-9)
+
+    Returns:
+        EquityResult: Resultado de la simulación con la que se generó la
+        tabla, o None si la tabla no está disponible
+    """
+    table = load_table()
+    if table is None or not 1 <= opponents <= MAX_OPPONENTS:
+        return None
+
+    entry = table["hands"][hand_class(hole)]
+    wins, ties, share = entry["results"][opponents - 1]
+    trials = table["trials"]
+
+    # La tabla no guarda la suma de cuadrados: se aproxima suponiendo que
+    # todos los empates reparten el mismo porcentaje del bote
+    tie_share = share - wins
+    share_sq = wins + (tie_share ** 2 / ties if ties else 0.0)
+    return EquityResult(wins=wins, ties=ties, losses=trials - wins - ties,
+                        share=share, share_sq=share_sq,
+                        hand_counts=list(entry["hand_counts"]),
+                        category_share=list(entry["category_shares"][opponents - 1]))
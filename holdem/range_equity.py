@@ -0,0 +1,231 @@
+"""
+Equity entre rangos de manos
+----------------------------
+Calcula la equity de una mano o de un rango contra el rango de un oponente
+(ver holdem.ranges), teniendo en cuenta que las cartas de cada mano no
+pueden estar en la otra, en la mesa ni entre las cartas muertas.
+
+Para cada tablero completo se evalúan de una vez las 1326 combinaciones de
+dos cartas (un array de fuerzas por tablero) y, con sumas acumuladas del
+peso del rival ordenadas por fuerza, se obtiene en una sola pasada cuánto
+peso del rango rival gana, empata o pierde contra cada combinación. Las
+combinaciones que comparten carta con la mano evaluada se descuentan con
+sumas acumuladas por carta, así que cada tablero cuesta O(52 x 1326) en
+lugar de O(1326 x 1326).
+
+Los tableros restantes se enumeran todos si son pocos (flop, turn y river);
+si no (preflop) se evalúa una muestra aleatoria de tableros.
+"""
+
+from itertools import combinations
+from math import factorial
+
+import numpy as np
+
+from holdem.equity import CalculationCancelled, EquityResult, remaining_deck
+from holdem.evaluator import CATEGORY_SHIFT, HAND_CATEGORIES
+from holdem.ranges import COMBO_INDEX, COMBOS, parse_range
+from holdem.vectorized import evaluate_batch
+
+# Máximo de tableros restantes que se enumeran de forma exacta
+EXACT_BOARDS = 20000
+
+# Tableros evaluados cuando hay más de EXACT_BOARDS
+SAMPLE_BOARDS = 3000
+
+_COMBO_CARDS = np.array(COMBOS, dtype=np.int64)
+
+# _CARD_COMBOS[c, i] es 1 si la combinación i contiene la carta c
+_CARD_COMBOS = np.zeros((52, len(COMBOS)))
+_CARD_COMBOS[_COMBO_CARDS[:, 0], np.arange(len(COMBOS))] = 1
+_CARD_COMBOS[_COMBO_CARDS[:, 1], np.arange(len(COMBOS))] = 1
+
+
+def range_weights(hand_range):
+    """
+    Convierte un rango al vector de pesos de las 1326 combinaciones.
+
+    Args:
+        hand_range: Texto en notación estándar ("QQ+, AKs"), diccionario
+            {combinación: peso} o una mano concreta (lista de dos cartas enteras)
+
+    Returns:
+        np.ndarray: Peso de cada combinación en el orden de holdem.ranges.COMBOS
+    """
+    if isinstance(hand_range, str):
+        hand_range = parse_range(hand_range)
+    elif not isinstance(hand_range, dict):
+        hand_range = {tuple(sorted(hand_range)): 1.0}
+
+    weights = np.zeros(len(COMBOS))
+    for combo, weight in hand_range.items():
+        weights[COMBO_INDEX[tuple(sorted(combo))]] = weight
+    return weights
+
+
+def board_strengths(board):
+    """
+    Evalúa todas las combinaciones de dos cartas sobre un tablero completo.
+
+    Args:
+        board (list): Las cinco cartas comunitarias como enteros
+
+    Returns:
+        np.ndarray: Puntuación de cada combinación (-1 si comparte carta con
+        el tablero)
+    """
+    valid = _CARD_COMBOS[list(board)].sum(axis=0) == 0
+    strengths = np.full(len(COMBOS), -1, dtype=np.int64)
+    cards = np.concatenate([_COMBO_CARDS[valid], np.broadcast_to(board, (int(valid.sum()), 5))], axis=1)
+    strengths[valid] = evaluate_batch(cards)
+    return strengths
+
+
+def range_equity(hero, villain, board=(), dead=(), max_boards=EXACT_BOARDS,
+                 samples=SAMPLE_BOARDS, seed=None, cancel=None):
+    """
+    Calcula la equity de un rango (o una mano) contra el rango de un oponente.
+
+    Cada pareja de combinaciones compatible (sin cartas en común entre sí, con
+    la mesa ni con las cartas muertas) cuenta según el producto de sus pesos.
+
+    Args:
+        hero: Mano o rango del jugador (ver range_weights)
+        villain: Rango del oponente (ver range_weights)
+        board (list): Cartas comunitarias conocidas (0-5) como enteros
+        dead (list): Cartas fuera del mazo
+        max_boards (int): Máximo de tableros restantes que se enumeran
+        samples (int): Tableros aleatorios evaluados si hay más de max_boards
+        seed (int): Semilla del muestreo de tableros
+        cancel (threading.Event): Evento para interrumpir el cálculo
+
+    Returns:
+        EquityResult: Contadores ponderados del jugador (exact=True si se han
+        enumerado todos los tableros)
+
+    Raises:
+        ValueError: Si alguno de los rangos queda vacío tras quitar las cartas
+            de la mesa y las cartas muertas
+    """
+    result, _ = _range_totals(hero, villain, board, dead, max_boards, samples, seed, cancel)
+    return result
+
+
+def combo_equities(hero, villain, board=(), dead=(), max_boards=EXACT_BOARDS,
+                   samples=SAMPLE_BOARDS, seed=None, cancel=None):
+    """
+    Calcula la equity de cada combinación del rango del jugador contra el
+    rango del oponente (mismos argumentos que range_equity).
+
+    Returns:
+        dict: {combinación: equity (0-1)} de las combinaciones con peso
+    """
+    _, (share, total) = _range_totals(hero, villain, board, dead, max_boards, samples, seed, cancel)
+    return {COMBOS[index]: float(share[index] / total[index])
+            for index in np.nonzero(total > 0)[0]}
+
+
+def _range_totals(hero, villain, board, dead, max_boards, samples, seed, cancel):
+    """
+    Recorre los tableros acumulando, por combinación del jugador, el peso
+    rival ganado, empatado y total.
+
+    Returns:
+        tuple: (EquityResult del rango, (fracción de bote, peso rival) por combinación)
+    """
+    board, dead = list(board), list(dead)
+    removed = _CARD_COMBOS[board + dead].sum(axis=0) > 0
+    hero_weights = np.where(removed, 0.0, range_weights(hero))
+    villain_weights = np.where(removed, 0.0, range_weights(villain))
+    if not hero_weights.any() or not villain_weights.any():
+        raise ValueError("El rango no tiene combinaciones compatibles con la mesa")
+
+    deck = remaining_deck(board, dead)
+    missing = 5 - len(board)
+    exact = _count(len(deck), missing) <= max_boards
+    if exact:
+        runouts = combinations(deck, missing)
+    else:
+        rng = np.random.default_rng(seed)
+        runouts = (rng.choice(deck, missing, replace=False) for _ in range(samples))
+
+    wins = np.zeros(len(COMBOS))
+    ties = np.zeros(len(COMBOS))
+    total = np.zeros(len(COMBOS))
+    hand_counts = np.zeros(len(HAND_CATEGORIES))
+    category_share = np.zeros(len(HAND_CATEGORIES))
+    board_shares = []  # (fracción de bote, peso) de cada tablero muestreado
+
+    for runout in runouts:
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled()
+        full_board = board + [int(card) for card in runout]
+        strengths = board_strengths(full_board)
+        win, tie, against = _board_totals(strengths, villain_weights)
+
+        valid = strengths >= 0
+        wins[valid] += win[valid]
+        ties[valid] += tie[valid]
+        total[valid] += against[valid]
+        weighted = hero_weights * against * valid
+        categories = strengths[valid] >> CATEGORY_SHIFT
+        hand_counts += np.bincount(categories, weights=weighted[valid], minlength=len(HAND_CATEGORIES))
+        category_share += np.bincount(categories, weights=(hero_weights * (win + tie / 2))[valid],
+                                      minlength=len(HAND_CATEGORIES))
+        if not exact:
+            board_shares.append((float(hero_weights @ (win + tie / 2)), float(weighted.sum())))
+
+    share = wins + ties / 2
+    result = EquityResult(wins=float(hero_weights @ wins), ties=float(hero_weights @ ties),
+                          losses=float(hero_weights @ (total - wins - ties)),
+                          share=float(hero_weights @ share), hand_counts=hand_counts.tolist(),
+                          category_share=category_share.tolist(), exact=exact)
+    if not exact:
+        # Los enfrentamientos de un mismo tablero no son independientes: la
+        # suma de cuadrados se elige para que el error estándar sea el del
+        # estimador de razón con un tablero por muestra
+        shares, weights = np.array(board_shares).T
+        variance = ((shares - result.equity * weights) ** 2).sum() / result.trials
+        result.share_sq = result.trials * (variance + result.equity ** 2)
+    else:
+        # Cada enfrentamiento da 1 (gana), 0.5 (empata) o 0 (pierde)
+        result.share_sq = result.wins + result.ties / 4
+    return result, (share * (hero_weights > 0), total * (hero_weights > 0))
+
+
+def _board_totals(strengths, villain_weights):
+    """
+    Para un tablero, calcula el peso rival que pierde, empata y se enfrenta a
+    cada combinación, descontando las combinaciones rivales que comparten
+    alguna carta con ella.
+
+    Returns:
+        tuple: Tres arrays (ganado, empatado, total) de 1326 elementos
+    """
+    weights = np.where(strengths >= 0, villain_weights, 0.0)
+    order = np.argsort(strengths, kind="stable")
+    sorted_strengths = strengths[order]
+    below = np.searchsorted(sorted_strengths, strengths, "left")
+    through = np.searchsorted(sorted_strengths, strengths, "right")
+
+    # Sumas acumuladas del peso rival, en total y por carta
+    cumulative = np.concatenate([[0.0], np.cumsum(weights[order])])
+    card_cumulative = np.concatenate([np.zeros((52, 1)),
+                                      np.cumsum(_CARD_COMBOS[:, order] * weights[order], axis=1)], axis=1)
+    first, second = _COMBO_CARDS[:, 0], _COMBO_CARDS[:, 1]
+
+    def weight_before(position):
+        # Peso rival anterior a la posición, sin las combinaciones que
+        # comparten carta (la propia combinación se descuenta dos veces)
+        return (cumulative[position] - card_cumulative[first, position]
+                - card_cumulative[second, position])
+
+    win = weight_before(below)
+    tie = weight_before(through) - win + weights
+    total = weight_before(len(COMBOS)) + weights
+    return win, tie, total
+
+
+def _count(deck_size, cards):
+    """Número de tableros distintos al repartir `cards` cartas del mazo"""
+    return factorial(deck_size) // (factorial(cards) * factorial(deck_size - cards))
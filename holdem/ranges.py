@@ -0,0 +1,189 @@
+"""
+Rangos de manos
+---------------
+Interpreta rangos en la notación habitual, por ejemplo:
+
+    "QQ+, AKs, 50% of AQo"     parejas de QQ a AA, AK suited y la mitad de AQo
+    "22-55, A2s-A5s, KTo+"     intervalos y "+" (sube la segunda carta)
+    "AhKh, AsKs:0.5"           combinaciones concretas, con peso opcional
+    "15%"                      el 15% de manos más fuertes (tabla preflop)
+
+Un rango se representa como un diccionario {combinación: peso}, donde cada
+combinación es una tupla ordenada de dos cartas enteras (ver
+holdem.evaluator) y el peso está entre 0 y 1.
+"""
+
+import re
+from itertools import combinations
+
+from holdem.evaluator import RANKS, card_to_int
+from holdem.preflop import all_hand_classes, hand_class, load_table
+
+# Las 1326 combinaciones de dos cartas y su posición en esa lista
+COMBOS = list(combinations(range(52), 2))
+COMBO_INDEX = {combo: index for index, combo in enumerate(COMBOS)}
+
+_WEIGHT_PREFIX = re.compile(r"^(\d+(?:\.\d+)?)%\s*(?:of\s+)?(.+)$", re.IGNORECASE)
+_TOP_PERCENT = re.compile(r"^(\d+(?:\.\d+)?)%$")
+_CLASS = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)$")
+
+
+def class_combos(name):
+    """
+    Devuelve las combinaciones de una clase de manos ("AA", "AKs", "AKo" o "AK").
+
+    Returns:
+        list: Tuplas ordenadas de dos cartas enteras
+    """
+    match = _CLASS.match(name)
+    if match is None:
+        raise ValueError(f"Clase de manos no válida: {name!r}")
+    first, second, suited = RANKS.index(match.group(1)), RANKS.index(match.group(2)), match.group(3)
+    if first == second and suited:
+        raise ValueError(f"Una pareja no puede ser suited ni offsuit: {name!r}")
+
+    combos = []
+    for a in range(4):
+        for b in range(4):
+            if first == second and b <= a:
+                continue
+            if (suited == "s" and a != b) or (suited == "o" and a == b):
+                continue
+            combos.append(tuple(sorted((first * 4 + a, second * 4 + b))))
+    return combos
+
+
+def parse_range(text):
+    """
+    Interpreta un rango en notación estándar.
+
+    Los elementos se separan por comas; si una combinación aparece varias
+    veces prevalece el último peso indicado.
+
+    Args:
+        text (str): Rango, por ejemplo "QQ+, AKs, 50% of AQo"
+
+    Returns:
+        dict: {combinación: peso} con pesos mayores que 0
+
+    Raises:
+        ValueError: Si algún elemento no es válido
+    """
+    weights = {}
+    for token in text.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        weight = 1.0
+        match = _WEIGHT_PREFIX.match(token)
+        if token.lower() in ("random", "any"):
+            hands = COMBOS
+        elif _TOP_PERCENT.match(token):
+            hands = top_combos(float(token[:-1]) / 100)
+        else:
+            if match:
+                weight, token = float(match.group(1)) / 100, match.group(2).strip()
+            elif ":" in token:
+                token, value = token.rsplit(":", 1)
+                weight = _parse_weight(value, token)
+            hands = _token_combos(token.strip())
+        if not 0 <= weight <= 1:
+            raise ValueError(f"Peso fuera de rango en {token!r}")
+        for combo in hands:
+            weights[combo] = weight
+    return {combo: weight for combo, weight in weights.items() if weight > 0}
+
+
+def top_combos(fraction):
+    """
+    Devuelve las combinaciones del porcentaje de manos más fuertes, ordenando
+    las clases por su equity preflop contra un oponente aleatorio.
+
+    Args:
+        fraction (float): Fracción de las 1326 combinaciones (0-1)
+    """
+    table = load_table()
+    if table is None:
+        raise ValueError("Los rangos por porcentaje necesitan la tabla preflop")
+    classes = sorted(all_hand_classes(), key=lambda name: -table["hands"][name]["results"][0][2])
+
+    combos = []
+    for name in classes:
+        if len(combos) >= fraction * len(COMBOS):
+            break
+        combos.extend(class_combos(name))
+    return combos
+
+
+def range_classes(weights):
+    """
+    Resume un rango por clases de manos.
+
+    Returns:
+        dict: {clase: peso total de sus combinaciones}
+    """
+    classes = {}
+    for combo, weight in weights.items():
+        name = hand_class(combo)
+        classes[name] = classes.get(name, 0.0) + weight
+    return classes
+
+
+def _parse_weight(value, token):
+    """Interpreta un peso escrito como fracción (0.5) o porcentaje (50%)"""
+    value = value.strip()
+    try:
+        return float(value[:-1]) / 100 if value.endswith("%") else float(value)
+    except ValueError:
+        raise ValueError(f"Peso no válido en {token!r}") from None
+
+
+def _token_combos(token):
+    """Combinaciones de un elemento sin peso: clase, intervalo, "+" o mano concreta"""
+    if len(token) == 4 and token[1].lower() in "cdhs" and token[3].lower() in "cdhs":
+        try:
+            cards = [card_to_int(token[i].upper() + token[i + 1].lower()) for i in (0, 2)]
+        except KeyError:
+            raise ValueError(f"Mano no válida: {token!r}") from None
+        if cards[0] == cards[1]:
+            raise ValueError(f"Mano no válida: {token!r}")
+        return [tuple(sorted(cards))]
+
+    token = token.upper()
+    if token.endswith("+"):
+        return [combo for name in _plus_classes(token[:-1]) for combo in class_combos(name)]
+    if "-" in token:
+        return [combo for name in _interval_classes(*token.split("-", 1)) for combo in class_combos(name)]
+    return class_combos(_class_name(token))
+
+
+def _class_name(token):
+    """Normaliza una clase ("KA" -> "AK", "aks" -> "AKs")"""
+    match = _CLASS.match(token[:2].upper() + token[2:].lower())
+    if match is None:
+        raise ValueError(f"Clase de manos no válida: {token!r}")
+    first, second, suited = match.groups()
+    if RANKS.index(first) < RANKS.index(second):
+        first, second = second, first
+    return first + second + suited
+
+
+def _plus_classes(token):
+    """Clases de "QQ+" (parejas hasta AA) o "ATs+" (segunda carta hasta la primera)"""
+    name = _class_name(token)
+    first, second, suffix = RANKS.index(name[0]), RANKS.index(name[1]), name[2:]
+    if first == second:
+        return [RANKS[rank] * 2 for rank in range(first, 13)]
+    return [RANKS[first] + RANKS[rank] + suffix for rank in range(second, first)]
+
+
+def _interval_classes(start, end):
+    """Clases de "22-55" (parejas) o "A2s-A5s" (misma primera carta)"""
+    start, end = _class_name(start), _class_name(end)
+    if start[0] == start[1] and end[0] == end[1]:
+        low, high = sorted((RANKS.index(start[0]), RANKS.index(end[0])))
+        return [RANKS[rank] * 2 for rank in range(low, high + 1)]
+    if start[0] != end[0] or start[2:] != end[2:] or start[0] == start[1]:
+        raise ValueError(f"Intervalo no válido: {start}-{end}")
+    low, high = sorted((RANKS.index(start[1]), RANKS.index(end[1])))
+    return [start[0] + RANKS[rank] + start[2:] for rank in range(low, high + 1)]
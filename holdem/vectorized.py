@@ -0,0 +1,223 @@
+"""
+Simulador Monte Carlo vectorizado con NumPy
+-------------------------------------------
+Reparte miles de manos a la vez como matrices de enteros (Fisher-Yates
+parcial sobre cada fila) y las evalúa con operaciones de arrays sobre los
+histogramas de rangos y palos, codificados con las mismas claves que
+holdem.evaluator, por lo que las puntuaciones son idénticas a las del
+evaluador escalar. Como en el simulador escalar, el estado de las cartas
+fijas (mesa conocida, mano del jugador y manos conocidas) se calcula una vez
+con hand_state() y en cada lote solo se le suman las cartas repartidas.
+"""
+
+import numpy as np
+
+from holdem.equity import EquityResult, remaining_deck, tracks_next_card
+from holdem.evaluator import HAND_CATEGORIES, CATEGORY_SHIFT, lookup_tables
+
+# Número máximo de repartos que se procesan por lote para acotar la memoria
+BATCH_SIZE = 20000
+
+# Tablas en formato NumPy, construidas en el primer uso
+_tables = None
+
+
+def _numpy_tables():
+    """Convierte las tablas de holdem.evaluator a arrays de NumPy"""
+    global _tables
+    if _tables is None:
+        rank_table, flush_table, flush_suit, rank_key, suit_key = lookup_tables()
+        keys = np.array(sorted(rank_table), dtype=np.int64)
+        scores = np.array([rank_table[key] for key in keys.tolist()], dtype=np.int64)
+        _tables = {
+            "rank_keys": keys,
+            "rank_scores": scores,
+            "flush_table": np.array(flush_table, dtype=np.int64),
+            "flush_suit": np.array(flush_suit, dtype=np.int64),
+            "card_rank_key": np.array(rank_key, dtype=np.int64),
+            "card_suit_key": np.array(suit_key, dtype=np.int64),
+            "card_rank_bit": np.array([1 << (card >> 2) for card in range(52)], dtype=np.int64),
+            "card_mask_key": np.array([1 << (16 * (card & 3) + (card >> 2)) for card in range(52)],
+                                      dtype=np.int64),
+        }
+    return _tables
+
+
+def evaluate_batch(cards):
+    """
+    Evalúa un lote de manos.
+
+    Args:
+        cards (np.ndarray): Matriz (manos, cartas) de enteros 0-51, con 1 a 7
+            cartas por fila y sin repetir dentro de cada fila
+
+    Returns:
+        np.ndarray: Puntuación de cada fila, igual a holdem.evaluator.evaluate
+    """
+    tables = _numpy_tables()
+    rank_key = tables["card_rank_key"][cards].sum(axis=1)
+    suit_key = tables["card_suit_key"][cards].sum(axis=1)
+    scores = tables["rank_scores"][np.searchsorted(tables["rank_keys"], rank_key)]
+
+    # Sustituir la puntuación de las filas con color por la de la tabla de colores
+    flush_suit = tables["flush_suit"][suit_key]
+    flush_rows = np.nonzero(flush_suit >= 0)[0]
+    if flush_rows.size:
+        flush_cards = cards[flush_rows]
+        in_suit = (flush_cards & 3) == flush_suit[flush_rows, None]
+        mask = np.where(in_suit, tables["card_rank_bit"][flush_cards], 0).sum(axis=1)
+        scores[flush_rows] = tables["flush_table"][mask]
+    return scores
+
+
+def hand_state(cards):
+    """
+    Calcula el estado aditivo de un lote de grupos de cartas: clave de rangos,
+    clave de palos y máscaras de rangos de cada palo en campos de 16 bits
+    (como _MASK_KEY en holdem.evaluator). El estado de la unión de
+    grupos sin cartas en común es la suma de sus estados, de modo que unas
+    cartas fijas se procesan una sola vez y se amplían con pocas cartas más.
+
+    Args:
+        cards (np.ndarray): Matriz (filas, cartas) de enteros 0-51
+
+    Returns:
+        tuple: (clave de rangos, clave de palos, máscaras), un array por fila
+    """
+    tables = _numpy_tables()
+    cards = np.asarray(cards, dtype=np.int64)
+    return (tables["card_rank_key"][cards].sum(axis=-1), tables["card_suit_key"][cards].sum(axis=-1),
+            tables["card_mask_key"][cards].sum(axis=-1))
+
+
+def evaluate_state(rank_key, suit_key, masks):
+    """
+    Evalúa manos de 5 a 7 cartas a partir de su estado (ver hand_state).
+
+    Returns:
+        np.ndarray: Puntuación de cada fila, igual a evaluate_batch
+    """
+    tables = _numpy_tables()
+    scores = tables["rank_scores"][np.searchsorted(tables["rank_keys"], rank_key)]
+    flush_suit = tables["flush_suit"][suit_key]
+    flush_rows = np.nonzero(flush_suit >= 0)[0]
+    if flush_rows.size:
+        masks = masks[flush_rows] >> (16 * flush_suit[flush_rows])
+        scores[flush_rows] = tables["flush_table"][masks & 0x1fff]
+    return scores
+
+
+def _add_states(first, second):
+    """Estado de la unión de dos grupos de cartas sin cartas en común (ver hand_state)"""
+    return tuple(a + b for a, b in zip(first, second))
+
+
+def showdown_shares(player, opponent_scores):
+    """
+    Compara la puntuación del jugador con las de los oponentes en cada reparto.
+
+    Args:
+        player (np.ndarray): Puntuación del jugador por reparto
+        opponent_scores (np.ndarray): Matriz (repartos, oponentes)
+
+    Returns:
+        tuple: Arrays (gana solo, empata, fracción de bote) por reparto
+    """
+    best = opponent_scores.max(axis=1)
+    won = player > best
+    tied = player == best
+    tied_count = (opponent_scores == player[:, None]).sum(axis=1)
+    shares = np.where(won, 1.0, np.where(tied, 1.0 / (tied_count + 1), 0.0))
+    return won, tied, shares
+
+
+def deal_batch(deck, size, cards_needed, rng):
+    """
+    Reparte `cards_needed` cartas aleatorias del mazo en cada una de `size`
+    filas mediante un Fisher-Yates parcial vectorizado.
+
+    Returns:
+        np.ndarray: Matriz (size, cards_needed) con las cartas repartidas
+    """
+    decks = np.tile(np.asarray(deck, dtype=np.int64), (size, 1))
+    rows = np.arange(size)
+    count = decks.shape[1]
+    for i in range(cards_needed):
+        j = rng.integers(i, count, size=size)
+        picked = decks[rows, j]
+        decks[rows, j] = decks[:, i]
+        decks[:, i] = picked
+    return decks[:, :cards_needed]
+
+
+def vectorized_equity(hole, board, opponents, trials=1000, seed=None, dead=(), known=()):
+    """
+    Estima la equity por Monte Carlo procesando los repartos por lotes.
+
+    Args:
+        hole (list): Las dos cartas del jugador
+        board (list): Cartas comunitarias conocidas (0-5)
+        opponents (int): Número total de oponentes
+        trials (int): Número de repartos a simular
+        seed (int | np.random.SeedSequence | np.random.Generator): Semilla o
+            generador de NumPy
+        dead (list): Cartas fuera del mazo (descartadas o vistas)
+        known (list): Manos conocidas de algunos oponentes; solo se reparten
+            las manos de los demás
+
+    Returns:
+        EquityResult: Resultado de la simulación
+    """
+    rng = np.random.default_rng(seed)
+    result = EquityResult()
+    known = [list(hand) for hand in known]
+    deck = remaining_deck(hole, board, dead, *known)
+
+    missing = 5 - len(board)
+    unknown = min(opponents - len(known), (len(deck) - missing) // 2)
+    cards_needed = missing + 2 * unknown
+    # Estados de las cartas fijas, calculados una sola vez: la mesa conocida,
+    # la mano del jugador y las manos conocidas se amplían en cada lote solo
+    # con las cartas repartidas
+    board_state = hand_state(np.asarray(board, dtype=np.int64).reshape(1, len(board)))
+    hole_state = hand_state(np.asarray([hole], dtype=np.int64))
+    known_states = [hand_state(np.asarray([hand], dtype=np.int64)) for hand in known]
+    hand_counts = np.zeros(len(HAND_CATEGORIES), dtype=np.int64)
+    category_share = np.zeros(len(HAND_CATEGORIES))
+    next_street = tracks_next_card(board)
+    card_trials = np.zeros(52, dtype=np.int64)
+    card_share = np.zeros(52)
+
+    done = 0
+    while done < trials:
+        size = min(BATCH_SIZE, trials - done)
+        dealt = deal_batch(deck, size, cards_needed, rng)
+        common = _add_states(board_state, hand_state(dealt[:, :missing]))
+
+        player = evaluate_state(*_add_states(common, hole_state))
+        states = known_states + [hand_state(dealt[:, i:i + 2]) for i in range(missing, cards_needed, 2)]
+        opponent_scores = np.stack([evaluate_state(*_add_states(common, state)) for state in states],
+                                   axis=1)
+
+        # Reducir victorias, empates y derrotas con operaciones de arrays
+        won, tied, shares = showdown_shares(player, opponent_scores)
+        result.wins += int(won.sum())
+        result.ties += int(tied.sum())
+        result.losses += int(size - won.sum() - tied.sum())
+        result.share += float(shares.sum())
+        result.share_sq += float((shares ** 2).sum())
+        categories = player >> CATEGORY_SHIFT
+        hand_counts += np.bincount(categories, minlength=len(HAND_CATEGORIES))
+        category_share += np.bincount(categories, weights=shares, minlength=len(HAND_CATEGORIES))
+        if next_street:
+            for column in range(missing):
+                card_trials += np.bincount(dealt[:, column], minlength=52)
+                card_share += np.bincount(dealt[:, column], weights=shares, minlength=52)
+        done += size
+
+    result.hand_counts = hand_counts.tolist()
+    result.category_share = category_share.tolist()
+    if next_street:
+        result.card_trials = card_trials.tolist()
+        result.card_share = card_share.tolist()
+    return result
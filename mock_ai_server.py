@@ -0,0 +1,174 @@
+"""
+Servidor local de prueba compatible con la API de OpenAI
+--------------------------------------------------------
+Imita un servidor como LM Studio (GET /v1/models y POST
+/v1/chat/completions, con o sin streaming) para probar la aplicación y
+test_ai_connection.py sin conexión ni claves. Cada modelo simulado tiene su
+tiempo hasta el primer token, su velocidad de generación y una proporción
+de errores 503.
+
+Ejemplo:
+    python mock_ai_server.py --port 1234
+    python test_ai_connection.py --benchmark --mock -n 50 -c 8
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Modelos simulados: segundos hasta el primer token, tokens por segundo y
+# proporción de peticiones que fallan
+MOCK_MODELS = {
+    "mock-rapido": {"ttft": 0.05, "tokens_per_second": 200.0, "error_rate": 0.0},
+    "mock-lento": {"ttft": 0.3, "tokens_per_second": 40.0, "error_rate": 0.05},
+}
+
+# Texto de las respuestas (una palabra por token)
+RESPONSE_WORDS = ("OK, funciono correctamente y respondo a las pruebas de conexión "
+                  "del servidor local de modelos de lenguaje.").split()
+
+
+class MockAIHandler(BaseHTTPRequestHandler):
+    """Atiende las peticiones con los modelos de server.models"""
+
+    protocol_version = "HTTP/1.1"  # Conexiones keep-alive, como un servidor real
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [
+                {"id": name, "object": "model", "owned_by": "mock"} for name in self.server.models]})
+        else:
+            self.send_json(404, {"error": {"message": f"Ruta no encontrada: {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": {"message": "JSON no válido"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Ruta no encontrada: {self.path}"}})
+            return
+
+        profile = self.server.models.get(request.get("model"))
+        if profile is None:
+            self.send_json(404, {"error": {"message": f"Modelo desconocido: {request.get('model')}"}})
+            return
+        if self.server.random() < profile.get("error_rate", 0.0):
+            self.send_json(503, {"error": {"message": "Servidor ocupado (error simulado)"}})
+            return
+
+        tokens = RESPONSE_WORDS[:max(1, min(request.get("max_tokens") or len(RESPONSE_WORDS),
+                                            len(RESPONSE_WORDS)))]
+        delay = 1.0 / profile.get("tokens_per_second", 50.0)
+        time.sleep(profile.get("ttft", 0.0))
+        if request.get("stream"):
+            self.stream_tokens(request["model"], tokens, delay)
+        else:
+            time.sleep(delay * (len(tokens) - 1))
+            self.send_json(200, {
+                "id": "mock", "object": "chat.completion", "created": int(time.time()),
+                "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(tokens)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+    def stream_tokens(self, model, tokens, delay):
+        """Envía la respuesta como eventos SSE, un token por fragmento"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(delay)
+            self.send_event({"id": "mock", "object": "chat.completion.chunk", "model": model,
+                             "choices": [{"index": 0, "finish_reason": None,
+                                          "delta": {"content": token if not index else " " + token}}]})
+        self.send_event({"id": "mock", "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}],
+                         "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens),
+                                   "total_tokens": len(tokens)}})
+        self.send_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_event(self, data):
+        self.send_chunk(f"data: {json.dumps(data)}\n\n".encode())
+
+    def send_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockAIServer(ThreadingHTTPServer):
+    """Servidor HTTP con los modelos simulados"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, models=None, seed=None):
+        """
+        Args:
+            host (str): Dirección en la que escuchar
+            port (int): Puerto (0 para uno libre cualquiera)
+            models (dict): {nombre: {"ttft", "tokens_per_second", "error_rate"}}
+                (por defecto MOCK_MODELS)
+            seed (int): Semilla de los errores simulados
+        """
+        super().__init__((host, port), MockAIHandler)
+        self.models = models or MOCK_MODELS
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        """URL base para api_base_url en config.json"""
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def random(self):
+        with self._lock:
+            return self._random.random()
+
+    def model_configs(self):
+        """Sección "api" de config.json con todos los modelos simulados"""
+        return {name: {"api_type": "openai", "api_base_url": self.base_url, "api_key": "",
+                       "model": name, "weight": 1.0} for name in self.models}
+
+    def start(self):
+        """Atiende peticiones en un hilo en segundo plano y devuelve el servidor"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local de prueba compatible con la API de OpenAI')
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=1234, help='Puerto (default: 1234)')
+    parser.add_argument('--seed', type=int, help='Semilla de los errores simulados')
+
+    args = parser.parse_args()
+
+    server = MockAIServer(args.host, args.port, seed=args.seed)
+    print(f"Servidor de prueba en {server.base_url} con los modelos: {', '.join(server.models)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -12,13 +12,28 @@ Versión: 1.1
 
 import tkinter as tk
 from tkinter import ttk
-import random
-import math
 import json
 import os
 import threading
-import requests
-from openai import OpenAI
+import time
+from advisor import AdviceCache, AITransport, fan_out
+from advisor.cache import translate_suits
+from advisor.history import ChatHistory
+from advisor.router import ModelRouter
+from advisor.fanout import DEADLINE, MODEL_TIMEOUT
+from advisor.streaming import Throttle, stream_chat
+
+from holdem import compute_equity
+from holdem.cache import EquityCache
+from holdem.canonical import canonical_key, invert_permutation, suit_permutation
+from holdem.disk_cache import PersistentEquityCache
+from holdem.equity import CalculationCancelled
+from holdem.evaluator import EMPTY_STATE, card_to_int, evaluate_state, hand_name, hand_state
+from holdem.parallel import EquityPool
+
+# Versión del prompt de consejo: cambiarla al modificar el prompt para no
+# reutilizar consejos guardados con el anterior
+ADVICE_PROMPT_VERSION = 1
 
 
 class TexasHoldemCalculator:
@@ -32,9 +47,11 @@ class TexasHoldemCalculator:
     # Métodos de inicialización
     #----------------------------------------
     
-    def __init__(self, root):
-        """Inicializa la aplicación"""
+    def __init__(self, root, equity_pool=None):
+        """Inicializa la aplicación. equity_pool es un holdem.parallel.EquityPool
+        opcional para repartir las simulaciones entre varios núcleos"""
         self.root = root
+        self.equity_pool = equity_pool
         self.root.title("Calculadora de Probabilidades de Texas Hold'em")
         self.root.geometry("1150x760")  # Ventana más ancha para la distribución en dos columnas
         self.root.configure(bg="#05422b")  # Verde oscuro como fondo principal
@@ -42,8 +59,16 @@ class TexasHoldemCalculator:
         # Variables de estado
         self.hand_cards = []  # Cartas de la mano del jugador
         self.table_cards = []  # Cartas de la mesa
+        self.dead_cards = []  # Cartas descartadas o vistas, fuera del mazo
+        self.known_hands = []  # Manos conocidas de rivales (listas de hasta 2 cartas)
         self.opponents = 1    # Número de oponentes
         self.card_buttons = {}  # Referencias a botones
+        self.odds_job = 0  # Identificador del cálculo de probabilidades vigente
+        self.odds_cancel = None  # Evento para cancelar el cálculo en curso
+        self.odds_situation = None  # Situación del cálculo vigente
+        self.last_odds = None  # (situación, resultado) del último cálculo terminado
+        self.state_cards = []  # Cartas (enteros) incluidas en hand_eval_state
+        self.hand_eval_state = EMPTY_STATE  # Estado de la mano y la mesa (solo para mostrar)
         
         # Inicialización del mazo
         self.all_cards = []
@@ -55,8 +80,20 @@ class TexasHoldemCalculator:
         # Configuración de IA
         self.ai_models = {}
         self.ai_clients = {}
+        self.ai_settings = {}  # Sección "ai" de config.json (plazos de las consultas)
+        self.ai_transport = None  # Conexiones compartidas con las APIs de IA
+        self.chat_history = ChatHistory()  # Mensajes anteriores del chat
+        self.chat_router = ModelRouter({})  # Latencias y errores de cada modelo
+        self.ai_advice_job = 0  # Identificador de la consulta de consejo vigente
+        self.ai_advice_cancel = None  # Evento para abandonar la consulta en curso
+        self.ai_advice_prompt = None  # Prompt de la consulta en curso o de la última respondida
+        self.ai_advice_timer = None  # Consulta automática programada (root.after)
+        self.advice_cache = AdviceCache()  # Consejos por modelo y situación canónica
         self.load_ai_config()
         
+        # Caché de resultados por situación canónica (opcionalmente en disco)
+        self.equity_cache = self.create_equity_cache()
+        
         # Crear interfaz
         self.create_widgets()
     
@@ -94,29 +131,50 @@ class TexasHoldemCalculator:
             if os.path.exists("config.json"):
                 with open("config.json", "r") as f:
                     config = json.load(f)
+                    self.ai_settings = config.get("ai", {})
+                    self.advice_cache = AdviceCache.from_config(self.ai_settings)
+                    self.chat_history = ChatHistory.from_config(self.ai_settings)
                     if "api" in config:
                         self.ai_models = config["api"]
                         print(f"Modelos cargados: {list(self.ai_models.keys())}")
                         
-                        # Inicializar clientes de API
+                        # Inicializar clientes de API (compartidos por URL base)
+                        self.ai_transport = AITransport.from_config(self.ai_settings)
                         for model_name, model_config in self.ai_models.items():
                             if model_config["api_type"] == "openai":
                                 try:
-                                    client = OpenAI(
-                                        api_key=model_config["api_key"],
-                                        base_url=model_config["api_base_url"]
-                                    )
-                                    self.ai_clients[model_name] = client
+                                    self.ai_clients[model_name] = self.ai_transport.client(model_config)
                                     print(f"Cliente inicializado para {model_name}")
                                 except Exception as e:
                                     print(f"Error al inicializar cliente para {model_name}: {e}")
                             # Aquí se pueden agregar otros tipos de API
+                        
+                        self.chat_router = ModelRouter.from_config(
+                            {name: self.ai_models[name] for name in self.ai_clients}, self.ai_settings)
+                        
+                        # Abrir las conexiones antes de la primera consulta
+                        self.ai_transport.warm_up(self.ai_models[name] for name in self.ai_clients)
             else:
                 print("No se encontró archivo config.json")
         except Exception as e:
             print(f"Error al cargar configuración AI: {e}")
             self.ai_models = {}
     
+    def create_equity_cache(self):
+        """Crea la caché de equity, con almacén persistente si config.json lo indica"""
+        store = None
+        try:
+            if os.path.exists("config.json"):
+                with open("config.json", "r") as f:
+                    cache_config = json.load(f).get("cache", {})
+                if cache_config.get("path"):
+                    store = PersistentEquityCache(cache_config["path"],
+                                                  cache_config.get("max_entries", 100000))
+                    print(f"Caché persistente de equity: {cache_config['path']}")
+        except Exception as e:
+            print(f"Error al cargar configuración de caché: {e}")
+        return EquityCache(store=store)
+    
     #----------------------------------------
     # Creación de la interfaz
     #----------------------------------------
@@ -188,6 +246,11 @@ class TexasHoldemCalculator:
         # Mostrar slots vacíos para la mano
         for _ in range(2):
             self.display_empty_slot(self.hand_frame, "player")
+        
+        # Cartas muertas y manos conocidas de los rivales
+        self.extra_cards_label = ttk.Label(top_panel, text="", foreground="#ffd700",
+                                          background="#05422b", font=("Arial", 9))
+        self.extra_cards_label.pack()
     
     def create_deck_section(self, parent):
         """Crea la sección para seleccionar cartas del mazo"""
@@ -300,6 +363,19 @@ class TexasHoldemCalculator:
         opponents_spinbox.bind("<<Increment>>", lambda e: self.on_opponents_change())
         opponents_spinbox.bind("<<Decrement>>", lambda e: self.on_opponents_change())
         
+        # Control para elegir a quién se asignan las cartas seleccionadas
+        mode_frame = ttk.Frame(controls_frame)
+        mode_frame.pack(pady=5)
+        
+        mode_label = ttk.Label(mode_frame, text="Seleccionar:", style="TLabel")
+        mode_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.selection_mode_var = tk.StringVar(value="Mano y mesa")
+        mode_combobox = ttk.Combobox(mode_frame, textvariable=self.selection_mode_var, width=14,
+                                     state="readonly",
+                                     values=["Mano y mesa", "Cartas muertas", "Mano de rival"])
+        mode_combobox.pack(side=tk.LEFT)
+        
         # Botones
         buttons_frame = ttk.Frame(controls_frame)
         buttons_frame.pack(pady=5)
@@ -340,6 +416,18 @@ class TexasHoldemCalculator:
                                            text="Fuerza de la mano: -", 
                                            style="Result.TLabel")
         self.hand_strength_label.pack(pady=2, fill=tk.X)
+        
+        # Desglose por categoría final y outs para la siguiente carta
+        self.hand_analysis_label = ttk.Label(results_container, text="",
+                                            foreground="white", background="#05422b",
+                                            font=("Arial", 9), wraplength=300)
+        self.hand_analysis_label.pack(pady=2, fill=tk.X)
+        
+        # Leyenda del mapa de la siguiente carta (colores del mini-deck)
+        self.next_card_label = ttk.Label(results_container, text="",
+                                        foreground="white", background="#05422b",
+                                        font=("Arial", 9), wraplength=300)
+        self.next_card_label.pack(pady=2, fill=tk.X)
     
     def create_recommendations_section(self, parent):
         """Crea la sección de recomendaciones"""
@@ -448,7 +536,9 @@ class TexasHoldemCalculator:
     def select_card(self, card):
         """Maneja la selección/deselección de una carta"""
         # Validar que la carta seleccionada existe y no está ya seleccionada
-        all_selected = self.hand_cards + self.table_cards
+        known_cards = [c for hand in self.known_hands for c in hand]
+        all_selected = self.hand_cards + self.table_cards + self.dead_cards + known_cards
+        mode = self.selection_mode_var.get()
         
         if card in all_selected:
             # Si la carta ya está seleccionada, quitarla
@@ -458,6 +548,27 @@ class TexasHoldemCalculator:
             elif card in self.table_cards:
                 self.table_cards.remove(card)
                 self.show_status(f"Carta {card} eliminada de la mesa")
+            elif card in self.dead_cards:
+                self.dead_cards.remove(card)
+                self.show_status(f"Carta {card} devuelta al mazo")
+            else:
+                for hand in self.known_hands:
+                    if card in hand:
+                        hand.remove(card)
+                self.known_hands = [hand for hand in self.known_hands if hand]
+                self.show_status(f"Carta {card} eliminada de la mano del rival")
+        elif mode == "Cartas muertas":
+            self.dead_cards.append(card)
+            self.show_status(f"{card} marcada como carta muerta")
+        elif mode == "Mano de rival":
+            if self.known_hands and len(self.known_hands[-1]) < 2:
+                self.known_hands[-1].append(card)
+                self.show_status(f"Mano del rival {len(self.known_hands)} completa")
+            elif len(self.known_hands) < self.get_opponents():
+                self.known_hands.append([card])
+                self.show_status(f"{card} añadida al rival {len(self.known_hands)}. Falta 1 carta")
+            else:
+                self.show_status("Ya conoces la mano de todos los oponentes")
         else:
             # Si no está seleccionada, añadirla según corresponda
             if len(self.hand_cards) < 2:
@@ -477,24 +588,57 @@ class TexasHoldemCalculator:
             else:
                 self.show_status("Ya seleccionaste todas las cartas posibles")
         
-        # Actualizar visualización
+        # Actualizar visualización y la mano actual (ampliando el estado anterior)
         self.update_card_display()
+        self.update_hand_state()
+        self.hand_strength_label.config(text=self.format_hand_strength())
         
         # Calcular probabilidad y obtener consejo automáticamente cada vez que cambia el estado
-        if len(self.hand_cards) == 2:
+        if len(self.hand_cards) < 2:
+            self.cancel_odds_calculation()
+        else:
             self.calculate_preliminary_odds()
             
             # Solicitar consejo de IA automáticamente si hay modelos disponibles
             if self.ai_clients:
-                self.get_ai_advice(automatic=True)
+                self.schedule_ai_advice()
+    
+    def update_hand_state(self):
+        """Mantiene el estado parcial del evaluador (holdem.evaluator.hand_state)
+        de la mano y la mesa. En el recorrido habitual calle a calle solo se
+        añaden cartas, así que se amplía el estado anterior con las nuevas; si
+        se ha quitado o cambiado alguna, se calcula de nuevo.
+        
+        Solo se usa para la etiqueta de fuerza de la mano (format_hand_strength).
+        Los cálculos de equity no lo reciben: se hacen en otro hilo o proceso y
+        el motor calcula allí una vez el estado de las cartas fijas
+        (holdem.equity y holdem.vectorized)"""
+        cards = [card_to_int(card) for card in self.hand_cards + self.table_cards]
+        known = len(self.state_cards)
+        if cards[:known] == self.state_cards:
+            self.hand_eval_state = hand_state(cards[known:], self.hand_eval_state)
+        else:
+            self.hand_eval_state = hand_state(cards)
+        self.state_cards = cards
+    
+    def format_hand_strength(self, result=None):
+        """Texto de la fuerza de la mano: la jugada que ya se tiene y, si faltan
+        cartas comunitarias, la jugada final más probable según el cálculo"""
+        if len(self.hand_cards) < 2:
+            return "Fuerza de la mano: -"
+        text = f"Fuerza de la mano: {self.translate_hand(hand_name(evaluate_state(self.hand_eval_state)))}"
+        if result is not None and len(self.table_cards) < 5:
+            text += f" (al final, lo más probable: {self.translate_hand(result.most_common_hand)})"
+        return text
     
     def update_card_display(self):
         """Actualiza la visualización de las cartas seleccionadas"""
         # Actualizar visualización de cartas y destacar seleccionadas
         
-        # Restablecer estilos de todos los botones
+        # Restablecer estilos de todos los botones (y quitar el mapa de la siguiente carta)
         for card_id, button in self.card_buttons.items():
-            button.config(highlightbackground="#000000", highlightthickness=1)
+            button.config(highlightbackground="#000000", highlightthickness=1, bg="#ffffff")
+        self.next_card_label.config(text="")
         
         # Destacar cartas seleccionadas en el mini-deck
         for card in self.hand_cards:
@@ -505,6 +649,23 @@ class TexasHoldemCalculator:
             if card in self.card_buttons:
                 self.card_buttons[card].config(highlightbackground="#3399ff", highlightthickness=2)
         
+        for card in self.dead_cards:
+            if card in self.card_buttons:
+                self.card_buttons[card].config(highlightbackground="#888888", highlightthickness=2)
+        
+        for hand in self.known_hands:
+            for card in hand:
+                if card in self.card_buttons:
+                    self.card_buttons[card].config(highlightbackground="#ff3366", highlightthickness=2)
+        
+        # Resumen de cartas muertas y manos de rivales
+        extra = []
+        if self.dead_cards:
+            extra.append(f"Muertas: {' '.join(self.dead_cards)}")
+        if self.known_hands:
+            extra.append("Rivales: " + ", ".join("".join(hand) for hand in self.known_hands))
+        self.extra_cards_label.config(text="   ".join(extra))
+        
         # Limpiar y actualizar cartas de la mano
         for widget in self.hand_frame.winfo_children():
             widget.destroy()
@@ -528,11 +689,6 @@ class TexasHoldemCalculator:
         # Mostrar slots vacíos para completar la mesa
         for _ in range(5 - len(self.table_cards)):
             self.display_empty_slot(self.community_frame, "community")
-            
-        # Si cambió el estado de la mesa y tenemos la mano completa, 
-        # solicitar consejo de IA automáticamente
-        if len(self.hand_cards) == 2 and self.table_cards and self.ai_clients:
-            self.get_ai_advice(automatic=True)
     
     def display_card(self, parent, card, location="player"):
         """Crea una visualización de una carta en la interfaz"""
@@ -616,21 +772,22 @@ class TexasHoldemCalculator:
     def calculate_preliminary_odds(self):
         """Cálculo rápido para actualizar las probabilidades iniciales"""
         if len(self.hand_cards) == 2:
-            available_cards = [card for card in self.all_cards if card not in self.hand_cards and card not in self.table_cards]
-            win_probability, hand_strength = self.monte_carlo_simulation(available_cards, 100)
-            
-            self.win_probability_label.config(text=f"Probabilidad de ganar: {win_probability:.2f}%")
-            self.hand_strength_label.config(text=f"Fuerza de la mano: {hand_strength}")
-            
-            # Añadir recomendación básica según probabilidad
-            if win_probability > 60:
-                self.show_status("Buena mano inicial. Considerar apostar.")
-            elif win_probability > 40:
-                self.show_status("Mano inicial aceptable. Jugar con cautela.")
-            elif win_probability > 25:
-                self.show_status("Mano inicial débil. Revisar solo si es barato.")
-            else:
-                self.show_status("Mano inicial muy débil. Mejor retirarse temprano.")
+            # Precisión moderada y poco tiempo para no frenar la selección de cartas
+            self.start_odds_calculation(0.01, 0.25, self.show_preliminary_recommendation)
+    
+    def show_preliminary_recommendation(self, result):
+        """Muestra una recomendación básica al terminar el cálculo preliminar"""
+        win_probability = result.equity * 100
+        
+        # Añadir recomendación básica según probabilidad
+        if win_probability > 60:
+            self.show_status("Buena mano inicial. Considerar apostar.")
+        elif win_probability > 40:
+            self.show_status("Mano inicial aceptable. Jugar con cautela.")
+        elif win_probability > 25:
+            self.show_status("Mano inicial débil. Revisar solo si es barato.")
+        else:
+            self.show_status("Mano inicial muy débil. Mejor retirarse temprano.")
     
     def calculate_odds(self):
         """Calcula las probabilidades de ganar con la mano actual"""
@@ -639,29 +796,25 @@ class TexasHoldemCalculator:
             self.show_status("Error: Debes seleccionar exactamente 2 cartas para tu mano")
             return
         
-        try:
-            self.opponents = int(self.opponents_var.get())
-            if self.opponents < 1:
-                self.opponents = 1
-            elif self.opponents > 9:
-                self.opponents = 9
-        except ValueError:
-            self.opponents = 1
+        self.opponents = self.get_opponents()
         
         # Mostrar mensaje de cálculo
         self.show_status("Calculando probabilidades... Por favor espera")
-        self.root.update()
-        
-        # Cartas disponibles
-        available_cards = [card for card in self.all_cards if card not in self.hand_cards and card not in self.table_cards]
-        
-        # Realizar simulación Monte Carlo
-        num_simulations = 1000
-        win_probability, hand_strength = self.monte_carlo_simulation(available_cards, num_simulations)
         
-        # Mostrar resultados
-        self.win_probability_label.config(text=f"Probabilidad de ganar: {win_probability:.2f}%")
-        self.hand_strength_label.config(text=f"Fuerza de la mano: {hand_strength}")
+        # Realizar simulación Monte Carlo (o enumeración exacta si es viable)
+        # hasta alcanzar ±0.5% con un 95% de confianza o agotar el tiempo
+        self.start_odds_calculation(0.005, 3.0, self.show_odds_recommendation)
+    
+    def get_opponents(self):
+        """Lee el número de oponentes del selector, limitado a 1-9"""
+        try:
+            return min(max(int(self.opponents_var.get()), 1), 9)
+        except ValueError:
+            return 1
+    
+    def show_odds_recommendation(self, result):
+        """Muestra la recomendación final y pide consejo a la IA al terminar el cálculo"""
+        win_probability = result.equity * 100
         
         # Mensaje descriptivo basado en la probabilidad
         if win_probability > 80:
@@ -684,59 +837,141 @@ class TexasHoldemCalculator:
         
         # Solicitar consejo de IA automáticamente después del cálculo
         if self.ai_clients:
-            self.get_ai_advice(automatic=True)
-    
-    def monte_carlo_simulation(self, available_cards, num_simulations=1000):
-        """Realiza una simulación Monte Carlo para calcular probabilidades"""
-        # Simulación Monte Carlo para calcular probabilidades
-        wins = 0
-        hand_type_counts = {"High Card": 0, "Pair": 0, "Two Pair": 0, "Three of a Kind": 0, 
-                           "Straight": 0, "Flush": 0, "Full House": 0, "Four of a Kind": 0, 
-                           "Straight Flush": 0, "Royal Flush": 0}
-        
-        for _ in range(num_simulations):
-            # Cartas comunitarias restantes a repartir
-            remaining_community = 5 - len(self.table_cards)
-            
-            # Barajar las cartas disponibles
-            simulation_deck = available_cards.copy()
-            random.shuffle(simulation_deck)
-            
-            # Completar las cartas comunitarias para esta simulación
-            simulation_community = self.table_cards.copy()
-            simulation_community.extend(simulation_deck[:remaining_community])
-            
-            # Generar manos para los oponentes
-            opponent_hands = []
-            cards_used = 0
-            for i in range(self.opponents):
-                opponent_hand = simulation_deck[remaining_community + cards_used:remaining_community + cards_used + 2]
-                cards_used += 2
-                if len(opponent_hand) == 2:  # Asegurarse de que haya suficientes cartas
-                    opponent_hands.append(opponent_hand)
-            
-            # Evaluar la mano del jugador
-            player_score, player_hand_type = self.evaluate_hand(self.hand_cards, simulation_community)
-            hand_type_counts[player_hand_type] += 1
-            
-            # Evaluar las manos de los oponentes
-            player_wins = True
-            for opponent_hand in opponent_hands:
-                opponent_score, _ = self.evaluate_hand(opponent_hand, simulation_community)
-                if opponent_score >= player_score:
-                    player_wins = False
-                    break
-            
-            if player_wins:
-                wins += 1
+            self.schedule_ai_advice()
+    
+    def start_odds_calculation(self, target_half_width, time_budget, on_complete, max_simulations=1000000):
+        """Calcula la equity de la mano actual en un hilo de fondo con holdem.compute_equity,
+        enumerando de forma exacta si quedan pocas combinaciones y con Monte Carlo
+        adaptativo (hasta la precisión o el tiempo indicados) en caso contrario.
+        Las estimaciones parciales se muestran a medida que llegan y, al terminar,
+        se llama a on_complete(result) en el hilo de Tk. Cualquier cálculo anterior
+        que siga en curso se cancela y sus resultados se descartan"""
+        self.cancel_odds_calculation()
+        job = self.odds_job
+        cancel = threading.Event()
+        self.odds_cancel = cancel
+        
+        # Copiar el estado actual: el hilo no debe leer atributos que la interfaz modifica
+        hand = list(self.hand_cards)
+        table = list(self.table_cards)
+        dead = list(self.dead_cards)
+        # Solo cuentan las manos de rival completas; el resto se reparte al azar
+        known = [list(h) for h in self.known_hands if len(h) == 2]
+        opponents = max(self.opponents, len(known))
+        self.odds_situation = self.current_situation()
+        
+        def on_progress(partial):
+            self.root.after(0, lambda: self.show_odds(job, partial, partial=True))
+        
+        def worker():
+            try:
+                result = compute_equity(hand, table, opponents, dead_cards=dead,
+                                        known_hands=known, trials=max_simulations,
+                                        target_half_width=target_half_width,
+                                        time_budget=time_budget,
+                                        cache=self.equity_cache, pool=self.equity_pool,
+                                        progress=on_progress, cancel=cancel)
+            except CalculationCancelled:
+                return
+            except Exception as e:
+                print(f"Error al calcular probabilidades: {e}")
+                return
+            self.root.after(0, lambda: self.show_odds(job, result, on_complete=on_complete))
         
-        # Calcular probabilidad de ganar
-        win_probability = (wins / num_simulations) * 100
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def cancel_odds_calculation(self):
+        """Cancela el cálculo en curso e invalida sus resultados pendientes"""
+        if self.odds_cancel is not None:
+            self.odds_cancel.set()
+            self.odds_cancel = None
+        self.odds_job += 1
+    
+    def show_odds(self, job, result, partial=False, on_complete=None):
+        """Muestra un resultado (parcial o final) si pertenece al cálculo vigente"""
+        if job != self.odds_job:
+            return
         
-        # Determinar la mano más común
-        most_common_hand = max(hand_type_counts.items(), key=lambda x: x[1])[0]
+        text = self.format_probability(result)
+        if partial:
+            text += " (calculando...)"
+        self.win_probability_label.config(text=text)
+        self.hand_strength_label.config(text=self.format_hand_strength(result))
+        self.hand_analysis_label.config(text=self.format_hand_analysis(result))
+        
+        if not partial:
+            self.odds_cancel = None
+            self.last_odds = (self.odds_situation, result)
+            self.show_next_card_map(result)
+            if on_complete is not None:
+                on_complete(result)
+    
+    def show_next_card_map(self, result):
+        """Colorea el mini-deck según cuánto cambia la equity si sale cada carta:
+        verde si mejora, rojo si empeora (intensidad máxima a ±30 puntos). Usa
+        la equity por carta siguiente del propio resultado (solo en flop y
+        turn), la misma de la que salen los outs"""
+        equities = result.next_card_equity
+        if not equities:
+            return
         
-        # Traducir el tipo de mano al español
+        for card, equity in equities.items():
+            if card in self.card_buttons:
+                change = equity - result.equity
+                self.card_buttons[card].config(bg=self.heatmap_color(change / 0.3))
+        
+        best = max(equities, key=equities.get)
+        worst = min(equities, key=equities.get)
+        self.next_card_label.config(
+            text=f"Siguiente carta (verde mejora, rojo empeora): mejor {best} "
+                 f"{equities[best] * 100:.0f}%, peor {worst} {equities[worst] * 100:.0f}%")
+    
+    def heatmap_color(self, value):
+        """Color entre rojo (-1), blanco (0) y verde (1)"""
+        value = min(max(value, -1.0), 1.0)
+        target = (0x33, 0xcc, 0x33) if value > 0 else (0xff, 0x4d, 0x4d)
+        red, green, blue = (round(255 + (channel - 255) * abs(value)) for channel in target)
+        return f"#{red:02x}{green:02x}{blue:02x}"
+    
+    def format_probability(self, result):
+        """Formatea la equity (con los empates repartidos) para la etiqueta de resultados"""
+        text = f"Probabilidad de ganar: {result.equity * 100:.2f}%"
+        if result.ties:
+            text += f" (empate: {result.tie_rate * 100:.2f}%)"
+        if result.exact:
+            text += " [exacta]"
+        else:
+            text += f" ±{result.half_width() * 100:.2f}%"
+        return text
+    
+    def format_hand_analysis(self, result, categories=3, outs=8):
+        """Resume las categorías finales más probables (con la equity en cada
+        una) y los outs para la siguiente carta, a partir de un resultado ya
+        calculado"""
+        distribution = sorted(result.category_distribution.items(), key=lambda item: -item[1])
+        category_equity = result.category_equity
+        lines = []
+        if distribution:
+            lines.append("Mano final: " + ", ".join(
+                f"{self.translate_hand(name)} {frequency * 100:.0f}% (gana {category_equity[name] * 100:.0f}%)"
+                for name, frequency in distribution[:categories]))
+        
+        best_cards = result.outs()
+        if best_cards:
+            text = ", ".join(f"{card} {equity * 100:.0f}%" for card, equity in best_cards[:outs])
+            if len(best_cards) > outs:
+                text += ", ..."
+            lines.append(f"Outs ({len(best_cards)}): {text}")
+        return "\n".join(lines)
+    
+    def current_situation(self):
+        """Devuelve la situación actual (cartas y oponentes) como tupla comparable"""
+        known = tuple(tuple(h) for h in self.known_hands if len(h) == 2)
+        return (tuple(self.hand_cards), tuple(self.table_cards), tuple(self.dead_cards),
+                known, max(self.opponents, len(known)))
+    
+    def translate_hand(self, hand_name):
+        """Traduce el nombre de una categoría de mano al español"""
         hand_translations = {
             "High Card": "Carta Alta",
             "Pair": "Par",
@@ -750,151 +985,7 @@ class TexasHoldemCalculator:
             "Royal Flush": "Escalera Real"
         }
         
-        translated_hand = hand_translations.get(most_common_hand, most_common_hand)
-        
-        return win_probability, translated_hand
-    
-    def evaluate_hand(self, hole_cards, community_cards):
-        """Evalúa la fuerza de una mano de poker"""
-        # Combinar las cartas de la mano y comunitarias
-        all_cards = hole_cards + community_cards
-        
-        # Convertir representaciones de cartas a valores numéricos
-        values = []
-        suits = []
-        for card in all_cards:
-            rank = card[0]
-            suit = card[1]
-            
-            # Convertir rango a valor numérico
-            if rank == "T":
-                value = 10
-            elif rank == "J":
-                value = 11
-            elif rank == "Q":
-                value = 12
-            elif rank == "K":
-                value = 13
-            elif rank == "A":
-                value = 14
-            else:
-                value = int(rank)
-            
-            values.append(value)
-            suits.append(suit)
-        
-        # Ordenar valores
-        values.sort(reverse=True)
-        
-        # Verificar manos posibles
-        
-        # Royal Flush
-        if self.is_straight_flush(values, suits) and 14 in values:
-            return 9, "Royal Flush"
-        
-        # Straight Flush
-        if self.is_straight_flush(values, suits):
-            return 8, "Straight Flush"
-        
-        # Four of a Kind
-        if self.is_four_of_a_kind(values):
-            return 7, "Four of a Kind"
-        
-        # Full House
-        if self.is_full_house(values):
-            return 6, "Full House"
-        
-        # Flush
-        if self.is_flush(suits):
-            return 5, "Flush"
-        
-        # Straight
-        if self.is_straight(values):
-            return 4, "Straight"
-        
-        # Three of a Kind
-        if self.is_three_of_a_kind(values):
-            return 3, "Three of a Kind"
-        
-        # Two Pair
-        if self.is_two_pair(values):
-            return 2, "Two Pair"
-        
-        # Pair
-        if self.is_pair(values):
-            return 1, "Pair"
-        
-        # High Card
-        return 0, "High Card"
-    
-    def is_straight_flush(self, values, suits):
-        """Verifica si hay una escalera de color"""
-        return self.is_straight(values) and self.is_flush(suits)
-    
-    def is_four_of_a_kind(self, values):
-        """Verifica si hay cuatro del mismo valor"""
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        return 4 in value_counts.values()
-    
-    def is_full_house(self, values):
-        """Verifica si hay un full house"""
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        return 3 in value_counts.values() and 2 in value_counts.values()
-    
-    def is_flush(self, suits):
-        """Verifica si hay un color"""
-        suit_counts = {}
-        for suit in suits:
-            suit_counts[suit] = suit_counts.get(suit, 0) + 1
-        
-        return max(suit_counts.values()) >= 5
-    
-    def is_straight(self, values):
-        """Verifica si hay una escalera"""
-        # Eliminar duplicados y ordenar
-        unique_values = sorted(set(values), reverse=True)
-        
-        # Considerar el As como un 1 para straight A-5
-        if 14 in unique_values:
-            unique_values.append(1)
-        
-        # Buscar 5 valores consecutivos
-        for i in range(len(unique_values) - 4):
-            if unique_values[i] - unique_values[i + 4] == 4:
-                return True
-        
-        return False
-    
-    def is_three_of_a_kind(self, values):
-        """Verifica si hay tres del mismo valor"""
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        return 3 in value_counts.values()
-    
-    def is_two_pair(self, values):
-        """Verifica si hay dos pares"""
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        pairs = [value for value, count in value_counts.items() if count == 2]
-        return len(pairs) >= 2
-    
-    def is_pair(self, values):
-        """Verifica si hay un par"""
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        return 2 in value_counts.values()
+        return hand_translations.get(hand_name, hand_name)
     
     #----------------------------------------
     # Métodos para consejos de IA
@@ -905,10 +996,36 @@ class TexasHoldemCalculator:
         self.ai_advice_text.config(state=tk.NORMAL)
         self.ai_advice_text.delete(1.0, tk.END)
         self.ai_advice_text.insert(tk.END, text)
+        # Una respuesta de chat en curso ya no tiene dónde mostrarse
+        self.ai_advice_text.mark_unset("chat_reply_start", "chat_reply_end")
         self.ai_advice_text.config(state=tk.DISABLED)
     
+    def schedule_ai_advice(self):
+        """Programa un consejo automático de la IA. Los cambios seguidos (varios
+        clics o pulsaciones del selector de oponentes) se agrupan: la consulta
+        solo se lanza cuando el estado lleva un momento sin cambiar"""
+        if self.ai_advice_timer is not None:
+            self.root.after_cancel(self.ai_advice_timer)
+        self.ai_advice_timer = self.root.after(self.ai_settings.get("debounce_ms", 500),
+                                               self.run_scheduled_ai_advice)
+    
+    def run_scheduled_ai_advice(self):
+        """Lanza el consejo automático programado por schedule_ai_advice"""
+        self.ai_advice_timer = None
+        self.get_ai_advice(automatic=True)
+    
+    def cancel_ai_advice(self):
+        """Abandona la consulta de consejo en curso e invalida sus resultados pendientes"""
+        if self.ai_advice_cancel is not None:
+            self.ai_advice_cancel.set()
+            self.ai_advice_cancel = None
+        self.ai_advice_job += 1
+        self.ai_advice_prompt = None
+    
     def get_ai_advice(self, automatic=False):
-        """Consulta a múltiples modelos de IA para obtener consejos sobre la mano actual"""
+        """Consulta a múltiples modelos de IA para obtener consejos sobre la mano
+        actual. Una consulta automática igual a la que está en curso (o a la
+        última respondida) no se repite; cualquier otra sustituye a la anterior"""
         # Verificar que hay suficientes cartas seleccionadas
         if len(self.hand_cards) != 2:
             if not automatic:  # Solo mostrar error si fue solicitud manual
@@ -926,17 +1043,22 @@ class TexasHoldemCalculator:
         table_description = self.format_cards_for_ai(self.table_cards)
         opponents_count = self.opponents_var.get()
         
-        # Mostrar estado de procesamiento
-        if automatic:
-            if "Los consejos de IA aparecerán aquí" in self.ai_advice_text.get("1.0", tk.END):
-                # Si es la primera vez, reemplazar el texto inicial
-                self.update_ai_advice_text("Consultando AI para analizar la jugada...")
-            else:
-                # Si ya hay contenido, añadir mensaje de actualización al final
-                self.append_ai_text("\n\nActualizando análisis...")
-        else:
-            self.update_ai_advice_text("Consultando a los modelos de IA... Por favor espera.")
-        self.root.update()
+        # Cartas muertas y manos de rivales conocidas, si las hay
+        extra_description = ""
+        if self.dead_cards:
+            extra_description += f"\n        Cartas muertas (fuera del mazo): {self.format_cards_for_ai(self.dead_cards)}"
+        for index, hand in enumerate(self.known_hands, 1):
+            if len(hand) == 2:
+                extra_description += f"\n        Mano conocida del rival {index}: {self.format_cards_for_ai(hand)}"
+        
+        # Reutilizar el último cálculo si corresponde a la situación actual
+        with_odds = self.last_odds is not None and self.last_odds[0] == self.current_situation()
+        if with_odds:
+            result = self.last_odds[1]
+            extra_description += f"\n        Equity calculada: {result.equity * 100:.1f}%"
+            analysis = self.format_hand_analysis(result)
+            if analysis:
+                extra_description += "\n        " + analysis.replace("\n", "\n        ")
         
         # Crear el prompt para la IA
         prompt = f"""
@@ -944,7 +1066,7 @@ class TexasHoldemCalculator:
         
         Mi mano: {hand_description}
         Cartas comunitarias: {table_description if table_description else "Ninguna carta en la mesa todavía"}
-        Número de oponentes: {opponents_count}
+        Número de oponentes: {opponents_count}{extra_description}
         
         Responde en 3 puntos numerados y concisos (máximo 2 líneas cada uno):
         1. Evaluación de la fuerza de la mano actual
@@ -952,65 +1074,203 @@ class TexasHoldemCalculator:
         3. Recomendación estratégica específica para esta situación
         """
         
+        # Misma situación que la consulta en curso o ya respondida: nada que hacer
+        if automatic and prompt == self.ai_advice_prompt:
+            return
+        
+        # Sustituir la consulta anterior, que queda obsoleta
+        self.cancel_ai_advice()
+        job = self.ai_advice_job
+        cancel = threading.Event()
+        self.ai_advice_cancel = cancel
+        self.ai_advice_prompt = prompt
+        
+        # Mostrar estado de procesamiento
+        if automatic:
+            if "Los consejos de IA aparecerán aquí" in self.ai_advice_text.get("1.0", tk.END):
+                # Si es la primera vez, reemplazar el texto inicial
+                self.update_ai_advice_text("Consultando AI para analizar la jugada...")
+            else:
+                # Si ya hay contenido, añadir mensaje de actualización al final
+                self.append_ai_text("\n\nActualizando análisis...")
+        else:
+            self.update_ai_advice_text("Consultando a los modelos de IA... Por favor espera.")
+        
         # Ejecutar las consultas en un hilo separado para no bloquear la interfaz
-        threading.Thread(target=self.run_ai_queries, args=(prompt, automatic)).start()
+        threading.Thread(target=self.run_ai_queries,
+                         args=(prompt, automatic, job, cancel, self.advice_situation(with_odds)),
+                         daemon=True).start()
+    
+    def advice_situation(self, with_odds):
+        """Devuelve (clave, permutación de palos) de la situación del consejo:
+        la clave canónica (holdem.canonical) más si el prompt incluye la equity
+        calculada, y la permutación que lleva los palos reales a los canónicos"""
+        hole = [card_to_int(card) for card in self.hand_cards]
+        board = [card_to_int(card) for card in self.table_cards]
+        dead = [card_to_int(card) for card in self.dead_cards]
+        known = [[card_to_int(card) for card in hand] for hand in self.known_hands if len(hand) == 2]
+        key = canonical_key(hole, board, self.opponents_var.get(), dead, known) + (with_odds,)
+        return key, suit_permutation([hole, board, dead], known)
     
-    def run_ai_queries(self, prompt, automatic=False):
-        """Ejecuta consultas a múltiples modelos de IA y combina sus respuestas"""
+    def run_ai_queries(self, prompt, automatic=False, job=None, cancel=None, situation=None):
+        """Consulta a todos los modelos de IA a la vez, cada uno con su tiempo
+        límite y todos con un plazo global. Las respuestas se muestran en
+        streaming a medida que se generan (con refrescos agrupados) y, al
+        terminar o vencer el plazo, se combinan las recibidas. Si la consulta
+        queda obsoleta (otro job o cancel activado) se abandona y no se muestra.
+        Con situation (ver advice_situation) los consejos se buscan primero en
+        la caché y las respuestas completas nuevas se guardan en ella"""
+        if job is None:
+            job = self.ai_advice_job
+        
+        def show(update):
+            # Mostrar en el hilo de Tk solo si la consulta sigue vigente
+            self.root.after(0, lambda: update() if job == self.ai_advice_job else None)
+
         all_responses = {}
-        
-        # Consultar a cada modelo disponible
-        for model_name, client in self.ai_clients.items():
-            try:
-                # Obtener configuración del modelo
-                model_config = self.ai_models[model_name]
-                model_id = model_config["model"]
-                
-                # Realizar la consulta según el tipo de API
-                if model_config["api_type"] == "openai":
-                    response = client.chat.completions.create(
-                        model=model_id,
-                        messages=[
-                            {"role": "system", "content": "Eres un experto en póker que da consejos concisos y estratégicos."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=200
-                    )
-                    advice = response.choices[0].message.content
-                    all_responses[model_name] = {
-                        "text": advice,
-                        "weight": model_config.get("weight", 1.0)
-                    }
-                    
-                    # Actualizar el área de texto con progreso si no es automático
-                    if not automatic:
-                        self.root.after(0, lambda: self.update_ai_progress(f"Consultando modelos... ({len(all_responses)}/{len(self.ai_clients)})"))
+        failed = []
+        streams = {}  # Texto recibido hasta ahora, por orden de llegada del primer token
+        cancels = {model_name: threading.Event() for model_name in self.ai_clients}
+        
+        def render():
+            partial = dict(streams)
+            if not partial or job != self.ai_advice_job:
+                return
+            if automatic or len(cancels) == 1:
+                # En modo automático (o con un solo modelo) se muestra el primero que responde
+                self.update_ai_advice_text(next(iter(partial.values())))
+                return
+            responses = {model_name: {"text": text, "weight": self.ai_models[model_name].get("weight", 1.0),
+                                      "stats": all_responses.get(model_name, {}).get("stats"),
+                                      "cached": all_responses.get(model_name, {}).get("cached", False)}
+                         for model_name, text in partial.items()}
+            waiting = len(cancels) - len(all_responses) - len(failed)
+            text = self.combine_ai_responses(responses).rstrip()
+            if waiting:
+                text += f"\n\nEsperando a {waiting} modelo(s)..."
+            self.update_ai_advice_text(text)
+        
+        throttle = Throttle(self.root.after, render)
+        
+        def query(model_name):
+            # Consejo ya guardado para esta situación (o una con los palos permutados)
+            if situation is not None:
+                key, perm = situation
+                key = (model_name, self.ai_models[model_name].get("model"), ADVICE_PROMPT_VERSION) + key
+                cached = self.advice_cache.get(key)
+                if cached is not None:
+                    return translate_suits(cached, invert_permutation(perm)), None
             
-            except Exception as e:
-                print(f"Error consultando al modelo {model_name}: {e}")
+            def on_text(text):
+                streams[model_name] = text
+                throttle.request()
+            text, stats = self.query_model(model_name, "Eres un experto en póker que da consejos concisos y estratégicos.",
+                                           prompt, 200, on_text, cancels[model_name])
+            # Solo se guardan las respuestas leídas enteras
+            if situation is not None and text and not cancels[model_name].is_set():
+                self.advice_cache.put(key, translate_suits(text, perm))
+            return text, stats
+        
+        def on_result(model_name, response):
+            text, stats = response
+            if stats is not None and stats.first_token is not None:
+                self.chat_router.record_success(model_name, stats.first_token)
+            all_responses[model_name] = {
+                "text": text,
+                "weight": self.ai_models[model_name].get("weight", 1.0),
+                "stats": stats,
+                "cached": stats is None
+            }
+            streams[model_name] = text
+            throttle.request()
+        
+        def on_error(model_name, error):
+            failed.append(model_name)
+            self.chat_router.record_failure(model_name)
+            cancels[model_name].set()
+            streams.pop(model_name, None)
+            print(f"Error consultando al modelo {model_name}: {error}")
+        
+        calls = {model_name: (lambda model_name=model_name: query(model_name)) for model_name in cancels}
+        timeouts = {model_name: self.model_timeout(model_name) for model_name in calls}
+        fan_out(calls, timeouts, self.ai_settings.get("deadline", DEADLINE), on_result, on_error, cancel)
+        throttle.close()
+        
+        # Dejar de leer las respuestas que aún sigan llegando (plazo vencido o consulta abandonada)
+        for event in cancels.values():
+            event.set()
+        if cancel is not None and cancel.is_set():
+            return
         
-        # Combinar todas las respuestas
+        # Resultado final con las respuestas recibidas a tiempo
         if all_responses:
-            # Si solo hay un modelo, mostrar directamente su respuesta sin formato adicional
-            if len(all_responses) == 1 or automatic:
-                # Con un solo modelo o en modo automático, mostramos directamente la respuesta
-                model_name = list(all_responses.keys())[0]
+            if automatic or len(all_responses) == 1:
+                # La respuesta mostrada durante el streaming si terminó; si no, la primera completa
+                model_name = next((name for name in dict(streams) if name in all_responses),
+                                  next(iter(all_responses)))
                 advice_text = all_responses[model_name]["text"]
-                self.root.after(0, lambda: self.update_ai_advice_text(advice_text))
+                status = f"IA ({model_name}): {self.format_response_stats(all_responses[model_name])}"
+                show(lambda: (self.update_ai_advice_text(advice_text), self.show_status(status)))
             else:
-                # Con múltiples modelos y solicitud manual, mostramos el formato completo con consenso
-                combined_advice = self.combine_ai_responses(all_responses)
-                self.root.after(0, lambda: self.update_ai_advice_text(combined_advice))
+                # Con varias respuestas y solicitud manual, mostrar el formato completo con consenso
+                combined_advice = self.combine_ai_responses(all_responses, missing=failed)
+                show(lambda: self.update_ai_advice_text(combined_advice))
         else:
+            # Sin respuestas, la misma situación se podrá volver a consultar
+            show(lambda: setattr(self, "ai_advice_prompt", None))
             if not automatic:  # Solo mostrar error si no es automático
-                self.root.after(0, lambda: self.update_ai_advice_text("No se pudo obtener consejos de los modelos de IA."))
+                show(lambda: self.update_ai_advice_text("No se pudo obtener consejos de los modelos de IA."))
+    
+    def model_timeout(self, model_name):
+        """Segundos que se espera a un modelo: su campo timeout en config.json o,
+        si no lo tiene, el de la sección ai"""
+        return self.ai_models[model_name].get("timeout", self.ai_settings.get("timeout", MODEL_TIMEOUT))
+    
+    def query_model(self, model_name, system_prompt, prompt, max_tokens, on_text=None, cancel=None, history=()):
+        """Envía una consulta a un modelo en streaming a través del transporte
+        compartido (turno por URL base y reintentos ante errores pasajeros).
+        history son los turnos anteriores de la conversación ({"role",
+        "content"}), que van entre el mensaje de sistema y el prompt. on_text
+        recibe el texto acumulado a medida que llega (desde el hilo de la
+        consulta). Devuelve (texto, advisor.streaming.StreamStats) y lanza
+        una excepción si la consulta falla o supera su tiempo límite (el de
+        model_timeout, que también limita cada petición HTTP; no se reintenta
+        una vez vencido)"""
+        model_config = self.ai_models[model_name]
+        if model_config["api_type"] != "openai":
+            raise ValueError(f"Tipo de API no soportado: {model_config['api_type']}")
+        messages = [{"role": "system", "content": system_prompt}, *history,
+                    {"role": "user", "content": prompt}]
+        timeout = self.model_timeout(model_name)
+        return self.ai_transport.call(model_config["api_base_url"], lambda: stream_chat(
+            self.ai_clients[model_name],
+            model_config["model"],
+            messages,
+            max_tokens,
+            timeout=timeout,
+            on_text=on_text,
+            cancel=cancel
+        ), cancel, deadline=time.monotonic() + timeout)
+    
+    def format_response_stats(self, response_data):
+        """Origen y tiempos de una respuesta (ver combine_ai_responses)"""
+        if response_data.get("cached"):
+            return "desde caché"
+        return self.format_stream_stats(response_data.get("stats"))
+    
+    def format_stream_stats(self, stats):
+        """Resume el tiempo hasta el primer token y la velocidad de una respuesta"""
+        if stats is None or stats.first_token is None:
+            return "sin texto"
+        return f"primer token {stats.first_token:.2f}s, {stats.tokens_per_second:.0f} tokens/s"
     
     def update_ai_progress(self, message):
         """Actualiza el progreso de las consultas de IA"""
         self.update_ai_advice_text(message)
     
-    def combine_ai_responses(self, responses):
-        """Combina las respuestas de múltiples modelos según sus pesos"""
+    def combine_ai_responses(self, responses, missing=()):
+        """Combina las respuestas de múltiples modelos según sus pesos. missing
+        son los modelos que fallaron o no respondieron a tiempo"""
         if not responses:
             return "No se recibieron respuestas de los modelos."
             
@@ -1018,7 +1278,10 @@ class TexasHoldemCalculator:
         
         # Añadir respuesta de cada modelo
         for model_name, response_data in responses.items():
-            combined_text += f"--- {model_name.upper()} ---\n"
+            if response_data.get("cached") or response_data.get("stats") is not None:
+                combined_text += f"--- {model_name.upper()} ({self.format_response_stats(response_data)}) ---\n"
+            else:
+                combined_text += f"--- {model_name.upper()} ---\n"
             combined_text += response_data["text"] + "\n\n"
         
         # Si hay más de un modelo, añadir un resumen consensuado
@@ -1029,6 +1292,9 @@ class TexasHoldemCalculator:
             # Por simplicidad, usamos la respuesta del modelo con mayor peso
             best_model = max(responses.items(), key=lambda x: x[1]["weight"])
             combined_text += self.extract_recommendation(best_model[1]["text"])
+        
+        if missing:
+            combined_text = combined_text.rstrip() + f"\n\nSin respuesta a tiempo: {', '.join(missing)}"
             
         return combined_text
     
@@ -1102,8 +1368,7 @@ class TexasHoldemCalculator:
             return
             
         # Agregar mensaje del usuario al área de consejos de IA
-        current_text = self.ai_advice_text.get("1.0", tk.END)
-        self.update_ai_advice_text(current_text + f"\n\nTú: {message}")
+        self.append_ai_text(f"Tú: {message}")
         
         # Limpiar entrada
         self.chat_entry.delete(0, tk.END)
@@ -1113,9 +1378,8 @@ class TexasHoldemCalculator:
             self.append_ai_text("IA: No hay modelos de IA configurados. Por favor configura un modelo para chatear.")
             return
             
-        # Mostrar indicador de espera
-        self.append_ai_text("IA: Pensando...")
-        self.root.update()
+        # Mostrar indicador de espera (la respuesta lo irá sustituyendo)
+        self.begin_chat_reply()
         
         # Crear contexto para la IA basado en el estado actual del juego
         hand_description = self.format_cards_for_ai(self.hand_cards) if self.hand_cards else "No has seleccionado cartas de mano"
@@ -1126,12 +1390,10 @@ class TexasHoldemCalculator:
         if hasattr(self, 'win_probability_label'):
             probability_text = self.win_probability_label.cget("text")
             if ":" in probability_text:
-                probability_info = f"Probabilidad de ganar: {probability_text.split(':')[1].strip()}"
+                probability_info = f"Probabilidad de ganar: {probability_text.split(':', 1)[1].strip()}"
         
-        # Obtener el historial de conversación previo (últimos 5 intercambios)
-        conversation_history = self.extract_conversation_history()
-        
-        # Construir el prompt de contexto con historial
+        # Construir el prompt con el contexto actual; los mensajes anteriores
+        # se envían aparte como turnos de la conversación (ver chat_history)
         context = f"""
         Como experto en póker, responde a la siguiente pregunta de forma breve y directa.
         
@@ -1141,9 +1403,6 @@ class TexasHoldemCalculator:
         - Oponentes: {self.opponents_var.get()}
         - {probability_info}
         
-        HISTORIAL DE CONVERSACIÓN RECIENTE:
-        {conversation_history}
-        
         PREGUNTA ACTUAL DEL JUGADOR: {message}
         
         Responde de manera concisa (máximo 3 líneas) con un consejo estratégico específico para esta situación.
@@ -1151,104 +1410,84 @@ class TexasHoldemCalculator:
         """
         
         # Enviar en un hilo separado para no bloquear la interfaz
-        threading.Thread(target=self.process_chat_message, args=(context,)).start()
-    
-    def extract_conversation_history(self):
-        """Extrae el historial de conversación de chat del área de consejos"""
-        # Obtener todo el texto del área
-        all_text = self.ai_advice_text.get("1.0", tk.END)
-        
-        # Buscar todos los intercambios de chat (Tú: ... IA: ...)
-        chat_lines = []
-        lines = all_text.split('\n')
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith("Tú:"):
-                # Encontrar la respuesta de IA que le corresponde
-                user_message = line
-                ia_response = ""
-                for j in range(i + 1, len(lines)):
-                    if lines[j].strip().startswith("IA:"):
-                        ia_response = lines[j].strip()
-                        i = j  # Actualizar índice para continuar desde aquí
-                        break
-                if user_message and ia_response:
-                    chat_lines.append(user_message)
-                    chat_lines.append(ia_response)
-            i += 1
-        
-        # Limitar a los últimos 5 intercambios (10 líneas: pregunta + respuesta)
-        if len(chat_lines) > 10:
-            chat_lines = chat_lines[-10:]
-        
-        return "\n".join(chat_lines)
-    
-    def process_chat_message(self, prompt):
-        """Procesa el mensaje de chat enviándolo a la IA y mostrando la respuesta"""
+        threading.Thread(target=self.process_chat_message,
+                         args=(message, context, self.chat_history.messages()),
+                         daemon=True).start()
+    
+    def process_chat_message(self, message, prompt, history=()):
+        """Procesa el mensaje de chat enviándolo a la IA, junto con los turnos
+        anteriores de history, y muestra la respuesta en streaming en lugar del
+        mensaje "IA: Pensando...". chat_router elige el modelo (y consulta a
+        un segundo si el primero tarda en empezar a responder). Al terminar, la pregunta (sin el contexto
+        de la partida) y la respuesta se añaden a chat_history"""
+        reply = {"text": ""}
+        throttle = Throttle(self.root.after, lambda: self.show_chat_reply(reply["text"]))
+        
+        def on_text(text):
+            reply["text"] = text
+            throttle.request()
+        
+        def finish(advice, status):
+            self.chat_history.add_exchange(message, advice)
+            self.show_chat_reply(advice, final=True)
+            self.show_status(status)
+        
+        def query(model_name, on_text, cancel):
+            return self.query_model(
+                model_name,
+                "Eres un experto en póker que da consejos concisos y estratégicos. Mantén el contexto conversacional y responde apropiadamente basándote en el historial de la conversación.",
+                prompt, 150, on_text, cancel, history=history)
+        
         try:
-            # Tomar el primer modelo disponible para el chat
-            model_name = list(self.ai_clients.keys())[0]
-            client = self.ai_clients[model_name]
-            model_config = self.ai_models[model_name]
-            model_id = model_config["model"]
+            # El modelo sano más rápido, con un segundo modelo si tarda más de lo habitual
+            model_name, (advice, stats) = self.chat_router.run(query, on_text)
+            throttle.close()
             
-            # Consulta al modelo
-            if model_config["api_type"] == "openai":
-                # Crear un array de mensajes para mantener el contexto conversacional
-                response = client.chat.completions.create(
-                    model=model_id,
-                    messages=[
-                        {"role": "system", "content": "Eres un experto en póker que da consejos concisos y estratégicos. Mantén el contexto conversacional y responde apropiadamente basándote en el historial de la conversación."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=150
-                )
-                advice = response.choices[0].message.content
-                
-                # Actualizar área de consejos y reemplazar mensaje de "Pensando..."
-                self.root.after(0, lambda: self.replace_thinking_text(f"IA: {advice}"))
+            status = f"IA ({model_name}): {self.format_stream_stats(stats)}"
+            self.root.after(0, lambda: finish(advice, status))
             
         except Exception as e:
+            throttle.close()
             print(f"Error al procesar mensaje de chat: {e}")
-            self.root.after(0, lambda: self.replace_thinking_text(f"IA: Lo siento, hubo un error al procesar tu pregunta."))
+            self.root.after(0, lambda: self.show_chat_reply("Lo siento, hubo un error al procesar tu pregunta.", final=True))
     
     def append_ai_text(self, text):
         """Añade texto al área de consejos de IA sin eliminar el contenido previo"""
         self.ai_advice_text.config(state=tk.NORMAL)
-        if self.ai_advice_text.get("1.0", tk.END).strip():
+        if self.ai_advice_text.compare("end-1c", ">", "1.0"):
             self.ai_advice_text.insert(tk.END, "\n\n")
         self.ai_advice_text.insert(tk.END, text)
         self.ai_advice_text.see(tk.END)  # Scroll al final
         self.ai_advice_text.config(state=tk.DISABLED)
     
-    def replace_thinking_text(self, text):
-        """Reemplaza el último mensaje 'IA: Pensando...' con la respuesta real"""
+    def begin_chat_reply(self):
+        """Añade "IA: Pensando..." al final del área de consejos, entre las
+        marcas chat_reply_start y chat_reply_end, donde show_chat_reply irá
+        sustituyéndolo por la respuesta"""
+        self.append_ai_text("")
         self.ai_advice_text.config(state=tk.NORMAL)
-        
-        # Buscar último mensaje "IA: Pensando..."
-        content = self.ai_advice_text.get("1.0", tk.END)
-        if "IA: Pensando..." in content:
-            # Encontrar la última ocurrencia
-            last_thinking = content.rindex("IA: Pensando...")
-            
-            # Encontrar el final de la línea o el final del texto
-            end_line = content.find("\n", last_thinking)
-            if end_line == -1:  # Si no hay salto de línea, usar el final del texto
-                end_line = len(content)
-            
-            # Borrar desde la posición de "IA: Pensando..." hasta el final de esa línea
-            self.ai_advice_text.delete(f"1.0 + {last_thinking}c", f"1.0 + {end_line}c")
-            
-            # Insertar el nuevo texto
-            self.ai_advice_text.insert(f"1.0 + {last_thinking}c", text)
-        else:
-            # Si no encontramos el mensaje de pensando, solo agregamos el nuevo
-            self.append_ai_text(text)
-            
+        self.ai_advice_text.mark_set("chat_reply_start", "end-1c")
+        self.ai_advice_text.mark_gravity("chat_reply_start", tk.LEFT)
+        self.ai_advice_text.mark_set("chat_reply_end", "end-1c")
+        self.ai_advice_text.mark_gravity("chat_reply_end", tk.RIGHT)
+        self.ai_advice_text.insert("chat_reply_end", "IA: Pensando...")
         self.ai_advice_text.see(tk.END)  # Scroll al final
         self.ai_advice_text.config(state=tk.DISABLED)
     
+    def show_chat_reply(self, text, final=False):
+        """Muestra la respuesta del chat recibida hasta ahora en lugar del texto
+        anterior entre las marcas de begin_chat_reply (o en un bloque nuevo si
+        el área se ha reemplazado mientras tanto)"""
+        if "chat_reply_start" not in self.ai_advice_text.mark_names():
+            self.begin_chat_reply()
+        self.ai_advice_text.config(state=tk.NORMAL)
+        self.ai_advice_text.delete("chat_reply_start", "chat_reply_end")
+        self.ai_advice_text.insert("chat_reply_end", f"IA: {text}")
+        if final:
+            self.ai_advice_text.mark_unset("chat_reply_start", "chat_reply_end")
+        self.ai_advice_text.see(tk.END)
+        self.ai_advice_text.config(state=tk.DISABLED)
+    
     #----------------------------------------
     # Eventos de cambio de estado
     #----------------------------------------
@@ -1257,8 +1496,8 @@ class TexasHoldemCalculator:
         """Manejador para cuando cambia el número de oponentes"""
         # Si tenemos cartas de mano y configuración AI, actualizar consejo
         if len(self.hand_cards) == 2 and self.ai_clients:
-            # Esperar un momento para que el valor se actualice
-            self.root.after(100, lambda: self.get_ai_advice(automatic=True))
+            # Cada pulsación del selector reprograma la consulta en lugar de lanzar otra
+            self.schedule_ai_advice()
     
     #----------------------------------------
     # Métodos misceláneos
@@ -1270,20 +1509,33 @@ class TexasHoldemCalculator:
     
     def reset(self):
         """Reinicia la aplicación a su estado inicial"""
-        # Reiniciar variables
+        # Reiniciar variables y descartar cualquier cálculo o consulta en curso
+        self.cancel_odds_calculation()
+        self.cancel_ai_advice()
+        self.chat_history.clear()
+        if self.ai_advice_timer is not None:
+            self.root.after_cancel(self.ai_advice_timer)
+            self.ai_advice_timer = None
         self.hand_cards = []
         self.table_cards = []
+        self.dead_cards = []
+        self.known_hands = []
+        self.state_cards = []
+        self.hand_eval_state = EMPTY_STATE
+        self.selection_mode_var.set("Mano y mesa")
         
         # Limpiar visualización
         self.update_card_display()
         
         # Reiniciar estilos de botones
         for card_id, button in self.card_buttons.items():
-            button.config(highlightbackground="#000000", highlightthickness=1)
+            button.config(highlightbackground="#000000", highlightthickness=1, bg="#ffffff")
         
         # Reiniciar etiquetas de resultados
         self.win_probability_label.config(text="Probabilidad de ganar: -")
         self.hand_strength_label.config(text="Fuerza de la mano: -")
+        self.hand_analysis_label.config(text="")
+        self.last_odds = None
         
         # Reiniciar sección de IA
         self.update_ai_advice_text("Los consejos de IA aparecerán aquí. Selecciona tus cartas para recibir análisis automático.\n\nIA: Hola, puedes preguntarme sobre estrategias de póker.")
@@ -1294,9 +1546,18 @@ class TexasHoldemCalculator:
 
 # Función principal para iniciar la aplicación
 def main():
-    root = tk.Tk()
-    app = TexasHoldemCalculator(root)
-    root.mainloop()
+    # Arrancar el pool de procesos antes de crear la ventana, para que los
+    # workers no hereden el estado de Tk
+    equity_pool = EquityPool().start()
+    try:
+        root = tk.Tk()
+        app = TexasHoldemCalculator(root, equity_pool)
+        root.mainloop()
+        if app.ai_transport is not None:
+            app.ai_transport.close()
+        app.advice_cache.close()
+    finally:
+        equity_pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 import json
 import os
+import threading
 import time
 import traceback
-from openai import OpenAI
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from advisor import AITransport
+from advisor.router import percentile
+from advisor.streaming import stream_chat
 import logging
 import sys
 
@@ -18,22 +22,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger("api_test")
 
-def test_ai_connections(verbose=True, timeout=30):
-    """
-    Prueba las conexiones a los modelos configurados en config.json
-    
-    Args:
-        verbose (bool): Si es True, muestra informacion detallada
-        timeout (int): Tiempo maximo de espera para las conexiones en segundos
-    """
-    
-    logger.info("Iniciando pruebas de conexiones a modelos de IA...")
-    start_time = time.time()
-    
+# Archivos donde se guardan los resultados de las pruebas y del benchmark
+# (los de --mock aparte, para no sustituir los de los modelos reales)
+RESULTS_FILE = "connection_test_results.json"
+MOCK_RESULTS_FILE = "connection_test_results_mock.json"
+
+# Prompt de prueba y peticiones del benchmark por defecto
+TEST_PROMPT = "Responde solo con un 'OK' para confirmar que estas funcionando."
+BENCHMARK_REQUESTS = 20
+BENCHMARK_CONCURRENCY = 4
+BENCHMARK_MAX_TOKENS = 32
+
+def load_config(verbose=True):
+    """Carga config.json (mostrando su contenido sin las claves si verbose) o devuelve None"""
     # Verificar si existe el archivo de configuracion
     if not os.path.exists("config.json"):
         logger.error("No se encontro el archivo config.json")
-        return False
+        return None
     
     # Cargar configuracion
     try:
@@ -56,12 +61,37 @@ def test_ai_connections(verbose=True, timeout=30):
     except Exception as e:
         logger.error(f"Error al cargar el archivo config.json: {e}")
         logger.debug(traceback.format_exc())
-        return False
+        return None
+    return config
+
+def test_ai_connections(verbose=True, timeout=30, config=None, output=RESULTS_FILE):
+    """
+    Prueba las conexiones a los modelos configurados en config.json
+    
+    Args:
+        verbose (bool): Si es True, muestra informacion detallada
+        timeout (int): Tiempo maximo de espera para las conexiones en segundos
+        config (dict): Configuracion a usar en lugar de config.json (por
+            ejemplo, la del servidor de prueba de mock_ai_server.py)
+        output (str): Archivo JSON donde guardar los resultados
+    """
+    
+    logger.info("Iniciando pruebas de conexiones a modelos de IA...")
+    start_time = time.time()
+    
+    if config is None:
+        config = load_config(verbose)
+        if config is None:
+            return False
     
     if "api" not in config:
         logger.error("No se encontro la seccion 'api' en config.json")
         return False
     
+    # Transporte compartido (el mismo que usa la interfaz) con el timeout indicado
+    transport = AITransport.from_config(config.get("ai", {}))
+    transport.read_timeout = timeout
+    
     # Probar cada modelo
     successful_models = []
     failed_models = []
@@ -105,11 +135,11 @@ def test_ai_connections(verbose=True, timeout=30):
             
             if model_config["api_type"].lower() == "openai":
                 test_openai_connection(model_name, model_config, verbose, timeout, 
-                                      successful_models, failed_models, results)
+                                      successful_models, failed_models, results, transport)
                 
             elif model_config["api_type"].lower() == "anthropic":
                 test_anthropic_connection(model_name, model_config, verbose, timeout,
-                                         successful_models, failed_models, results)
+                                         successful_models, failed_models, results, transport)
                 
             else:
                 error_msg = f"Tipo de API no soportado: {model_config['api_type']}"
@@ -158,7 +188,7 @@ def test_ai_connections(verbose=True, timeout=30):
     logger.info("="*70)
     
     # Guardar resultados en un archivo
-    results_file = "connection_test_results.json"
+    results_file = output
     with open(results_file, "w", encoding="utf-8") as f:
         json.dump({
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -171,11 +201,12 @@ def test_ai_connections(verbose=True, timeout=30):
     
     logger.info(f"Resultados detallados guardados en {results_file}")
     
+    transport.close()
     return len(failed_models) == 0
 
 def test_openai_connection(model_name, model_config, verbose, timeout, 
-                         successful_models, failed_models, results):
-    """Prueba la conexion a una API tipo OpenAI"""
+                         successful_models, failed_models, results, transport=None):
+    """Prueba la conexion a una API tipo OpenAI a traves del transporte compartido"""
     
     logger.info(f"Probando conexion a {model_name} (tipo: OpenAI)...")
     
@@ -186,37 +217,26 @@ def test_openai_connection(model_name, model_config, verbose, timeout,
         logger.debug(f"  - Autenticacion: {'No requerida' if not model_config.get('api_key') else 'Requerida'}")
         
     try:
-        # Crear cliente OpenAI con timeout
-        # Si api_key no está presente o está vacía, usamos None para endpoints sin autenticación (LMStudio)
-        client_kwargs = {
-            "base_url": model_config["api_base_url"],
-            "timeout": timeout
-        }
-        
-        # Solo agregamos api_key si existe y no está vacía
-        if model_config.get("api_key"):
-            client_kwargs["api_key"] = model_config["api_key"]
-        else:
-            # Para LMStudio y otros sin autenticación, necesitamos un valor que no genere un 'Bearer ' vacío
-            client_kwargs["api_key"] = None
-            
-        client = OpenAI(**client_kwargs)
+        # Cliente compartido por URL base (sin clave para endpoints sin autenticación como LMStudio)
+        if transport is None:
+            transport = AITransport(read_timeout=timeout)
+        client = transport.client(model_config)
         
         # Guardar tiempo inicial para medir latencia
         request_start = time.time()
         
         # Test simple
-        prompt = "Responde solo con un 'OK' para confirmar que estas funcionando."
+        prompt = TEST_PROMPT
         logger.debug(f"Enviando prompt de prueba: '{prompt}'")
         
-        response = client.chat.completions.create(
+        response = transport.call(model_config["api_base_url"], lambda: client.chat.completions.create(
             model=model_config["model"],
             messages=[
                 {"role": "system", "content": "Eres un asistente que responde de forma muy corta."},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=10
-        )
+        ))
         
         # Calcular latencia
         latency = time.time() - request_start
@@ -257,7 +277,7 @@ def test_openai_connection(model_name, model_config, verbose, timeout,
         }
 
 def test_anthropic_connection(model_name, model_config, verbose, timeout,
-                            successful_models, failed_models, results):
+                            successful_models, failed_models, results, transport=None):
     """Prueba la conexion a una API tipo Anthropic (Claude)"""
     
     logger.info(f"Probando conexion a {model_name} (tipo: Anthropic)...")
@@ -280,7 +300,7 @@ def test_anthropic_connection(model_name, model_config, verbose, timeout,
         if model_config.get("api_key"):
             headers["x-api-key"] = model_config["api_key"]
         
-        prompt = "Responde solo con un 'OK' para confirmar que estas funcionando."
+        prompt = TEST_PROMPT
         logger.debug(f"Enviando prompt de prueba: '{prompt}'")
         
         data = {
@@ -294,12 +314,16 @@ def test_anthropic_connection(model_name, model_config, verbose, timeout,
         # Guardar tiempo inicial para medir latencia
         request_start = time.time()
         
-        response = requests.post(
+        # Sesión compartida por URL base, con reintentos ante errores 429/5xx
+        if transport is None:
+            transport = AITransport(read_timeout=timeout)
+        session = transport.session(model_config["api_base_url"])
+        response = transport.call(model_config["api_base_url"], lambda: session.post(
             f"{model_config['api_base_url']}/messages",
             headers=headers,
             json=data,
-            timeout=timeout
-        )
+            timeout=(transport.connect_timeout, timeout)
+        ))
         
         # Calcular latencia
         latency = time.time() - request_start
@@ -359,6 +383,176 @@ def test_anthropic_connection(model_name, model_config, verbose, timeout,
             "traceback": traceback.format_exc() if verbose else None
         }
 
+def benchmark_ai_connections(requests_per_model=BENCHMARK_REQUESTS, concurrency=BENCHMARK_CONCURRENCY,
+                             max_tokens=BENCHMARK_MAX_TOKENS, verbose=True, timeout=30, config=None,
+                             output=RESULTS_FILE):
+    """
+    Mide la capacidad de todos los modelos a la vez: cada uno recibe
+    requests_per_model peticiones en streaming, con `concurrency` simultaneas,
+    y se guardan en `output` los percentiles de latencia y de tiempo hasta
+    el primer token, los tokens por segundo y la proporcion de errores
+    
+    Args:
+        requests_per_model (int): Peticiones que se envian a cada modelo
+        concurrency (int): Peticiones simultaneas por modelo
+        max_tokens (int): Longitud maxima de cada respuesta
+        verbose (bool): Si es True, muestra informacion detallada
+        timeout (int): Tiempo maximo de espera para cada peticion en segundos
+        config (dict): Configuracion a usar en lugar de config.json
+        output (str): Archivo JSON donde guardar los resultados
+    
+    Returns:
+        bool: True si todas las peticiones de todos los modelos respondieron
+    """
+    
+    logger.info(f"Iniciando benchmark: {requests_per_model} peticiones por modelo, {concurrency} simultaneas...")
+    start_time = time.time()
+    
+    if config is None:
+        config = load_config(verbose)
+        if config is None:
+            return False
+    
+    if "api" not in config:
+        logger.error("No se encontro la seccion 'api' en config.json")
+        return False
+    
+    # Modelos que se pueden medir (solo APIs tipo OpenAI, en streaming)
+    models = {}
+    results = {}
+    for model_name, model_config in config["api"].items():
+        missing_fields = [field for field in ["api_type", "api_base_url", "model"] if field not in model_config]
+        if missing_fields:
+            results[model_name] = {"status": "error", "reason": f"Faltan campos: {', '.join(missing_fields)}"}
+        elif not model_config.get("api_enabled", True):
+            results[model_name] = {"status": "skipped", "reason": "API desactivada en configuracion"}
+        elif model_config["api_type"].lower() != "openai":
+            results[model_name] = {"status": "skipped", "reason": "El benchmark solo admite APIs tipo OpenAI"}
+        else:
+            models[model_name] = model_config
+    
+    # Transporte compartido sin reintentos (los errores se miden, no se ocultan)
+    # y con turno para todas las peticiones simultaneas de los modelos que
+    # comparten URL base
+    transport = AITransport.from_config(config.get("ai", {}))
+    transport.read_timeout = timeout
+    transport.max_retries = 0
+    base_urls = [model_config["api_base_url"].rstrip("/") for model_config in models.values()]
+    transport.max_concurrency = concurrency * max([base_urls.count(url) for url in base_urls] or [1])
+    
+    # Todos los modelos a la vez
+    with ThreadPoolExecutor(max_workers=max(1, len(models))) as executor:
+        futures = {model_name: executor.submit(benchmark_model, model_name, model_config, transport,
+                                               requests_per_model, concurrency, max_tokens)
+                   for model_name, model_config in models.items()}
+        for model_name, future in futures.items():
+            results[model_name] = future.result()
+    
+    # Resumen
+    total_duration = time.time() - start_time
+    
+    print("\n" + "="*70)
+    logger.info(f"RESUMEN DEL BENCHMARK (duracion total: {total_duration:.2f}s):")
+    for model_name, result in results.items():
+        if "requests" not in result:
+            logger.info(f"⏩ {model_name}: {result['reason']}")
+            continue
+        icon = "✅" if result["status"] == "success" else "❌"
+        latency, ttft = result["latency"], result["ttft"]
+        logger.info(f"{icon} {model_name}: {result['requests'] - result['errors']}/{result['requests']} correctas "
+                    f"(errores: {result['error_rate'] * 100:.1f}%)")
+        if latency["p50"] is not None:
+            logger.info(f"   - Latencia p50/p95/p99: {latency['p50']:.2f}s / {latency['p95']:.2f}s / {latency['p99']:.2f}s")
+            logger.info(f"   - Primer token p50/p95/p99: {ttft['p50']:.2f}s / {ttft['p95']:.2f}s / {ttft['p99']:.2f}s")
+            logger.info(f"   - Tokens/s por peticion: {result['tokens_per_second']:.1f}, "
+                        f"total: {result['throughput_tokens_per_second']:.1f} "
+                        f"({result['requests_per_second']:.2f} peticiones/s)")
+        for error in result["error_samples"]:
+            logger.info(f"   - Error: {error}")
+    logger.info("="*70)
+    
+    statuses = [result["status"] for result in results.values()]
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "mode": "benchmark",
+            "requests_per_model": requests_per_model,
+            "concurrency": concurrency,
+            "max_tokens": max_tokens,
+            "total_duration": f"{total_duration:.2f}s",
+            "successful": statuses.count("success"),
+            "failed": len(statuses) - statuses.count("success") - statuses.count("skipped"),
+            "skipped": statuses.count("skipped"),
+            "results": results
+        }, f, indent=2)
+    
+    logger.info(f"Resultados detallados guardados en {output}")
+    
+    transport.close()
+    return all(status in ("success", "skipped") for status in statuses)
+
+def benchmark_model(model_name, model_config, transport, requests_per_model, concurrency, max_tokens):
+    """
+    Envia las peticiones del benchmark a un modelo y resume sus resultados
+    (tiempos en segundos)
+    """
+    logger.info(f"Midiendo {model_name} ({model_config['api_base_url']})...")
+    client = transport.client(model_config)
+    messages = [
+        {"role": "system", "content": "Eres un asistente que responde de forma muy corta."},
+        {"role": "user", "content": TEST_PROMPT}
+    ]
+    lock = threading.Lock()
+    samples = []
+    errors = []
+    
+    def send(_):
+        try:
+            text, stats = transport.call(model_config["api_base_url"], lambda: stream_chat(
+                client, model_config["model"], messages, max_tokens))
+            if not text:
+                raise ValueError("Respuesta vacia")
+        except Exception as e:
+            logger.debug(f"Error en {model_name}: {e}")
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            samples.append(stats)
+    
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(requests_per_model)))
+    elapsed = time.time() - start
+    
+    tokens = sum(stats.tokens for stats in samples)
+    if not samples:
+        status = "error"
+    elif errors:
+        status = "degraded"
+    else:
+        status = "success"
+    return {
+        "status": status,
+        "requests": requests_per_model,
+        "errors": len(errors),
+        "error_rate": round(len(errors) / requests_per_model, 4) if requests_per_model else 0.0,
+        "latency": latency_percentiles([stats.duration for stats in samples]),
+        "ttft": latency_percentiles([stats.first_token for stats in samples if stats.first_token is not None]),
+        "tokens_per_second": round(sum(stats.tokens_per_second for stats in samples) / len(samples), 1) if samples else None,
+        "throughput_tokens_per_second": round(tokens / elapsed, 1) if elapsed > 0 else None,
+        "requests_per_second": round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+        "duration": f"{elapsed:.2f}s",
+        "error_samples": sorted(set(errors))[:5]
+    }
+
+def latency_percentiles(values):
+    """Percentiles 50, 95 y 99 de unos tiempos (None si no hay medidas)"""
+    return {name: round(value, 4) if value is not None else None
+            for name, value in (("p50", percentile(values, 0.5)),
+                                ("p95", percentile(values, 0.95)),
+                                ("p99", percentile(values, 0.99)))}
+
 if __name__ == "__main__":
     import argparse
     
@@ -367,8 +561,41 @@ if __name__ == "__main__":
                         help='Mostrar informacion detallada de depuracion')
     parser.add_argument('--timeout', '-t', type=int, default=30,
                         help='Timeout para conexiones en segundos (default: 30)')
+    parser.add_argument('--benchmark', '-b', action='store_true',
+                        help='Medir latencias y rendimiento de todos los modelos a la vez')
+    parser.add_argument('--requests', '-n', type=int, default=BENCHMARK_REQUESTS,
+                        help=f'Peticiones por modelo en el benchmark (default: {BENCHMARK_REQUESTS})')
+    parser.add_argument('--concurrency', '-c', type=int, default=BENCHMARK_CONCURRENCY,
+                        help=f'Peticiones simultaneas por modelo en el benchmark (default: {BENCHMARK_CONCURRENCY})')
+    parser.add_argument('--max-tokens', type=int, default=BENCHMARK_MAX_TOKENS,
+                        help=f'Longitud maxima de cada respuesta del benchmark (default: {BENCHMARK_MAX_TOKENS})')
+    parser.add_argument('--mock', action='store_true',
+                        help='Probar contra el servidor local simulado (mock_ai_server.py) en lugar de config.json')
+    parser.add_argument('--output', '-o',
+                        help=f'Archivo de resultados (default: {RESULTS_FILE}, o {MOCK_RESULTS_FILE} con --mock)')
     
     args = parser.parse_args()
+    output = args.output or (MOCK_RESULTS_FILE if args.mock else RESULTS_FILE)
+    
+    # Servidor simulado en un puerto libre, para probar sin conexion
+    config = None
+    server = None
+    if args.mock:
+        from mock_ai_server import MockAIServer
+        server = MockAIServer(seed=1).start()
+        config = {"api": server.model_configs()}
+        logger.info(f"Servidor de prueba en {server.base_url}")
     
-    result = test_ai_connections(verbose=args.verbose, timeout=args.timeout)
+    try:
+        if args.benchmark:
+            result = benchmark_ai_connections(args.requests, args.concurrency, args.max_tokens,
+                                              verbose=args.verbose, timeout=args.timeout, config=config,
+                                              output=output)
+        else:
+            result = test_ai_connections(verbose=args.verbose, timeout=args.timeout, config=config,
+                                         output=output)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
     sys.exit(0 if result else 1)  # Codigo de salida para CI/CD
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""Pruebas del cálculo de equity por lotes"""
+
+import csv
+import json
+
+import pytest
+
+from holdem.batch import EXTRA_FIELD, batch_equity, read_situations, write_results
+from holdem.parallel import EquityPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EquityPool(1).start()
+    yield pool
+    pool.shutdown()
+
+
+def write_jsonl(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_jsonl_to_csv_keeps_fields_missing_from_first_row(tmp_path, pool):
+    source = write_jsonl(tmp_path / "manos.jsonl", [
+        json.dumps({"id": 1, "hole": "AhKh", "board": "2h7h9c", "opponents": 1}),
+        json.dumps({"id": 2, "hole": "QsQd", "opponents": 2}),
+        json.dumps({"id": 3, "hole": "7c2d", "board": "AsKsQs", "opponents": 1}),
+        json.dumps({"id": 4, "hole": "AhAd", "board": "2c3c4c", "opponents": 2, "dead": "5c",
+                    "known": ["KsKd"]}),
+        json.dumps({"id": 5, "hole": "JhTh", "opponents": 1, "known": [["Ac", "Ad"]],
+                    "jugador": "Ana"}),
+    ])
+    target = str(tmp_path / "equity.csv")
+
+    write_results(batch_equity(read_situations(source), trials=200, seed=1, pool=pool), target)
+
+    with open(target, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows[3]["dead"] == "5c"
+    assert rows[3]["known"] == "KsKd"
+    assert rows[4]["known"] == "Ac Ad"
+    assert json.loads(rows[4][EXTRA_FIELD]) == {"jugador": "Ana"}
+    assert all(row["equity"] and not row["error"] for row in rows)
+
+    # La salida CSV se puede volver a procesar
+    again = list(batch_equity(read_situations(target), trials=200, seed=1, pool=pool))
+    assert all("error" not in result for _, result in again)
+
+
+def test_malformed_lines_are_reported_and_the_batch_continues(tmp_path, pool):
+    source = write_jsonl(tmp_path / "manos.jsonl", [
+        json.dumps({"hole": "AhKh", "opponents": 1}),
+        '{"hole": "AhKh", ',
+        "[1, 2]",
+        json.dumps({"hole": "AhAh", "opponents": 1}),
+        json.dumps({"hole": "QsQd", "opponents": 1}),
+    ])
+    stats = {}
+
+    results = [result for _, result in
+               batch_equity(read_situations(source), trials=200, seed=1, pool=pool, stats=stats)]
+
+    assert "equity" in results[0] and "equity" in results[4]
+    assert "Línea 2" in results[1]["error"]
+    assert "Línea 3" in results[2]["error"]
+    assert "repetidas" in results[3]["error"]
+    assert stats["situations"] == 5
+    assert stats["errors"] == 3
+
+
+def test_negative_seed_is_reproducible(tmp_path, pool):
+    source = write_jsonl(tmp_path / "manos.jsonl", [
+        json.dumps({"hole": "AhKh", "board": "2h7h9c", "opponents": 2}),
+        json.dumps({"hole": "QsQd", "board": "2c3c4c5d", "opponents": 1}),
+    ])
+    first = [result for _, result in batch_equity(read_situations(source), trials=200, seed=-7,
+                                                 pool=pool)]
+    second = [result for _, result in batch_equity(read_situations(source), trials=200, seed=-7,
+                                                  pool=pool)]
+    assert all("error" not in result for result in first)
+    assert first == second
@@ -0,0 +1,73 @@
+"""Pruebas del servidor simulado y del benchmark de test_ai_connection.py"""
+
+import json
+import os
+
+import pytest
+import requests
+
+from mock_ai_server import MockAIServer
+
+
+@pytest.fixture(scope="module")
+def connection(tmp_path_factory):
+    # El módulo crea su archivo de log en el directorio actual al importarse
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("log"))
+    try:
+        import test_ai_connection
+    finally:
+        os.chdir(cwd)
+    return test_ai_connection
+
+
+@pytest.fixture
+def server():
+    server = MockAIServer(models={
+        "rapido": {"ttft": 0.0, "tokens_per_second": 1000.0, "error_rate": 0.0},
+        "caido": {"ttft": 0.0, "tokens_per_second": 1000.0, "error_rate": 1.0},
+    }, seed=1).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_mock_server_lists_models_and_answers(server):
+    models = requests.get(f"{server.base_url}/models", timeout=5).json()
+    assert [model["id"] for model in models["data"]] == ["rapido", "caido"]
+
+    response = requests.post(f"{server.base_url}/chat/completions", timeout=5,
+                             json={"model": "rapido", "max_tokens": 3,
+                                   "messages": [{"role": "user", "content": "Hola"}]})
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "OK, funciono correctamente"
+
+    assert requests.post(f"{server.base_url}/chat/completions", json={"model": "caido"},
+                         timeout=5).status_code == 503
+    assert requests.post(f"{server.base_url}/chat/completions", json={"model": "otro"},
+                         timeout=5).status_code == 404
+
+
+def test_latency_percentiles(connection):
+    assert connection.latency_percentiles(range(1, 101)) == {"p50": 50, "p95": 95, "p99": 99}
+    assert connection.latency_percentiles([]) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_benchmark_statistics(connection, server, tmp_path):
+    output = tmp_path / "resultados.json"
+    config = {"api": server.model_configs()}
+    assert not connection.benchmark_ai_connections(8, 3, max_tokens=5, verbose=False, timeout=5,
+                                                   config=config, output=str(output))
+
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    assert (saved["mode"], saved["successful"], saved["failed"]) == ("benchmark", 1, 1)
+
+    fast = saved["results"]["rapido"]
+    assert (fast["status"], fast["requests"], fast["errors"], fast["error_rate"]) == ("success", 8, 0, 0.0)
+    for stat in ("latency", "ttft"):
+        assert 0 <= fast[stat]["p50"] <= fast[stat]["p95"] <= fast[stat]["p99"]
+    assert fast["tokens_per_second"] > 0 and fast["requests_per_second"] > 0
+
+    down = saved["results"]["caido"]
+    assert (down["status"], down["errors"], down["error_rate"]) == ("error", 8, 1.0)
+    assert down["latency"]["p50"] is None and down["error_samples"]
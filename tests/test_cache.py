@@ -0,0 +1,61 @@
+"""Pruebas de la caché de equity por situación canónica"""
+
+import pytest
+
+from holdem import compute_equity
+from holdem.cache import EquityCache
+from holdem.canonical import canonical_key
+from holdem.disk_cache import PersistentEquityCache
+from holdem.evaluator import cards_to_ints
+
+HEARTS = (["Ah", "Kh"], ["2h", "7h", "9c", "Qc"])
+SPADES = (["As", "Ks"], ["2s", "7s", "9d", "Qd"])
+# Palos de HEARTS en SPADES (los que no aparecen son intercambiables)
+SUITS = {"h": "s", "c": "d", "s": "h", "d": "c"}
+
+
+@pytest.fixture(params=["memoria", "disco"])
+def cache(request, tmp_path):
+    store = PersistentEquityCache(str(tmp_path / "equity.sqlite")) if request.param == "disco" else None
+    yield EquityCache(store=store)
+    if store is not None:
+        store.close()
+
+
+def flush_outs(result):
+    return {card for card, _ in result.outs()}
+
+
+def test_suit_permuted_hit_returns_outs_in_its_own_suits(cache):
+    hearts = compute_equity(*HEARTS, opponents=1, cache=cache)
+    spades = compute_equity(*SPADES, opponents=1, cache=cache)
+
+    assert cache.hits == 1
+    assert spades.equity == pytest.approx(hearts.equity)
+    assert flush_outs(spades) == {card[0] + SUITS[card[1]] for card in flush_outs(hearts)}
+    assert {"3s", "4s", "5s", "6s", "8s"} <= flush_outs(spades)
+
+
+def test_monte_carlo_refinement_merges_in_canonical_suits(cache):
+    compute_equity(*HEARTS, opponents=1, cache=cache, trials=4000, exact=False, seed=1)
+    refined = compute_equity(*SPADES, opponents=1, cache=cache, trials=8000, exact=False, seed=2)
+
+    assert refined.trials == 8000
+    assert not {"3h", "4h", "5h", "6h", "8h"} & flush_outs(refined)
+    assert {"3s", "4s", "5s", "6s", "8s"} <= flush_outs(refined)
+
+
+def test_refinement_keeps_memory_trials_missing_from_disk(tmp_path):
+    cache = EquityCache()
+    compute_equity(*HEARTS, opponents=1, cache=cache, trials=4000, exact=False, seed=1)
+
+    # Un archivo nuevo (o una entrada ya eliminada del disco) no tiene la situación
+    store = PersistentEquityCache(str(tmp_path / "equity.sqlite"))
+    cache.store = store
+    try:
+        refined = compute_equity(*HEARTS, opponents=1, cache=cache, trials=8000, exact=False, seed=2)
+        assert refined.trials == 8000
+        key = canonical_key(cards_to_ints(HEARTS[0]), cards_to_ints(HEARTS[1]), 1, [], [])
+        assert store.get(key).trials == 8000
+    finally:
+        store.close()
@@ -0,0 +1,95 @@
+"""Pruebas del cálculo de equity (holdem.equity)"""
+
+import random
+import time
+
+import pytest
+
+from holdem.equity import (ADAPTIVE_MIN_TRIALS, EXACT_THRESHOLD, EquityResult, calculate_equity,
+                           combination_count, enumerate_equity, monte_carlo_equity)
+from holdem.evaluator import cards_to_ints
+
+HOLE = cards_to_ints(["Ah", "Kd"])
+FLOP = cards_to_ints(["2c", "7d", "Qs"])
+
+
+@pytest.fixture(scope="module", autouse=True)
+def warm_tables():
+    # La primera simulación construye las tablas del evaluador; no debe
+    # contar en el tiempo de las pruebas adaptativas
+    calculate_equity(HOLE, FLOP, 3, 100, exact=False, seed=1)
+
+
+def test_adaptive_time_budget_only():
+    start = time.monotonic()
+    result = calculate_equity(HOLE, FLOP, 3, 1000000, time_budget=0.2, seed=1)
+    assert time.monotonic() - start < 1.0
+    assert not result.exact and result.trials > ADAPTIVE_MIN_TRIALS
+
+
+def test_adaptive_target_half_width_only():
+    result = calculate_equity(HOLE, FLOP, 3, 1000000, target_half_width=0.01, seed=1)
+    assert result.half_width() <= 0.01
+    assert result.trials < 1000000
+
+
+def test_adaptive_stops_at_time_budget_before_target():
+    start = time.monotonic()
+    result = calculate_equity(HOLE, FLOP, 3, 1000000, target_half_width=0.0001, time_budget=0.2,
+                              seed=1)
+    assert time.monotonic() - start < 1.0
+    assert result.half_width() > 0.0001
+
+
+def test_record_counts_wins_ties_and_losses():
+    result = EquityResult()
+    result.record(10, [5, 3])  # Gana
+    result.record(5, [5, 3])  # Empata con uno: medio bote
+    result.record(5, [5, 5])  # Empata con dos: un tercio
+    result.record(3, [5, 3])  # Pierde aunque empate con otro
+    assert (result.wins, result.ties, result.losses) == (1, 2, 1)
+    assert result.share == pytest.approx(1 + 1 / 2 + 1 / 3)
+    assert result.equity == pytest.approx((1 + 1 / 2 + 1 / 3) / 4)
+    assert result.tie_rate == 0.5
+
+
+@pytest.mark.parametrize("opponents", [1, 2, 5])
+def test_board_royal_flush_splits_the_pot(opponents):
+    hole = cards_to_ints(["2c", "3d"])
+    board = cards_to_ints(["Th", "Jh", "Qh", "Kh", "Ah"])
+    result = monte_carlo_equity(hole, board, opponents, 300, random.Random(1))
+    assert (result.wins, result.ties, result.losses) == (0, 300, 0)
+    assert result.equity == pytest.approx(1 / (opponents + 1))
+    assert result.tie_rate == 1.0
+
+
+def test_river_against_known_hand_is_a_loss():
+    hole = cards_to_ints(["Ah", "Ad"])
+    board = cards_to_ints(["Kc", "7d", "2s", "Ks", "9h"])
+    result = monte_carlo_equity(hole, board, 1, 200, random.Random(1), known=[cards_to_ints(["Kh", "Qh"])])
+    assert (result.wins, result.ties, result.losses) == (0, 0, 200)
+    assert result.equity == 0.0
+
+
+@pytest.mark.parametrize("board", [["2c", "7d", "Qs", "Jh"], ["2c", "7d", "Qs", "Jh", "5c"]])
+def test_turn_and_river_are_enumerated_exactly(board):
+    board = cards_to_ints(board)
+    assert combination_count(len(board), 52 - 2 - len(board), 1) <= EXACT_THRESHOLD
+    first = calculate_equity(HOLE, board, 1, seed=1)
+    second = calculate_equity(HOLE, board, 1, seed=2)
+    assert first.exact and second.exact
+    assert first.trials == combination_count(len(board), 52 - 2 - len(board), 1)
+    assert (first.wins, first.ties, first.losses) == (second.wins, second.ties, second.losses)
+    assert first.equity == second.equity
+
+
+def test_flop_with_several_opponents_uses_monte_carlo():
+    assert combination_count(3, 47, 3) > EXACT_THRESHOLD
+    assert not calculate_equity(HOLE, FLOP, 3, 1000, seed=1).exact
+
+
+def test_enumeration_agrees_with_sampling():
+    exact = enumerate_equity(HOLE, FLOP, 1)
+    sampled = calculate_equity(HOLE, FLOP, 1, 200000, exact=False, seed=3)
+    assert exact.trials == combination_count(3, 47, 1)
+    assert abs(sampled.equity - exact.equity) < 4 * sampled.half_width() / 1.96
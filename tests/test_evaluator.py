@@ -0,0 +1,79 @@
+"""Pruebas del evaluador de manos (holdem.evaluator)"""
+
+import random
+from itertools import combinations
+
+from holdem.evaluator import (HAND_CATEGORIES, cards_to_ints, evaluate, evaluate_state,
+                              hand_name, hand_state)
+
+
+def score(cards):
+    return evaluate(cards_to_ints(cards.split()))
+
+
+def test_category_ordering():
+    hands = [
+        "Ah Jd 9c 6s 3h",  # High Card
+        "9h 9d Ac 6s 3h",  # Pair
+        "9h 9d 6c 6s Ah",  # Two Pair
+        "9h 9d 9c 6s 3h",  # Three of a Kind
+        "5h 6d 7c 8s 9h",  # Straight
+        "Ah Jh 9h 6h 3h",  # Flush
+        "9h 9d 9c 6s 6h",  # Full House
+        "9h 9d 9c 9s 3h",  # Four of a Kind
+        "5h 6h 7h 8h 9h",  # Straight Flush
+        "Th Jh Qh Kh Ah",  # Royal Flush
+    ]
+    scores = [score(hand) for hand in hands]
+    assert [hand_name(value) for value in scores] == HAND_CATEGORIES
+    assert scores == sorted(scores) and len(set(scores)) == len(scores)
+
+
+def test_kickers_break_ties():
+    assert score("Ah Kd 9c 6s 3h") > score("Ah Qd Jc 9s 8h")
+    assert score("Ah Ad Kc 6s 3h") > score("Ah Ad Qc Js 9h")
+    assert score("Kh Kd 6c 6s 9h") > score("Kh Kd 6c 6s 8h")
+    assert score("9h 9d 9c Ks 3h") > score("9h 9d 9c Qs Jh")
+    # Solo cuentan las cinco mejores cartas: la sexta y la séptima no desempatan
+    assert score("Ah Ad Kc Qs Jh 4c 3d") == score("Ah Ad Kc Qs Jh 5c 2d")
+
+
+def test_wheel_is_the_lowest_straight():
+    wheel = score("Ah 2d 3c 4s 5h")
+    assert hand_name(wheel) == "Straight"
+    assert wheel < score("2h 3d 4c 5s 6h")
+    assert wheel > score("Ah Ad Ac Ks Qh")
+    # Con un 6 en las siete cartas cuenta la escalera más alta
+    assert score("Ah 2d 3c 4s 5h 6c Kd") == score("2h 3d 4c 5s 6h")
+    steel_wheel = score("Ah 2h 3h 4h 5h")
+    assert hand_name(steel_wheel) == "Straight Flush"
+    assert steel_wheel < score("2h 3h 4h 5h 6h")
+
+
+def test_flush_against_paired_boards():
+    board = "Kh 7h Kd 2h 9c"
+    flush = score(f"Ah 4h {board}")
+    trips = score(f"Ks Qc {board}")
+    assert hand_name(flush) == "Flush" and flush > trips
+    # Con la mesa doblada, el full gana al color
+    full_house = score(f"9s 9d {board}")
+    assert hand_name(full_house) == "Full House" and full_house > flush
+    # Y el color más alto gana aunque ambos lleven las tres cartas de la mesa
+    assert flush > score(f"Qh 4h {board}")
+
+
+def test_seven_cards_score_the_best_five():
+    rng = random.Random(7)
+    for _ in range(300):
+        cards = rng.sample(range(52), 7)
+        assert evaluate(cards) == max(evaluate(hand) for hand in combinations(cards, 5))
+
+
+def test_hand_state_matches_evaluate():
+    rng = random.Random(11)
+    for _ in range(2000):
+        cards = rng.sample(range(52), 7)
+        expected = evaluate(cards)
+        for split in range(8):
+            assert evaluate_state(hand_state(cards[:split]), cards[split:]) == expected
+        assert evaluate_state(hand_state(cards[4:], hand_state(cards[:4]))) == expected
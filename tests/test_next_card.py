@@ -0,0 +1,26 @@
+"""Pruebas del mapa de equity por carta siguiente (holdem.next_card)"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from holdem import compute_next_card_equity
+from holdem.equity import enumerate_equity
+from holdem.evaluator import card_to_int, cards_to_ints
+
+HOLE = ["Ah", "Kh"]
+BOARD = ["2h", "7h", "9c", "Td"]
+# Cartas muertas para que la enumeración con dos oponentes sea rápida
+DEAD = ["2c", "2d", "2s", "3c", "3d", "3h", "3s", "4c", "4d", "4h", "4s",
+        "5c", "5d", "5h", "5s", "6c", "6d", "6h", "6s", "7c"]
+
+
+def test_exact_with_two_unknown_opponents_matches_river_enumeration():
+    equities = compute_next_card_equity(HOLE, BOARD, 2, dead_cards=DEAD, exact=True)
+    assert len(equities) == 52 - len(HOLE) - len(BOARD) - len(DEAD)
+    for card in ("Qh", "Jc", "9d", "As"):
+        expected = enumerate_equity(cards_to_ints(HOLE), cards_to_ints(BOARD) + [card_to_int(card)],
+                                    2, dead=cards_to_ints(DEAD))
+        assert equities[card].exact
+        assert equities[card].trials == expected.trials
+        assert equities[card].equity == pytest.approx(expected.equity)
@@ -0,0 +1,18 @@
+"""Pruebas del cálculo de equity en paralelo (holdem.parallel)"""
+
+from holdem.evaluator import cards_to_ints
+from holdem.parallel import SHARD_TRIALS, EquityPool
+
+HOLE = cards_to_ints(["Ah", "Kd"])
+FLOP = cards_to_ints(["2c", "7d", "Qs"])
+TRIALS = 3 * SHARD_TRIALS + 1234  # Varios fragmentos y uno incompleto
+
+
+def test_same_seed_gives_identical_result_with_any_worker_count():
+    with EquityPool(1) as single, EquityPool(2) as double:
+        one = single.equity(HOLE, FLOP, 3, TRIALS, seed=42)
+        two = double.equity(HOLE, FLOP, 3, TRIALS, seed=42)
+        other = double.equity(HOLE, FLOP, 3, TRIALS, seed=43)
+    assert one.trials == TRIALS
+    assert one == two
+    assert one != other
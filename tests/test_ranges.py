@@ -0,0 +1,72 @@
+"""Pruebas de la notación de rangos y de la equity entre rangos"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from holdem.equity import enumerate_equity
+from holdem.evaluator import card_to_int, cards_to_ints
+from holdem.range_equity import combo_equities, range_equity
+from holdem.ranges import class_combos, parse_range
+
+
+def combo(text):
+    return tuple(sorted(card_to_int(text[i:i + 2]) for i in (0, 2)))
+
+
+@pytest.mark.parametrize("text, count", [
+    ("QQ+", 18), ("AKs", 4), ("AKo", 12), ("AK", 16), ("KA", 16),
+    ("22-55", 24), ("A2s-A5s", 16), ("KTo+", 36), ("ATs+", 16),
+    ("QQ+, AKs", 22), ("15%", 208), ("random", 1326),
+])
+def test_range_sizes(text, count):
+    weights = parse_range(text)
+    assert len(weights) == count
+    assert set(weights.values()) == {1.0}
+
+
+def test_plus_and_interval_classes():
+    assert set(parse_range("QQ+")) == set(class_combos("QQ") + class_combos("KK") + class_combos("AA"))
+    assert set(parse_range("A2s-A4s")) == set(class_combos("A2s") + class_combos("A3s")
+                                              + class_combos("A4s"))
+    assert all((a & 3) == (b & 3) for a, b in parse_range("A2s-A5s"))
+    assert all((a & 3) != (b & 3) for a, b in parse_range("KTo+"))
+
+
+def test_weights():
+    assert set(parse_range("50% of AQo").values()) == {0.5}
+    assert parse_range("AhKh, AsKs:0.5") == {combo("AhKh"): 1.0, combo("AsKs"): 0.5}
+    # El último peso de una combinación prevalece
+    weights = parse_range("AKs, AhKh:25%")
+    assert weights[combo("AhKh")] == 0.25 and weights[combo("AsKs")] == 1.0
+    assert combo("AhKh") not in parse_range("AKs, AhKh:0")
+
+
+@pytest.mark.parametrize("text", ["AKx", "QQs", "A2s-K5s", "AhAh", "AKs:2", "XX+"])
+def test_invalid_ranges(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+
+BOARD = cards_to_ints(["2h", "7h", "9c"])
+HERO = cards_to_ints(["Ah", "Kh"])
+
+
+def test_hand_against_one_combo_matches_exact_equity():
+    result = range_equity(HERO, "QsQd", BOARD)
+    expected = enumerate_equity(HERO, BOARD, 1, known=[cards_to_ints(["Qs", "Qd"])])
+    assert result.exact
+    assert result.equity == pytest.approx(expected.equity)
+
+
+def test_hand_against_range_averages_exact_equities():
+    # Todas las combinaciones compatibles dejan los mismos tableros posibles,
+    # así que la equity contra el rango es la media de las equities exactas
+    villain = [hand for hand in class_combos("QQ") + class_combos("98s")
+               if not set(hand) & set(HERO + BOARD)]
+    expected = sum(enumerate_equity(HERO, BOARD, 1, known=[list(hand)]).equity
+                   for hand in villain) / len(villain)
+    assert range_equity(HERO, "QQ, 98s", BOARD).equity == pytest.approx(expected)
+
+    equities = combo_equities("AKs", "QQ, 98s", BOARD)
+    assert equities[tuple(sorted(HERO))] == pytest.approx(expected)
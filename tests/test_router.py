@@ -0,0 +1,79 @@
+"""Pruebas de la selección de modelo del chat (advisor.router)"""
+
+import threading
+import time
+
+import pytest
+
+from advisor.router import CLOSED, HALF_OPEN, OPEN, ModelRouter, percentile
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile(range(1, 101), 0.95) == 95
+
+
+def test_ranking_by_latency_and_weight():
+    router = ModelRouter({"a": 1.0, "b": 2.0, "c": 1.0})
+    assert router.ranking() == ["b", "a", "c"]  # Sin medidas: primero el de más peso
+    router.record_success("a", 1.0)
+    router.record_success("b", 1.5)
+    router.record_success("c", 0.5)
+    assert router.ranking() == ["c", "b", "a"]  # b: 1.5 / 2 < 1.0
+
+
+def test_circuit_opens_and_recovers():
+    router = ModelRouter({"a": 1.0, "b": 1.0}, failure_threshold=2, open_seconds=60.0)
+    router.record_failure("a")
+    assert router.ranking() == ["a", "b"]
+    router.record_failure("a")
+    assert router.stats()["a"]["state"] == OPEN
+    assert router.ranking() == ["b"]
+
+    router.open_seconds = 0.0
+    assert router.ranking() == ["a", "b"]
+    assert router.stats()["a"]["state"] == HALF_OPEN
+    router.record_failure("a")  # Falla la consulta de prueba: vuelve a quedar fuera
+    assert router.stats()["a"]["state"] == OPEN
+    router.record_success("a", 0.1)
+    assert router.stats()["a"]["state"] == CLOSED
+
+
+def test_run_fails_over_to_next_model():
+    router = ModelRouter({"a": 1.0, "b": 1.0})
+
+    def call(name, on_text, cancel):
+        if name == "a":
+            raise ConnectionError("sin conexión")
+        on_text("respuesta")
+        return "respuesta"
+
+    assert router.run(call) == ("b", "respuesta")
+    assert router.stats()["a"]["error_rate"] == 1.0
+    assert router.stats()["b"]["samples"] == 1
+
+
+def test_run_hedges_slow_model_and_cancels_it():
+    router = ModelRouter({"lento": 1.0, "rapido": 1.0}, hedge_delay=0.05)
+    cancelled = threading.Event()
+    shown = []
+
+    def call(name, on_text, cancel):
+        if name == "lento":
+            if cancel.wait(5.0):
+                cancelled.set()
+            return None
+        on_text("hola")
+        return "hola"
+
+    start = time.monotonic()
+    assert router.run(call, on_text=shown.append) == ("rapido", "hola")
+    assert time.monotonic() - start < 1.0
+    assert shown == ["hola"]
+    assert cancelled.wait(1.0)
+
+
+def test_run_without_models():
+    with pytest.raises(RuntimeError):
+        ModelRouter({}).run(lambda name, on_text, cancel: None)
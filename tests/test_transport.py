@@ -0,0 +1,80 @@
+"""Pruebas del transporte compartido contra el servidor simulado"""
+
+import threading
+import time
+
+import pytest
+
+from advisor.streaming import stream_chat
+from advisor.transport import AITransport, RequestCancelled
+from mock_ai_server import MockAIServer
+
+MESSAGES = [{"role": "user", "content": "Hola"}]
+
+
+@pytest.fixture
+def server():
+    server = MockAIServer(models={
+        "rapido": {"ttft": 0.0, "tokens_per_second": 1000.0},
+        "atascado": {"ttft": 5.0, "tokens_per_second": 1000.0},
+    }).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport():
+    transport = AITransport(read_timeout=60.0, max_concurrency=1, max_retries=3, backoff=0.01)
+    yield transport
+    transport.close()
+
+
+def model_config(server, model):
+    return {"api_base_url": server.base_url, "api_key": "", "model": model}
+
+
+def test_stream_chat_through_transport(server, transport):
+    client = transport.client(model_config(server, "rapido"))
+    text, stats = transport.call(server.base_url, lambda: stream_chat(client, "rapido", MESSAGES, 5))
+
+    assert text.startswith("OK")
+    assert stats.tokens == 5
+    assert stats.first_token is not None
+
+
+def test_timeout_is_not_retried_after_deadline(server, transport):
+    client = transport.client(model_config(server, "atascado"))
+    start = time.monotonic()
+    with pytest.raises(Exception):
+        transport.call(server.base_url, lambda: stream_chat(client, "atascado", MESSAGES, 5, timeout=0.3),
+                       deadline=time.monotonic() + 0.3)
+
+    # Un solo intento: el plazo vence antes de poder reintentar
+    assert time.monotonic() - start < 1.5
+
+
+def test_cancelled_request_is_not_retried_and_frees_its_slot(server, transport):
+    stalled = transport.client(model_config(server, "atascado"))
+    cancel = threading.Event()
+    errors = []
+
+    def stalled_call():
+        try:
+            transport.call(server.base_url, lambda: stream_chat(stalled, "atascado", MESSAGES, 5, timeout=0.3),
+                           cancel)
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=stalled_call)
+    worker.start()
+    time.sleep(0.1)
+    cancel.set()
+    worker.join(timeout=2)
+    assert not worker.is_alive()
+    assert isinstance(errors[0], RequestCancelled)
+
+    # El único turno de la URL base queda libre para la siguiente consulta
+    fast = transport.client(model_config(server, "rapido"))
+    text, _ = transport.call(server.base_url, lambda: stream_chat(fast, "rapido", MESSAGES, 3))
+    assert text
@@ -0,0 +1,27 @@
+"""Pruebas del simulador vectorizado (holdem.vectorized)"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from holdem.evaluator import cards_to_ints, evaluate
+from holdem.vectorized import evaluate_state, hand_state, vectorized_equity
+
+
+def test_fixed_state_plus_dealt_cards_matches_evaluate():
+    rng = random.Random(3)
+    hands = np.array([rng.sample(range(52), 7) for _ in range(2000)], dtype=np.int64)
+    fixed = hand_state(hands[:, :3])
+    dealt = hand_state(hands[:, 3:])
+    scores = evaluate_state(*(a + b for a, b in zip(fixed, dealt)))
+    assert scores.tolist() == [evaluate(hand) for hand in hands.tolist()]
+
+
+def test_river_with_known_hand_is_exact():
+    hole = cards_to_ints(["Ah", "Kh"])
+    board = cards_to_ints(["2h", "7h", "9h", "Jd", "3s"])
+    known = [cards_to_ints(["Qc", "Qd"])]
+    result = vectorized_equity(hole, board, 1, trials=500, seed=1, known=known)
+    assert (result.wins, result.ties, result.losses) == (500, 0, 0)